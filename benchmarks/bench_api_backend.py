@@ -0,0 +1,116 @@
+"""Measures the throughput of the HTTP backend against the local stub API server.
+
+Run with `python benchmarks/bench_api_backend.py [--requests 500] [--concurrency 1 4 16] [--upload-mb 64]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from genetic_forensic_portal.app.client.backends import Artifact, chunked_upload
+from genetic_forensic_portal.app.client.backends.http_backend import HttpBackend
+from genetic_forensic_portal.app.client.backends.stub_server import start_stub_server
+from genetic_forensic_portal.app.common.constants import SAMPLE_UUID
+
+DEFAULT_REQUESTS = 500
+DEFAULT_CONCURRENCY = [1, 4, 16]
+DEFAULT_UPLOAD_MB = 64
+
+
+def time_requests(
+    backend: HttpBackend, artifact: Artifact, requests: int, concurrency: int
+) -> tuple[float, int]:
+    """Fetch an artifact `requests` times from `concurrency` threads and return the seconds taken and bytes fetched.
+
+    Only the first fetch transfers the artifact; the rest are conditional requests that the API answers with 304 Not Modified, so this measures the per-request overhead of a warm artifact cache.
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        paths = list(
+            executor.map(
+                lambda _: backend.get_artifact(SAMPLE_UUID, artifact), range(requests)
+            )
+        )
+    seconds = time.perf_counter() - start
+    return seconds, sum(Path(path).stat().st_size for path in paths)
+
+
+def time_upload(backend: HttpBackend, data: bytes, workers: int) -> float:
+    """Upload `data` in parts from `workers` threads and return the seconds taken."""
+    start = time.perf_counter()
+    upload_id = backend.start_upload(
+        None,
+        hashlib.sha256(data).hexdigest(),
+        len(data),
+        chunked_upload.DEFAULT_PART_SIZE,
+    )
+    chunked_upload.send_parts(
+        backend, upload_id, io.BytesIO(data), len(data), max_workers=workers
+    )
+    backend.complete_upload(upload_id)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS)
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=DEFAULT_CONCURRENCY
+    )
+    parser.add_argument(
+        "--artifacts",
+        nargs="+",
+        default=[Artifact.SCAT_IMAGE, Artifact.FAMILIAL],
+        type=Artifact,
+        choices=list(Artifact),
+    )
+    parser.add_argument("--upload-mb", type=int, default=DEFAULT_UPLOAD_MB)
+    args = parser.parse_args()
+
+    server = start_stub_server()
+    try:
+        print(
+            f"{'artifact':>14} {'threads':>8} {'seconds':>10} {'requests/sec':>14} {'MB/sec':>10}"
+        )
+        for artifact in args.artifacts:
+            for concurrency in args.concurrency:
+                with tempfile.TemporaryDirectory() as artifact_dir:
+                    backend = HttpBackend(
+                        server.url, pool_maxsize=concurrency, artifact_dir=artifact_dir
+                    )
+                    seconds, size = time_requests(
+                        backend, artifact, args.requests, concurrency
+                    )
+                    backend.close()
+                print(
+                    f"{artifact:>14} {concurrency:>8} {seconds:>10.3f} "
+                    f"{args.requests / seconds:>14,.0f} {size / seconds / 2**20:>10,.1f}"
+                )
+
+        data = os.urandom(args.upload_mb * 2**20)
+        print(f"\n{'upload':>14} {'threads':>8} {'seconds':>10} {'MB/sec':>10}")
+        for workers in args.concurrency:
+            with tempfile.TemporaryDirectory() as artifact_dir:
+                backend = HttpBackend(
+                    server.url, pool_maxsize=workers, artifact_dir=artifact_dir
+                )
+                seconds = time_upload(backend, data, workers)
+                backend.close()
+            print(
+                f"{f'{args.upload_mb} MB':>14} {workers:>8} {seconds:>10.3f} "
+                f"{args.upload_mb / seconds:>10,.1f}"
+            )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Measures how long the first page of a large familial match table takes to show in each result format.
+
+Run with `python benchmarks/bench_familial_formats.py [--rows 1000000]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from genetic_forensic_portal.app.client.gf_api_client import FAMILIAL_PAGE_SIZE
+from genetic_forensic_portal.app.utils import familial_analysis_utils as fam_utils
+
+DEFAULT_ROWS = 1_000_000
+
+# Rows in each Arrow record batch and Parquet row group
+CHUNK_ROWS = 64 * 1024
+
+
+def write_results(directory: Path, rows: int) -> dict[fam_utils.FamilialFormat, Path]:
+    """Write the same random match table as a TSV report, an Arrow IPC file and a Parquet file."""
+    matches = pd.DataFrame(
+        {
+            fam_utils.SEIZURE_COLUMN: [f"SEIZURE_{row:07d}" for row in range(rows)],
+            fam_utils.MATCH_SCORE_COLUMN: [random.uniform(0, 10) for _ in range(rows)],
+            fam_utils.EXACT_MATCH_COLUMN: random.choices(["Y", "N"], k=rows),
+        }
+    ).astype(fam_utils.FAMILIAL_DTYPES)
+    paths = {
+        familial_format: directory / f"matches.{familial_format}"
+        for familial_format in fam_utils.FamilialFormat
+    }
+
+    with paths[fam_utils.FamilialFormat.TSV].open("w") as report:
+        report.write("Familial Matching Report for Seizure BENCH\n\n")
+        matches.to_csv(report, sep="\t", index=False)
+
+    table = pa.Table.from_pandas(matches, preserve_index=False)
+    with pa.ipc.new_file(paths[fam_utils.FamilialFormat.ARROW], table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=CHUNK_ROWS):
+            writer.write_batch(batch)
+    pq.write_table(
+        table, paths[fam_utils.FamilialFormat.PARQUET], row_group_size=CHUNK_ROWS
+    )
+    return paths
+
+
+def time_first_page(path: Path) -> float:
+    """Read the first page of matches and count them all, and return the seconds taken."""
+    start = time.perf_counter()
+    fam_utils.read_familial_results(path, start=0, stop=FAMILIAL_PAGE_SIZE)
+    fam_utils.count_familial_results(path)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_results(Path(directory), args.rows)
+        for familial_format, path in paths.items():
+            seconds = time_first_page(path)
+            print(
+                f"{familial_format:>8}: {path.stat().st_size / 2**20:7.1f} MiB, "
+                f"first page in {seconds * 1000:8.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
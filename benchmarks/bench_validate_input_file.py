@@ -0,0 +1,221 @@
+"""Measures the throughput and peak memory of the input file validators on synthetic microsatellite files.
+
+Each engine runs in a fresh interpreter so that its peak RSS is its own. Results can be saved as a baseline and later runs compared against it, failing if any engine got slower or bigger than the tolerance allows.
+
+Run with `nox -s bench`, or `python benchmarks/bench_validate_input_file.py [--sizes 1000 100000] [--baseline benchmarks/baseline.json]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from generate_input_file import (
+    DEFAULT_ERROR_RATE,
+    DEFAULT_MISSING_RATE,
+    write_input_file,
+)
+
+from genetic_forensic_portal.app.utils import sample_id_tracker, validate_input_file
+
+
+def _run_python(path: Path) -> object:
+    with path.open(encoding="utf-8", newline="") as infile:
+        return validate_input_file.check_input_file(infile, max_errors=None)  # type: ignore[arg-type]
+
+
+def _run_stream(path: Path) -> object:
+    with path.open("rb") as stream:
+        return validate_input_file.check_input_stream(
+            stream,
+            max_errors=None,
+            sid_spill_threshold=sample_id_tracker.DEFAULT_SPILL_THRESHOLD,
+        )
+
+
+def _run_vectorized(path: Path) -> object:
+    # stops at the first error, so only legal files are checked end to end
+    with path.open(encoding="utf-8", newline="") as infile:
+        try:
+            validate_input_file.validate_input_file_vectorized(infile)  # type: ignore[arg-type]
+        except validate_input_file.InvalidInputFileError as e:
+            return e.report
+    return None
+
+
+ENGINES: dict[str, Callable[[Path], object]] = {
+    "python": _run_python,
+    "stream": _run_stream,
+    "vectorized": _run_vectorized,
+}
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000, 10_000_000]
+
+# Share by which a result may be worse than the baseline before it counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+# Small files are validated repeatedly until this many seconds have passed, and the fastest run is kept
+MIN_TIMING_SECONDS = 1.0
+MAX_REPEATS = 100
+
+
+def _peak_rss_mb() -> float:
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # reported in bytes on macOS, and kilobytes elsewhere
+    return peak_rss / 2**20 if sys.platform == "darwin" else peak_rss / 2**10
+
+
+def measure(engine: str, path: Path) -> dict[str, float]:
+    """Validate the file at `path` with `engine` in this process and return the fastest time and the peak RSS."""
+    timings: list[float] = []
+    while len(timings) < MAX_REPEATS:
+        if timings and sum(timings) >= MIN_TIMING_SECONDS:
+            break
+        start = time.perf_counter()
+        ENGINES[engine](path)
+        timings.append(time.perf_counter() - start)
+    return {"seconds": min(timings), "peak_rss_mb": _peak_rss_mb()}
+
+
+def run_engine(engine: str, path: Path) -> dict[str, float] | None:
+    """Validate the file at `path` with `engine` in a fresh interpreter. Returns None if it failed, e.g. ran out of memory."""
+    completed = subprocess.run(
+        [sys.executable, __file__, "--measure", engine, str(path)],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if completed.returncode != 0:
+        print(
+            f"{engine} exited with code {completed.returncode}\n{completed.stderr}",
+            file=sys.stderr,
+        )
+        return None
+    result: dict[str, float] = json.loads(completed.stdout)
+    return result
+
+
+def find_regressions(
+    results: dict[str, dict[str, float] | None],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> list[str]:
+    """Compare results against a baseline, both keyed by "engine/rows", and describe each regression found."""
+    regressions = []
+    for key, expected in baseline.items():
+        if key not in results:
+            continue
+        result = results[key]
+        if result is None:
+            regressions.append(f"{key}: failed to run")
+            continue
+        if result["rows_per_sec"] < expected["rows_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{key}: {result['rows_per_sec']:,.0f} rows/sec, "
+                f"baseline {expected['rows_per_sec']:,.0f}"
+            )
+        if result["peak_rss_mb"] > expected["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(
+                f"{key}: {result['peak_rss_mb']:,.1f} MB peak RSS, "
+                f"baseline {expected['peak_rss_mb']:,.1f}"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=ENGINES)
+    parser.add_argument("--missing-rate", type=float, default=DEFAULT_MISSING_RATE)
+    parser.add_argument("--error-rate", type=float, default=DEFAULT_ERROR_RATE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--baseline", type=Path, help="compare against the results saved in this file"
+    )
+    parser.add_argument(
+        "--save-baseline", type=Path, help="save the results to this file"
+    )
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument(
+        "--measure", nargs=2, metavar=("ENGINE", "FILE"), help=argparse.SUPPRESS
+    )
+    args = parser.parse_args()
+
+    if args.measure:
+        engine, path = args.measure
+        print(json.dumps(measure(engine, Path(path))))
+        return
+
+    baseline = None
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if (baseline["missing_rate"], baseline["error_rate"]) != (
+            args.missing_rate,
+            args.error_rate,
+        ):
+            parser.error("the baseline was measured with different rates")
+
+    results: dict[str, dict[str, float] | None] = {}
+    print(f"{'rows':>10} {'engine':>12} {'seconds':>10} {'rows/sec':>14} {'MB':>8}")
+    with tempfile.TemporaryDirectory() as tempdir:
+        for rows in args.sizes:
+            path = write_input_file(
+                Path(tempdir) / f"{rows}.tsv",
+                rows,
+                args.missing_rate,
+                args.error_rate,
+                args.seed,
+            )
+            for engine in args.engines:
+                key = f"{engine}/{rows}"
+                result = run_engine(engine, path)
+                if result is None:
+                    results[key] = None
+                    print(f"{rows:>10} {engine:>12} {'failed':>10}")
+                    continue
+                results[key] = {
+                    "rows_per_sec": round(rows / result["seconds"]),
+                    "peak_rss_mb": round(result["peak_rss_mb"], 1),
+                }
+                print(
+                    f"{rows:>10} {engine:>12} {result['seconds']:>10.3f} "
+                    f"{rows / result['seconds']:>14,.0f} {result['peak_rss_mb']:>8,.1f}"
+                )
+            path.unlink()
+
+    if args.save_baseline:
+        args.save_baseline.write_text(
+            json.dumps(
+                {
+                    "missing_rate": args.missing_rate,
+                    "error_rate": args.error_rate,
+                    "results": {
+                        key: result
+                        for key, result in results.items()
+                        if result is not None
+                    },
+                },
+                indent=2,
+            )
+            + "\n"
+        )
+
+    if baseline is not None:
+        regressions = find_regressions(results, baseline["results"], args.tolerance)
+        if regressions:
+            sys.exit(
+                "Regressions against the baseline:\n"
+                + "\n".join(f"  {regression}" for regression in regressions)
+            )
+        print("No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Generates synthetic microsatellite input files from the `MSAT_NAMES` panel for benchmarking.
+
+Run with `python benchmarks/generate_input_file.py OUTFILE --rows 100000 [--missing-rate 0.05] [--error-rate 0.001]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import typing
+from pathlib import Path
+
+from genetic_forensic_portal.app.utils import validate_input_file
+
+# Share of microsatellite values written as missing data (-999)
+DEFAULT_MISSING_RATE = 0.05
+
+# Share of lines holding an illegal microsatellite value
+DEFAULT_ERROR_RATE = 0.0
+
+# Number of distinct lines of values to draw from. Rendering every value of every line
+# in Python makes generating a 10M-row file take longer than validating it.
+POOL_SIZE = 4096
+
+# Values that fail validation, like those found in hand-edited files
+ILLEGAL_MSAT_VALUES = ["0", "301", "-1", "NA", "1.0", ""]
+
+
+def _render_values(
+    rng: random.Random, missing_rate: float, illegal_value: str | None = None
+) -> str:
+    values = [
+        str(validate_input_file.MISSING_MSAT_VALUE)
+        if rng.random() < missing_rate
+        else str(rng.randint(1, validate_input_file.MAX_MSAT_VALUE))
+        for _ in range(validate_input_file.MSATS)
+    ]
+    if illegal_value is not None:
+        values[rng.randrange(len(values))] = illegal_value
+    return "\t".join(values)
+
+
+def iter_input_lines(
+    rows: int,
+    missing_rate: float = DEFAULT_MISSING_RATE,
+    error_rate: float = DEFAULT_ERROR_RATE,
+    seed: int = 0,
+) -> typing.Iterator[str]:
+    """Yield the lines of an input file with `rows` data lines, two haplotypes per sample.
+
+    Args:
+        rows (int): The number of data lines to generate.
+        missing_rate (float): The share of microsatellite values written as missing data.
+        error_rate (float): The share of lines holding an illegal microsatellite value.
+        seed (int): The seed of the random number generator, so that files can be regenerated exactly.
+
+    Yields:
+        str: Each line of the file, header first, ending in a newline.
+    """
+    rng = random.Random(seed)
+    legal_pool = [_render_values(rng, missing_rate) for _ in range(POOL_SIZE)]
+    illegal_pool = [
+        _render_values(rng, missing_rate, rng.choice(ILLEGAL_MSAT_VALUES))
+        for _ in range(POOL_SIZE)
+    ]
+
+    yield "MatchID\t" + "\t".join(validate_input_file.MSAT_NAMES) + "\n"
+    for row in range(rows):
+        pool = illegal_pool if rng.random() < error_rate else legal_pool
+        yield f"sample{row // 2}\t{pool[rng.randrange(POOL_SIZE)]}\n"
+
+
+def write_input_file(
+    path: Path,
+    rows: int,
+    missing_rate: float = DEFAULT_MISSING_RATE,
+    error_rate: float = DEFAULT_ERROR_RATE,
+    seed: int = 0,
+) -> Path:
+    """Write an input file with `rows` data lines to `path`. See `iter_input_lines`.
+
+    Returns:
+        Path: The path written to.
+    """
+    with path.open("w", encoding="utf-8", newline="") as outfile:
+        outfile.writelines(iter_input_lines(rows, missing_rate, error_rate, seed))
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("outfile", type=Path)
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--missing-rate", type=float, default=DEFAULT_MISSING_RATE)
+    parser.add_argument("--error-rate", type=float, default=DEFAULT_ERROR_RATE)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    write_input_file(
+        args.outfile, args.rows, args.missing_rate, args.error_rate, args.seed
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -42,6 +42,22 @@ def tests(session: nox.Session) -> None:
     session.run("pytest", *session.posargs)
 
 
+@nox.session
+def bench(session: nox.Session) -> None:
+    """
+    Benchmark the input file validators against the stored baseline. Pass
+    "--save-baseline benchmarks/baseline.json" to update it.
+    """
+    session.install(".")
+    session.run(
+        "python",
+        "benchmarks/bench_validate_input_file.py",
+        "--baseline",
+        "benchmarks/baseline.json",
+        *session.posargs,
+    )
+
+
 @nox.session(reuse_venv=True)
 def docs(session: nox.Session) -> None:
     """
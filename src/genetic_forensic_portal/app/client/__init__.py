@@ -5,6 +5,6 @@ Right now, of course, these clients are largely simulating these interactions, b
 If the portal needs to call other services in the future, they would be added here.
 
 Current clients:
-- `gf_api_client`: A client that interacts with the genetic forensic API (but since one does not currently exist, it simulates these interactions but provides canned data).
+- `gf_api_client`: A client that interacts with the genetic forensic API (but since one does not currently exist, by default it simulates these interactions but provides canned data). How it reaches the API is up to one of the `backends`.
 - `keycloak_client`: A client that interacts with a local Keycloak instance to make auth decisions.
 """
@@ -0,0 +1,83 @@
+"""Contains the backends that `gf_api_client` uses to reach the genetic forensic API.
+
+`gf_api_client` checks what the current user may do and shapes the results for the pages; a backend only moves data. Which backend is used is chosen by the `GF_API_BACKEND` environment variable.
+
+Backends:
+- `base`: Contains the interface that every backend implements.
+- `chunked_upload`: Contains both sides of the protocol for uploading large samples in parts, resumably.
+- `canned_backend`: Serves the canned analyses in `resources/` without any network calls. The default.
+- `http_backend`: Calls a genetic forensic API over HTTP with a pooled keep-alive session.
+- `resilient_backend`: Wraps another backend to retry, hedge and fail fast on its reads. Turned on by the `GF_API_RESILIENT` environment variable.
+- `stub_server`: A local stand-in for the genetic forensic API that serves the canned analyses over HTTP, for testing and measuring the HTTP backend offline.
+"""
+
+from __future__ import annotations
+
+import os
+
+from .base import ANALYSIS_NOT_FOUND_ERROR, Artifact, Backend
+from .canned_backend import CannedBackend
+from .http_backend import HttpBackend
+from .resilient_backend import ResilienceCounter, ResilientBackend
+
+__all__ = [
+    "ANALYSIS_NOT_FOUND_ERROR",
+    "Artifact",
+    "Backend",
+    "CannedBackend",
+    "HttpBackend",
+    "ResilienceCounter",
+    "ResilientBackend",
+    "create_backend",
+]
+
+UNKNOWN_BACKEND_ERROR = "Unknown GF_API_BACKEND {backend!r}; expected one of {choices}"
+
+# Environment variables choosing the backend:
+BACKEND_ENV_VAR = "GF_API_BACKEND"
+API_URL_ENV_VAR = "GF_API_URL"
+RESILIENT_ENV_VAR = "GF_API_RESILIENT"
+
+CANNED_BACKEND = "canned"
+HTTP_BACKEND = "http"
+
+DEFAULT_API_URL = "http://localhost:8081/"
+
+# Values of `GF_API_RESILIENT` that turn the resilient backend on
+TRUE_VALUES = {"1", "true", "yes", "on"}
+
+
+def create_backend(
+    name: str | None = None,
+    api_url: str | None = None,
+    resilient: bool | None = None,
+) -> Backend:
+    """Create the backend named by `name`, or by the `GF_API_BACKEND` environment variable.
+
+    Args:
+        name (str | None): "canned" (the default) or "http".
+        api_url (str | None): The base URL of the API for the HTTP backend. Defaults to the `GF_API_URL` environment variable, then `DEFAULT_API_URL`.
+        resilient (bool | None): Whether to wrap the backend in a `ResilientBackend`. Defaults to the `GF_API_RESILIENT` environment variable, then False.
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    name = name or os.environ.get(BACKEND_ENV_VAR, CANNED_BACKEND)
+    if resilient is None:
+        resilient = os.environ.get(RESILIENT_ENV_VAR, "").lower() in TRUE_VALUES
+
+    backend: Backend
+    if name == CANNED_BACKEND:
+        backend = CannedBackend()
+    elif name == HTTP_BACKEND:
+        backend = HttpBackend(
+            api_url or os.environ.get(API_URL_ENV_VAR, DEFAULT_API_URL)
+        )
+    else:
+        raise ValueError(
+            UNKNOWN_BACKEND_ERROR.format(
+                backend=name, choices=[CANNED_BACKEND, HTTP_BACKEND]
+            )
+        )
+
+    return ResilientBackend(backend) if resilient else backend
@@ -0,0 +1,202 @@
+"""Contains the interface that every backend of `gf_api_client` implements."""
+
+from __future__ import annotations
+
+import abc
+import typing
+from collections.abc import Iterator, Sequence
+from enum import StrEnum
+from pathlib import Path
+
+from genetic_forensic_portal.app.client.models.analysis_filter import AnalysisFilter
+from genetic_forensic_portal.app.client.models.analysis_status import AnalysisStatus
+from genetic_forensic_portal.app.client.models.list_analyses_response import (
+    ListAnalysesResponse,
+)
+
+ANALYSIS_NOT_FOUND_ERROR = "Analysis not found"
+
+# Size of the pieces artifacts are streamed in
+ARTIFACT_CHUNK_SIZE = 64 * 1024
+
+
+class Artifact(StrEnum):
+    """The result files of an analysis that can be fetched from the API."""
+
+    SCAT_IMAGE = "scat"
+    SCAT_DATA = "scat-data"
+    VORONOI_IMAGE = "voronoi"
+    VORONOI_DATA = "voronoi-data"
+    FAMILIAL = "familial"
+
+    @property
+    def suffix(self) -> str:
+        """The file extension of the artifact."""
+        return ARTIFACT_SUFFIXES[self]
+
+
+ARTIFACT_SUFFIXES = {
+    Artifact.SCAT_IMAGE: ".png",
+    Artifact.SCAT_DATA: ".zip",
+    Artifact.VORONOI_IMAGE: ".png",
+    Artifact.VORONOI_DATA: ".zip",
+    Artifact.FAMILIAL: ".tsv",
+}
+
+
+class Backend(abc.ABC):
+    """The operations of the genetic forensic API.
+
+    Backends do not check permissions; callers must do that first. Every method that takes a sample ID raises FileNotFoundError with `ANALYSIS_NOT_FOUND_ERROR` if there is no such analysis, or it lacks the requested artifact. Every method that takes an upload ID raises FileNotFoundError if there is no such upload in progress.
+    """
+
+    @abc.abstractmethod
+    def upload_sample(
+        self,
+        data: typing.BinaryIO,
+        metadata: str | None,
+        content_hash: str,
+        content_encoding: str | None = None,
+    ) -> str:
+        """Upload a validated sample and return the UUID of the new analysis.
+
+        Args:
+            data (typing.BinaryIO): The sample data, positioned at its start. It is streamed, not read into memory.
+            metadata (str | None): The metadata to upload.
+            content_hash (str): The SHA-256 of the sample data, so that the API can store each distinct file once.
+            content_encoding (str | None): How the sample data is compressed, if it is.
+        """
+
+    @abc.abstractmethod
+    def start_upload(
+        self,
+        metadata: str | None,
+        content_hash: str,
+        size: int,
+        part_size: int,
+        content_encoding: str | None = None,
+    ) -> str:
+        """Start uploading a validated sample in parts, and return the ID of the upload.
+
+        Send the parts with `upload_part` (see `chunked_upload.send_parts`), then call `complete_upload`.
+
+        Args:
+            metadata (str | None): The metadata to upload.
+            content_hash (str): The SHA-256 of the whole sample, checked once the parts are joined.
+            size (int): The size of the sample in bytes.
+            part_size (int): The size of each part but the last.
+            content_encoding (str | None): How the sample data is compressed, if it is.
+        """
+
+    @abc.abstractmethod
+    def uploaded_parts(self, upload_id: str) -> set[int]:
+        """Return the numbers of the parts of an upload that the API has acknowledged.
+
+        Args:
+            upload_id (str): The upload, from `start_upload`.
+        """
+
+    @abc.abstractmethod
+    def upload_part(
+        self, upload_id: str, part_number: int, data: bytes, part_hash: str
+    ) -> None:
+        """Send one part of an upload. Sending a part again replaces it, so a part that may not have arrived can be resent.
+
+        Args:
+            upload_id (str): The upload, from `start_upload`.
+            part_number (int): The number of the part, counting from 0.
+            data (bytes): The part.
+            part_hash (str): The SHA-256 of the part, checked by the API.
+        """
+
+    @abc.abstractmethod
+    def complete_upload(self, upload_id: str) -> str:
+        """Finish an upload once all its parts are acknowledged, and return the UUID of the new analysis.
+
+        Args:
+            upload_id (str): The upload, from `start_upload`.
+        """
+
+    @abc.abstractmethod
+    def get_artifact(self, sample_id: str, artifact: Artifact) -> str:
+        """Fetch a result file of an analysis and return the path of a local copy of it.
+
+        Args:
+            sample_id (str): The UUID of the analysis.
+            artifact (Artifact): The result file to fetch.
+        """
+
+    def artifact_name(self, sample_id: str, artifact: Artifact) -> str:
+        """Return the file name a result file of an analysis is downloaded as, without fetching it.
+
+        Args:
+            sample_id (str): The UUID of the analysis.
+            artifact (Artifact): The result file to name.
+        """
+        return f"{sample_id}-{artifact}{artifact.suffix}"
+
+    def iter_artifact(
+        self, sample_id: str, artifact: Artifact, start: int = 0
+    ) -> Iterator[bytes]:
+        """Stream a result file of an analysis in chunks of up to `ARTIFACT_CHUNK_SIZE` bytes, so that it is never held in memory whole.
+
+        Nothing is fetched until the first chunk is asked for. By default the file is read from the local copy returned by `get_artifact`.
+
+        Args:
+            sample_id (str): The UUID of the analysis.
+            artifact (Artifact): The result file to stream.
+            start (int): The offset of the first byte to stream.
+        """
+        with Path(self.get_artifact(sample_id, artifact)).open("rb") as file:
+            file.seek(start)
+            while chunk := file.read(ARTIFACT_CHUNK_SIZE):
+                yield chunk
+
+    @abc.abstractmethod
+    def list_analyses(
+        self,
+        next_token: int,
+        page_size: int,
+        analysis_filter: AnalysisFilter | None = None,
+    ) -> ListAnalysesResponse:
+        """List a page of the UUIDs of the analyses that match a filter.
+
+        Analyses are filtered where they are stored, so only matching ones are returned. A page holds up to `page_size` of them, and its `next_token` is the position of the next matching analysis, or None if there are no more.
+
+        Args:
+            next_token (int): Where the page starts, from the `next_token` of the previous page.
+            page_size (int): The number of UUIDs in a full page.
+            analysis_filter (AnalysisFilter | None): The conditions the analyses must meet. None lists all analyses, whoever may view them. A backend that calls an API over the network sends the filter's `viewer_token` rather than its viewer, and the API decides from the token which analyses may be listed.
+
+        Raises:
+            PermissionError: If the API does not accept the viewer's access token, or was sent none.
+        """
+
+    @abc.abstractmethod
+    def get_analysis_status(self, sample_id: str) -> AnalysisStatus:
+        """Get the status of an analysis.
+
+        Args:
+            sample_id (str): The UUID of the analysis.
+        """
+
+    def get_analysis_statuses(
+        self, sample_ids: Sequence[str]
+    ) -> dict[str, AnalysisStatus]:
+        """Get the statuses of several analyses.
+
+        Backends that can fetch them in one request should override this; by default each status is fetched in turn. Analyses that do not exist are left out of the result.
+
+        Args:
+            sample_ids (Sequence[str]): The UUIDs of the analyses.
+        """
+        statuses = {}
+        for sample_id in sample_ids:
+            try:
+                statuses[sample_id] = self.get_analysis_status(sample_id)
+            except FileNotFoundError:
+                continue
+        return statuses
+
+    def close(self) -> None:  # noqa: B027
+        """Release any connections held by the backend."""
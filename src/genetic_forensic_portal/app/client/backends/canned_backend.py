@@ -0,0 +1,237 @@
+"""Contains the backend that serves the canned analyses in `resources/` without any network calls.
+
+This stands in for the genetic forensic API until it exists. It mimics the real API's behavior with hard-coded responses keyed by the sample "UUID"s in `constants`.
+"""
+
+from __future__ import annotations
+
+import typing
+from datetime import UTC, datetime
+from pathlib import Path
+
+from genetic_forensic_portal.app.client import keycloak_client as auth_client
+from genetic_forensic_portal.app.client.models.analysis_filter import AnalysisFilter
+from genetic_forensic_portal.app.client.models.analysis_status import AnalysisStatus
+from genetic_forensic_portal.app.client.models.list_analyses_response import (
+    ListAnalysesResponse,
+)
+from genetic_forensic_portal.app.common.constants import (
+    ANALYSIS_FAILED_UUID,
+    FAMILIAL_FILE_PARSE_ERROR_UUID,
+    IN_PROGRESS_UUID,
+    NO_METADATA_UUID,
+    NOT_AUTHORIZED_UUID,
+    NOT_FOUND_UUID,
+    SAMPLE_UUID,
+)
+
+from .base import ANALYSIS_NOT_FOUND_ERROR, Artifact, Backend
+from .chunked_upload import PartStore
+
+UUID_LIST = [
+    SAMPLE_UUID,
+    NO_METADATA_UUID,
+    NOT_FOUND_UUID,
+    NOT_AUTHORIZED_UUID,
+    IN_PROGRESS_UUID,
+    ANALYSIS_FAILED_UUID,
+    FAMILIAL_FILE_PARSE_ERROR_UUID,
+]
+
+# equivalent to ../../../resources
+SAMPLE_PATH = Path(__file__).parents[3] / "resources"
+
+SAMPLE_IMAGE_PATH = SAMPLE_PATH / "sample_images"
+SCAT_SAMPLE_IMAGE = str(SAMPLE_IMAGE_PATH / "tst_07-16_0.7t_scat_median.png")
+SCAT_SAMPLE_DATA_PATH = str(SAMPLE_IMAGE_PATH / "tst_07-16_scat.zip")
+SCAT_SAMPLE_IMAGE_2 = str(SAMPLE_IMAGE_PATH / "tst2_07-17_0.7t_scat_median.png")
+SCAT_SAMPLE_DATA_PATH_2 = str(SAMPLE_IMAGE_PATH / "tst2_07-17_scat.zip")
+
+# Add Voronoi sample image paths
+VORONOI_SAMPLE_IMAGE = str(SAMPLE_IMAGE_PATH / "tst_07-16_0.7t_voronoi_median.png")
+VORONOI_SAMPLE_DATA_PATH = str(SAMPLE_IMAGE_PATH / "tst_07-16_voronoi.zip")
+VORONOI_SAMPLE_IMAGE_2 = str(SAMPLE_IMAGE_PATH / "tst2_07-17_0.7t_voronoi_median.png")
+VORONOI_SAMPLE_DATA_PATH_2 = str(SAMPLE_IMAGE_PATH / "tst2_07-17_voronoi.zip")
+
+SAMPLE_DATA_PATH = SAMPLE_PATH / "sample_data"
+FAMILIAL_SAMPLE_DATA = str(SAMPLE_DATA_PATH / "sample_familial_matches.tsv")
+FAMILIAL_SAMPLE_DATA_2 = str(SAMPLE_DATA_PATH / "sample_familial_matches1.tsv")
+FAMILIAL_SAMPLE_DATA_ERRORS = str(
+    SAMPLE_DATA_PATH / "sample_familial_matches_errors.tsv"
+)
+
+# The result files of each canned analysis
+ARTIFACTS: dict[str, dict[Artifact, str]] = {
+    SAMPLE_UUID: {
+        Artifact.SCAT_IMAGE: SCAT_SAMPLE_IMAGE,
+        Artifact.SCAT_DATA: SCAT_SAMPLE_DATA_PATH,
+        Artifact.VORONOI_IMAGE: VORONOI_SAMPLE_IMAGE,
+        Artifact.VORONOI_DATA: VORONOI_SAMPLE_DATA_PATH,
+        Artifact.FAMILIAL: FAMILIAL_SAMPLE_DATA,
+    },
+    NO_METADATA_UUID: {
+        Artifact.SCAT_IMAGE: SCAT_SAMPLE_IMAGE_2,
+        Artifact.SCAT_DATA: SCAT_SAMPLE_DATA_PATH_2,
+        Artifact.VORONOI_IMAGE: VORONOI_SAMPLE_IMAGE_2,
+        Artifact.VORONOI_DATA: VORONOI_SAMPLE_DATA_PATH_2,
+        Artifact.FAMILIAL: FAMILIAL_SAMPLE_DATA_2,
+    },
+    IN_PROGRESS_UUID: {
+        # These can be any files that represent an in-progress state
+        Artifact.SCAT_IMAGE: SCAT_SAMPLE_IMAGE,
+        Artifact.SCAT_DATA: SCAT_SAMPLE_DATA_PATH,
+    },
+    FAMILIAL_FILE_PARSE_ERROR_UUID: {
+        Artifact.FAMILIAL: FAMILIAL_SAMPLE_DATA_ERRORS,
+    },
+}
+
+STATUSES = {
+    SAMPLE_UUID: AnalysisStatus.ANALYSIS_SUCCEEDED,
+    NO_METADATA_UUID: AnalysisStatus.ANALYSIS_SUCCEEDED,
+    IN_PROGRESS_UUID: AnalysisStatus.ANALYSIS_IN_PROGRESS,
+    ANALYSIS_FAILED_UUID: AnalysisStatus.ANALYSIS_FAILED,
+}
+
+SUBMITTED_AT = {
+    SAMPLE_UUID: datetime(2024, 7, 16, 9, 30, tzinfo=UTC),
+    NO_METADATA_UUID: datetime(2024, 7, 17, 14, 5, tzinfo=UTC),
+    NOT_AUTHORIZED_UUID: datetime(2024, 7, 18, 11, 0, tzinfo=UTC),
+    IN_PROGRESS_UUID: datetime(2024, 8, 1, 16, 45, tzinfo=UTC),
+    ANALYSIS_FAILED_UUID: datetime(2024, 8, 2, 8, 15, tzinfo=UTC),
+    FAMILIAL_FILE_PARSE_ERROR_UUID: datetime(2024, 8, 5, 10, 20, tzinfo=UTC),
+}
+
+
+def _matches(sample_id: str, analysis_filter: AnalysisFilter) -> bool:
+    if (
+        analysis_filter.status is not None
+        and STATUSES.get(sample_id) != analysis_filter.status
+    ):
+        return False
+
+    if analysis_filter.owner is not None:
+        # the mock authorization data doubles as the record of who owns each analysis
+        permissions = auth_client.MOCK_RESOURCE_ACCESS_CONTROL.get(sample_id)
+        if permissions is None or permissions.analysis_owner != analysis_filter.owner:
+            return False
+
+    if analysis_filter.submitted_after is not None:
+        submitted_at = SUBMITTED_AT.get(sample_id)
+        if submitted_at is None or submitted_at <= analysis_filter.submitted_after:
+            return False
+
+    return True
+
+
+class CannedBackend(Backend):
+    """Serves the canned analyses in `resources/`.
+
+    Uploads in parts are kept on disk until they are complete, so that resuming them works like it would against the real API.
+    """
+
+    def __init__(self) -> None:
+        self.uploads = PartStore()
+
+    def upload_sample(
+        self,
+        data: typing.BinaryIO,  # noqa: ARG002
+        metadata: str | None,
+        content_hash: str,  # noqa: ARG002
+        content_encoding: str | None = None,  # noqa: ARG002
+    ) -> str:
+        # The canned API stores nothing, and only shows whether metadata was sent
+        return SAMPLE_UUID if metadata is not None else NO_METADATA_UUID
+
+    def start_upload(
+        self,
+        metadata: str | None,
+        content_hash: str,
+        size: int,
+        part_size: int,
+        content_encoding: str | None = None,
+    ) -> str:
+        return self.uploads.start(
+            metadata, content_hash, size, part_size, content_encoding
+        )
+
+    def uploaded_parts(self, upload_id: str) -> set[int]:
+        return self.uploads.acknowledged(upload_id)
+
+    def upload_part(
+        self, upload_id: str, part_number: int, data: bytes, part_hash: str
+    ) -> None:
+        self.uploads.put(upload_id, part_number, data, part_hash)
+
+    def complete_upload(self, upload_id: str) -> str:
+        return self.uploads.complete(upload_id, self.upload_sample)
+
+    def get_artifact(self, sample_id: str, artifact: Artifact) -> str:
+        # In the real implementation, the data returned would probably live in
+        #    some sort of blob storage system -- like S3 or Azure Blob Storage.
+        # In that case, the actual API call would return a URL to the data with
+        #    particular, temporary access associated with it.
+        # With S3, this would be a pre-signed URL:
+        #    https://docs.aws.amazon.com/AmazonS3/latest/userguide/ShareObjectPreSignedURL.html
+        # With Azure Blob Storage, this would be an SAS token:
+        #    https://docs.microsoft.com/en-us/azure/storage/common/storage-sas-overview
+        path = ARTIFACTS.get(sample_id, {}).get(artifact)
+        if path is None:
+            raise FileNotFoundError(ANALYSIS_NOT_FOUND_ERROR)
+        return path
+
+    def artifact_name(self, sample_id: str, artifact: Artifact) -> str:
+        # keep the names of the canned files, which say what they hold
+        path = ARTIFACTS.get(sample_id, {}).get(artifact)
+        if path is None:
+            raise FileNotFoundError(ANALYSIS_NOT_FOUND_ERROR)
+        return Path(path).name
+
+    def list_analyses(
+        self,
+        next_token: int,
+        page_size: int,
+        analysis_filter: AnalysisFilter | None = None,
+    ) -> ListAnalysesResponse:
+        # check for out of bounds
+        if next_token >= len(UUID_LIST):
+            return ListAnalysesResponse([])
+
+        start_token = max(next_token, 0)
+        if analysis_filter is None:
+            end_token = min(start_token + page_size, len(UUID_LIST))
+            return ListAnalysesResponse(
+                UUID_LIST[start_token:end_token],
+                start_token=start_token,
+                next_token=end_token if end_token < len(UUID_LIST) else None,
+            )
+
+        view_access = None
+        if analysis_filter.viewer is not None:
+            view_access = auth_client.check_bulk_view_access(
+                analysis_filter.viewer,
+                analysis_filter.viewer_roles,
+                UUID_LIST[start_token:],
+            )
+
+        analyses: list[str] = []
+        for position in range(start_token, len(UUID_LIST)):
+            sample_id = UUID_LIST[position]
+            if view_access is not None and not view_access[sample_id]:
+                continue
+            if not _matches(sample_id, analysis_filter):
+                continue
+            if len(analyses) == page_size:
+                # the page is full; the next one starts at this analysis
+                return ListAnalysesResponse(
+                    analyses, start_token=start_token, next_token=position
+                )
+            analyses.append(sample_id)
+
+        return ListAnalysesResponse(analyses, start_token=start_token)
+
+    def get_analysis_status(self, sample_id: str) -> AnalysisStatus:
+        status = STATUSES.get(sample_id)
+        if status is None:
+            raise FileNotFoundError(ANALYSIS_NOT_FOUND_ERROR)
+        return status
@@ -0,0 +1,351 @@
+"""Contains both sides of the protocol for uploading large samples in parts.
+
+A large sample is sent as fixed-size parts, each with its own SHA-256, and the API joins them and checks the SHA-256 of the whole once every part has arrived. Parts are sent a few at a time in parallel. The API remembers which parts it has acknowledged, so an upload that is cut off is resumed by sending only the parts it is missing rather than starting over.
+
+`send_parts` is the client side, and `PartStore` keeps the parts on the API's side for backends without a real API.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import shutil
+import tempfile
+import threading
+import time
+import typing
+import uuid
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+
+if typing.TYPE_CHECKING:
+    from .base import Backend
+
+# Size of each part but the last
+DEFAULT_PART_SIZE = 8 * 2**20
+
+# Size of the pieces stored parts are read in when they are joined
+READ_CHUNK_SIZE = 64 * 1024
+
+# Number of parts sent at once
+DEFAULT_PART_WORKERS = 4
+
+# Number of times an upload that is cut off is resumed before its error is raised
+DEFAULT_MAX_RESUMES = 3
+
+# Seconds an upload is kept for after its last part arrived, before it is taken to be abandoned and its parts are removed
+DEFAULT_UPLOAD_TTL = 24 * 60 * 60.0
+
+# Prefix of the directories the parts of each upload are kept in
+UPLOAD_DIR_PREFIX = "gf-upload-"
+
+# Errors that mean a part may not have arrived, and sending it again may work
+RESUMABLE_ERRORS = (ConnectionError, TimeoutError)
+
+# Error constants:
+UNKNOWN_UPLOAD_ERROR = "No such upload: {upload_id}"
+PART_OUT_OF_RANGE_ERROR = "Upload has parts 0 to {last}, not {part}"
+PART_SIZE_ERROR = "Part {part} should be {expected} bytes but is {actual}"
+PART_HASH_MISMATCH = "Part {part} does not match its SHA-256"
+MISSING_PARTS_ERROR = "Upload is missing parts {parts}"
+UPLOAD_HASH_MISMATCH = "Joined parts do not match the SHA-256 of the upload"
+
+logger = logging.getLogger(__name__)
+
+
+def part_count(size: int, part_size: int) -> int:
+    """Return the number of parts a file of `size` bytes is sent in. An empty file is still sent as one empty part."""
+    return max(-(-size // part_size), 1)
+
+
+def part_hash(data: bytes) -> str:
+    """Return the SHA-256 that a part is sent with."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def send_parts(
+    backend: Backend,
+    upload_id: str,
+    data: typing.BinaryIO,
+    size: int,
+    part_size: int = DEFAULT_PART_SIZE,
+    max_workers: int = DEFAULT_PART_WORKERS,
+    max_resumes: int = DEFAULT_MAX_RESUMES,
+) -> None:
+    """Send the parts of an upload that the API has not yet acknowledged.
+
+    Parts are read from `data` only as workers are free to send them, so at most `2 * max_workers` parts are held in memory. If sending is cut off by a transient error, the API is asked which parts it has and only the rest are sent again, up to `max_resumes` times.
+
+    Args:
+        backend (Backend): The backend to send the parts through.
+        upload_id (str): The upload, from `Backend.start_upload`.
+        data (typing.BinaryIO): The whole file being uploaded. It must be seekable.
+        size (int): The size of the file in bytes.
+        part_size (int): The size of each part but the last, as given to `Backend.start_upload`.
+        max_workers (int): The number of parts to send at once.
+        max_resumes (int): The number of times to resume after a transient error.
+
+    Raises:
+        ConnectionError: If the API could still not be reached after `max_resumes` resumptions.
+        TimeoutError: If the API still did not respond in time after `max_resumes` resumptions.
+    """
+    resumes = 0
+    while True:
+        acknowledged = backend.uploaded_parts(upload_id)
+        missing = [
+            part
+            for part in range(part_count(size, part_size))
+            if part not in acknowledged
+        ]
+        try:
+            _send_missing_parts(
+                backend, upload_id, data, part_size, missing, max_workers
+            )
+            return
+        except RESUMABLE_ERRORS:
+            if resumes >= max_resumes:
+                raise
+            resumes += 1
+            logger.warning(
+                "Upload %s was cut off; resuming (%d of %d)",
+                upload_id,
+                resumes,
+                max_resumes,
+            )
+
+
+def _send_missing_parts(
+    backend: Backend,
+    upload_id: str,
+    data: typing.BinaryIO,
+    part_size: int,
+    parts: list[int],
+    max_workers: int,
+) -> None:
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="gf-upload"
+    ) as executor:
+        in_flight: set[Future[None]] = set()
+        for part in parts:
+            # wait for a part to be sent before reading more, to bound memory
+            if len(in_flight) >= 2 * max_workers:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+
+            data.seek(part * part_size)
+            chunk = data.read(part_size)
+            in_flight.add(
+                executor.submit(
+                    backend.upload_part, upload_id, part, chunk, part_hash(chunk)
+                )
+            )
+
+        for future in in_flight:
+            future.result()
+
+
+class _Upload:
+    def __init__(
+        self,
+        metadata: str | None,
+        content_hash: str,
+        size: int,
+        part_size: int,
+        content_encoding: str | None,
+        directory: Path,
+        last_active: float,
+    ):
+        self.metadata = metadata
+        self.content_hash = content_hash
+        self.size = size
+        self.part_size = part_size
+        self.content_encoding = content_encoding
+        self.directory = directory
+        self.last_active = last_active
+        self.parts: set[int] = set()
+
+    @property
+    def part_count(self) -> int:
+        return part_count(self.size, self.part_size)
+
+    def expected_size(self, part: int) -> int:
+        if part < self.part_count - 1:
+            return self.part_size
+        return self.size - part * self.part_size
+
+
+class PartStore:
+    """Keeps the parts of uploads in progress on disk until every part has arrived.
+
+    An upload that no part has arrived for in `max_age` seconds is taken to be abandoned, and its parts are removed the next time an upload starts. So are the parts left behind by a store that was not closed cleanly, such as one in a process that was killed. The store is safe to share between threads.
+
+    Args:
+        directory (Path | str | None): The directory to keep parts in. Defaults to the system's temporary directory.
+        max_age (float): Seconds an upload is kept for after its last part arrived.
+        clock (Callable[[], float]): Returns the current time in seconds since the epoch, to compare with the modification times of part directories. Defaults to `time.time`.
+    """
+
+    def __init__(
+        self,
+        directory: Path | str | None = None,
+        max_age: float = DEFAULT_UPLOAD_TTL,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.directory = directory
+        self.max_age = max_age
+        self._clock = clock
+        self._uploads: dict[str, _Upload] = {}
+        self._lock = threading.Lock()
+
+    def start(
+        self,
+        metadata: str | None,
+        content_hash: str,
+        size: int,
+        part_size: int,
+        content_encoding: str | None = None,
+    ) -> str:
+        """Start an upload and return its ID, first removing the parts of abandoned uploads."""
+        self.sweep()
+        upload_id = uuid.uuid4().hex
+        directory = Path(tempfile.mkdtemp(prefix=UPLOAD_DIR_PREFIX, dir=self.directory))
+        with self._lock:
+            self._uploads[upload_id] = _Upload(
+                metadata,
+                content_hash,
+                size,
+                part_size,
+                content_encoding,
+                directory,
+                self._clock(),
+            )
+        return upload_id
+
+    def sweep(self) -> None:
+        """Remove the parts of uploads that no part has arrived for in `max_age` seconds, including those of other stores sharing the directory."""
+        expired_at = self._clock() - self.max_age
+        with self._lock:
+            abandoned = [
+                upload_id
+                for upload_id, upload in self._uploads.items()
+                if upload.last_active < expired_at
+            ]
+            active = {upload.directory for upload in self._uploads.values()}
+        for upload_id in abandoned:
+            logger.info("Removing abandoned upload %s", upload_id)
+            self._forget(upload_id)
+
+        # directories no store in this process knows of, left behind by a process that stopped
+        directory = Path(self.directory or tempfile.gettempdir())
+        for entry in directory.glob(f"{UPLOAD_DIR_PREFIX}*"):
+            if entry in active:
+                continue
+            try:
+                if entry.is_dir() and entry.stat().st_mtime < expired_at:
+                    logger.info("Removing abandoned upload parts in %s", entry)
+                    shutil.rmtree(entry, ignore_errors=True)
+            except FileNotFoundError:
+                continue  # removed by another store
+
+    def acknowledged(self, upload_id: str) -> set[int]:
+        """Return the numbers of the parts of an upload that have arrived.
+
+        Raises:
+            FileNotFoundError: If there is no such upload.
+        """
+        with self._lock:
+            return set(self._get(upload_id).parts)
+
+    def put(self, upload_id: str, part: int, data: bytes, data_hash: str) -> None:
+        """Keep a part of an upload. Sending a part again replaces it.
+
+        Raises:
+            FileNotFoundError: If there is no such upload.
+            ValueError: If the part is not one of the upload's, is the wrong size, or does not match `data_hash`.
+        """
+        with self._lock:
+            upload = self._get(upload_id)
+        if not 0 <= part < upload.part_count:
+            raise ValueError(
+                PART_OUT_OF_RANGE_ERROR.format(last=upload.part_count - 1, part=part)
+            )
+        if len(data) != upload.expected_size(part):
+            raise ValueError(
+                PART_SIZE_ERROR.format(
+                    part=part, expected=upload.expected_size(part), actual=len(data)
+                )
+            )
+        if part_hash(data) != data_hash:
+            raise ValueError(PART_HASH_MISMATCH.format(part=part))
+
+        # write then rename, so that a part is only acknowledged once it is whole
+        part_path = upload.directory / f"{part}.part"
+        partial_path = part_path.with_suffix(f".{threading.get_ident()}.partial")
+        partial_path.write_bytes(data)
+        partial_path.replace(part_path)
+        with self._lock:
+            upload.parts.add(part)
+            upload.last_active = self._clock()
+
+    def complete(
+        self,
+        upload_id: str,
+        send: Callable[[typing.BinaryIO, str | None, str, str | None], str],
+    ) -> str:
+        """Join the parts of an upload, check them against the SHA-256 of the whole, and hand the file to `send`.
+
+        The upload is forgotten once `send` returns or the joined parts do not match.
+
+        Args:
+            upload_id (str): The upload to complete.
+            send (Callable): Called with the joined file, the metadata, the SHA-256 and the content encoding of the upload, like `Backend.upload_sample`, and returns the UUID of the new analysis.
+
+        Returns:
+            str: The UUID returned by `send`.
+
+        Raises:
+            FileNotFoundError: If there is no such upload.
+            ValueError: If parts are missing, or the joined parts do not match the SHA-256 of the upload.
+        """
+        with self._lock:
+            upload = self._get(upload_id)
+        missing = sorted(set(range(upload.part_count)) - upload.parts)
+        if missing:
+            raise ValueError(MISSING_PARTS_ERROR.format(parts=missing))
+
+        with tempfile.TemporaryFile(dir=self.directory) as joined:
+            digest = hashlib.sha256()
+            for part in range(upload.part_count):
+                with (upload.directory / f"{part}.part").open("rb") as part_file:
+                    while chunk := part_file.read(READ_CHUNK_SIZE):
+                        digest.update(chunk)
+                        joined.write(chunk)
+
+            if digest.hexdigest() != upload.content_hash:
+                self._forget(upload_id)
+                raise ValueError(UPLOAD_HASH_MISMATCH)
+
+            joined.seek(0)
+            sample_id = send(
+                typing.cast(typing.BinaryIO, joined),
+                upload.metadata,
+                upload.content_hash,
+                upload.content_encoding,
+            )
+
+        self._forget(upload_id)
+        return sample_id
+
+    def _get(self, upload_id: str) -> _Upload:
+        upload = self._uploads.get(upload_id)
+        if upload is None:
+            raise FileNotFoundError(UNKNOWN_UPLOAD_ERROR.format(upload_id=upload_id))
+        return upload
+
+    def _forget(self, upload_id: str) -> None:
+        with self._lock:
+            upload = self._uploads.pop(upload_id, None)
+        if upload is not None:
+            shutil.rmtree(upload.directory, ignore_errors=True)
@@ -0,0 +1,456 @@
+"""Contains the backend that calls a genetic forensic API over HTTP.
+
+All requests share one `requests.Session`, so connections are kept alive and reused instead of being opened for every call. The session's connection pool holds at most `pool_maxsize` connections to each host, and a caller that finds them all busy waits for one to be free rather than opening more.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import shutil
+import tempfile
+import threading
+import typing
+from collections.abc import Iterator, Sequence
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import quote, urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from genetic_forensic_portal.app.client.models.analysis_filter import AnalysisFilter
+from genetic_forensic_portal.app.client.models.analysis_status import AnalysisStatus
+from genetic_forensic_portal.app.client.models.list_analyses_response import (
+    ListAnalysesResponse,
+)
+
+from .base import ANALYSIS_NOT_FOUND_ERROR, ARTIFACT_CHUNK_SIZE, Artifact, Backend
+
+# Routes of the API, relative to its base URL:
+SAMPLES_ROUTE = "samples"
+ANALYSES_ROUTE = "analyses"
+ANALYSIS_STATUS_ROUTE = "analyses/{sample_id}/status"
+ANALYSIS_STATUSES_ROUTE = "analyses/statuses"
+UPLOADS_ROUTE = "uploads"
+UPLOAD_ROUTE = "uploads/{upload_id}"
+UPLOAD_PART_ROUTE = "uploads/{upload_id}/parts/{part_number}"
+UPLOAD_COMPLETE_ROUTE = "uploads/{upload_id}/complete"
+ANALYSIS_ARTIFACT_ROUTE = "analyses/{sample_id}/artifacts/{artifact}"
+
+# Request headers:
+CONTENT_HASH_HEADER = "X-Content-SHA256"
+CONTENT_ENCODING_HEADER = "Content-Encoding"
+CONTENT_TYPE_HEADER = "Content-Type"
+AUTHORIZATION_HEADER = "Authorization"
+RANGE_HEADER = "Range"
+IF_NONE_MATCH_HEADER = "If-None-Match"
+IF_MODIFIED_SINCE_HEADER = "If-Modified-Since"
+
+# Response headers:
+ETAG_HEADER = "ETag"
+LAST_MODIFIED_HEADER = "Last-Modified"
+
+# Media types of compressed samples whose format is not an HTTP content-coding, so is sent as the type of the body rather than its Content-Encoding
+ARCHIVE_CONTENT_TYPES = {"zip": "application/zip"}
+
+# Error constants:
+API_UNAVAILABLE_ERROR = "Genetic forensic API is unavailable: {error}"
+API_TIMEOUT_ERROR = "Genetic forensic API did not respond in time: {error}"
+API_REQUEST_ERROR = "Genetic forensic API rejected the request with status {status}"
+API_UNAUTHORIZED_ERROR = "Genetic forensic API did not accept the access token"
+
+# Seconds to wait for a connection to be made, and then for each read of the response
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 30.0
+
+# Number of hosts to keep a connection pool for, and connections kept open to each
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 16
+
+# Size of the pieces artifacts are written to disk in as they download
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Number of times a streamed artifact that is cut off is resumed from where it stopped before its error is raised
+DEFAULT_STREAM_RESUMES = 3
+
+logger = logging.getLogger(__name__)
+
+
+def filter_params(analysis_filter: AnalysisFilter) -> dict[str, str | list[str]]:
+    """Encode a filter as the query parameters of a request to list analyses."""
+    params: dict[str, str | list[str]] = {}
+    if analysis_filter.status is not None:
+        params["status"] = analysis_filter.status.value
+    if analysis_filter.owner is not None:
+        params["owner"] = analysis_filter.owner
+    if analysis_filter.submitted_after is not None:
+        params["submitted_after"] = analysis_filter.submitted_after.isoformat()
+    return params
+
+
+def authorization_headers(analysis_filter: AnalysisFilter) -> dict[str, str]:
+    """Encode the access token of a filter's viewer as the headers of a request to list analyses.
+
+    The viewer and their roles are not sent, as the API derives them from the token rather than trusting the caller's word for them."""
+    if analysis_filter.viewer_token is None:
+        return {}
+    return {AUTHORIZATION_HEADER: f"Bearer {analysis_filter.viewer_token}"}
+
+
+def parse_authorization_header(authorization: str | None) -> str | None:
+    """Decode the bearer access token of a request from its Authorization header, as encoded by `authorization_headers`."""
+    if authorization is None:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return None
+    return token.strip()
+
+
+def parse_filter_params(query: dict[str, list[str]]) -> AnalysisFilter | None:
+    """Decode the filter of a request to list analyses from its query parameters, as parsed by `urllib.parse.parse_qs`. The filter has no viewer; see `parse_authorization_header`.
+
+    Raises:
+        ValueError: If a parameter is malformed."""
+
+    def last(name: str) -> str | None:
+        values = query.get(name)
+        return values[-1] if values else None
+
+    status = last("status")
+    owner = last("owner")
+    submitted_after = last("submitted_after")
+    if status is None and owner is None and submitted_after is None:
+        return None
+
+    return AnalysisFilter(
+        status=None if status is None else AnalysisStatus(status),
+        owner=owner,
+        submitted_after=(
+            None if submitted_after is None else datetime.fromisoformat(submitted_after)
+        ),
+    )
+
+
+def encoding_headers(content_encoding: str | None) -> dict[str, str]:
+    """Encode how an uploaded sample is compressed as the headers of its request.
+
+    gzip and zstd are HTTP content-codings, so are sent as the Content-Encoding, while a zip archive is a media type of its own, so is sent as the Content-Type with no Content-Encoding."""
+    if content_encoding is None:
+        return {}
+    if content_encoding in ARCHIVE_CONTENT_TYPES:
+        return {CONTENT_TYPE_HEADER: ARCHIVE_CONTENT_TYPES[content_encoding]}
+    return {CONTENT_ENCODING_HEADER: content_encoding}
+
+
+def parse_encoding_headers(
+    content_type: str | None, content_encoding: str | None
+) -> str | None:
+    """Decode how an uploaded sample is compressed from the Content-Type and Content-Encoding headers of its request, as encoded by `encoding_headers`."""
+    for archive_encoding, archive_type in ARCHIVE_CONTENT_TYPES.items():
+        if content_type == archive_type:
+            return archive_encoding
+    return content_encoding
+
+
+def _artifact_name(sample_id: str, artifact: Artifact) -> str:
+    return f"{quote(sample_id, safe='')}-{artifact}{artifact.suffix}"
+
+
+def _file_size(response: requests.Response) -> int | None:
+    """Return the size of the whole file a response holds all or part of, if the API said."""
+    content_range = response.headers.get("Content-Range")
+    if content_range is not None:
+        # "bytes <first>-<last>/<size>", where the size may be "*" if unknown
+        size = content_range.rpartition("/")[2]
+        return int(size) if size.isdigit() else None
+    content_length = response.headers.get("Content-Length")
+    return int(content_length) if content_length is not None else None
+
+
+@contextlib.contextmanager
+def _transport_errors() -> Iterator[None]:
+    """Raise the failures of `requests` to send a request or read its response as builtin exceptions."""
+    try:
+        yield
+    except requests.Timeout as e:
+        raise TimeoutError(API_TIMEOUT_ERROR.format(error=e)) from e
+    except (requests.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+        raise ConnectionError(API_UNAVAILABLE_ERROR.format(error=e)) from e
+
+
+class HttpBackend(Backend):
+    """Calls a genetic forensic API over HTTP.
+
+    Artifacts are downloaded into `artifact_dir` and their local paths returned, so callers can treat them like the canned backend's files. The ETag and Last-Modified of each download are kept with it, and fetching the artifact again asks the API to send it only if it has changed, so an unchanged artifact is never transferred twice and its local copy is left untouched.
+
+    Args:
+        api_url (str): The base URL of the API.
+        connect_timeout (float): Seconds to wait for a connection to be made.
+        read_timeout (float): Seconds to wait for each read of a response.
+        pool_connections (int): The number of hosts to keep a connection pool for.
+        pool_maxsize (int): The number of connections to keep open to each host.
+        artifact_dir (Path | str | None): The directory to download artifacts into. Defaults to a new temporary directory, removed on `close`.
+        stream_resumes (int): The number of times a streamed artifact that is cut off is resumed with a range request.
+    """
+
+    def __init__(
+        self,
+        api_url: str,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        artifact_dir: Path | str | None = None,
+        stream_resumes: int = DEFAULT_STREAM_RESUMES,
+    ):
+        # urljoin drops the last path segment of a base URL without a trailing slash
+        self.api_url = api_url if api_url.endswith("/") else api_url + "/"
+        self.timeout = (connect_timeout, read_timeout)
+        self.stream_resumes = stream_resumes
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=True,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._owns_artifact_dir = artifact_dir is None
+        self.artifact_dir = Path(
+            tempfile.mkdtemp(prefix="gf-artifacts-")
+            if artifact_dir is None
+            else artifact_dir
+        )
+        self.artifact_dir.mkdir(parents=True, exist_ok=True)
+
+        # maps the URL of each downloaded artifact to the ETag and Last-Modified of its local copy
+        self._artifact_validators: dict[str, tuple[str | None, str | None]] = {}
+        self._artifact_lock = threading.Lock()
+
+    def upload_sample(
+        self,
+        data: typing.BinaryIO,
+        metadata: str | None,
+        content_hash: str,
+        content_encoding: str | None = None,
+    ) -> str:
+        headers = {
+            CONTENT_HASH_HEADER: content_hash,
+            **encoding_headers(content_encoding),
+        }
+        params = {} if metadata is None else {"metadata": metadata}
+
+        # a file-like body is streamed by requests rather than read into memory
+        response = self._request(
+            "POST", SAMPLES_ROUTE, data=data, headers=headers, params=params
+        )
+        uuid: str = response.json()["uuid"]
+        return uuid
+
+    def start_upload(
+        self,
+        metadata: str | None,
+        content_hash: str,
+        size: int,
+        part_size: int,
+        content_encoding: str | None = None,
+    ) -> str:
+        response = self._request(
+            "POST",
+            UPLOADS_ROUTE,
+            json={
+                "metadata": metadata,
+                "content_hash": content_hash,
+                "size": size,
+                "part_size": part_size,
+                "content_encoding": content_encoding,
+            },
+        )
+        upload_id: str = response.json()["upload_id"]
+        return upload_id
+
+    def uploaded_parts(self, upload_id: str) -> set[int]:
+        route = UPLOAD_ROUTE.format(upload_id=quote(upload_id, safe=""))
+        return set(self._request("GET", route).json()["parts"])
+
+    def upload_part(
+        self, upload_id: str, part_number: int, data: bytes, part_hash: str
+    ) -> None:
+        route = UPLOAD_PART_ROUTE.format(
+            upload_id=quote(upload_id, safe=""), part_number=part_number
+        )
+        self._request(
+            "PUT", route, data=data, headers={CONTENT_HASH_HEADER: part_hash}
+        ).close()
+
+    def complete_upload(self, upload_id: str) -> str:
+        route = UPLOAD_COMPLETE_ROUTE.format(upload_id=quote(upload_id, safe=""))
+        uuid: str = self._request("POST", route).json()["uuid"]
+        return uuid
+
+    def get_artifact(self, sample_id: str, artifact: Artifact) -> str:
+        path = self.artifact_dir / _artifact_name(sample_id, artifact)
+        route = ANALYSIS_ARTIFACT_ROUTE.format(
+            sample_id=quote(sample_id, safe=""), artifact=artifact
+        )
+        url = urljoin(self.api_url, route)
+
+        headers = {}
+        with self._artifact_lock:
+            etag, last_modified = self._artifact_validators.get(url, (None, None))
+            if not path.exists():
+                etag = last_modified = None
+        if etag is not None:
+            headers[IF_NONE_MATCH_HEADER] = etag
+        if last_modified is not None:
+            headers[IF_MODIFIED_SINCE_HEADER] = last_modified
+
+        with self._request("GET", route, stream=True, headers=headers) as response:
+            if response.status_code == requests.codes.not_modified:
+                return str(path)
+
+            # download next to the target and rename, so that readers never see a partial file
+            with tempfile.NamedTemporaryFile(
+                dir=self.artifact_dir, delete=False
+            ) as partial:
+                try:
+                    with _transport_errors():
+                        for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                            partial.write(chunk)
+                except OSError:
+                    Path(partial.name).unlink()
+                    raise
+
+            # replace the file and its validators together, so that they always match
+            with self._artifact_lock:
+                Path(partial.name).replace(path)
+                self._artifact_validators[url] = (
+                    response.headers.get(ETAG_HEADER),
+                    response.headers.get(LAST_MODIFIED_HEADER),
+                )
+
+        return str(path)
+
+    def iter_artifact(
+        self, sample_id: str, artifact: Artifact, start: int = 0
+    ) -> Iterator[bytes]:
+        route = ANALYSIS_ARTIFACT_ROUTE.format(
+            sample_id=quote(sample_id, safe=""), artifact=artifact
+        )
+
+        offset = start
+        size = None
+        resumes = 0
+        while size is None or offset < size:
+            headers = {RANGE_HEADER: f"bytes={offset}-"} if offset else {}
+            try:
+                with self._request(
+                    "GET", route, stream=True, headers=headers
+                ) as response:
+                    size = _file_size(response)
+                    # an API that ignores ranges sends the whole file, so skip what was already streamed
+                    skip = (
+                        0
+                        if response.status_code == requests.codes.partial_content
+                        else offset
+                    )
+                    with _transport_errors():
+                        for chunk in response.iter_content(ARTIFACT_CHUNK_SIZE):
+                            unseen = chunk[min(skip, len(chunk)) :]
+                            skip -= len(chunk) - len(unseen)
+                            if unseen:
+                                offset += len(unseen)
+                                yield unseen
+                return
+            except ConnectionError:
+                if resumes >= self.stream_resumes:
+                    raise
+                resumes += 1
+                logger.warning(
+                    "Stream of %s %s was cut off at byte %d; resuming (%d of %d)",
+                    sample_id,
+                    artifact,
+                    offset,
+                    resumes,
+                    self.stream_resumes,
+                )
+
+    def list_analyses(
+        self,
+        next_token: int,
+        page_size: int,
+        analysis_filter: AnalysisFilter | None = None,
+    ) -> ListAnalysesResponse:
+        params: dict[str, typing.Any] = {
+            "next_token": next_token,
+            "page_size": page_size,
+        }
+        headers: dict[str, str] = {}
+        if analysis_filter is not None:
+            params.update(filter_params(analysis_filter))
+            headers.update(authorization_headers(analysis_filter))
+        response = self._request("GET", ANALYSES_ROUTE, params=params, headers=headers)
+        page = response.json()
+        return ListAnalysesResponse(
+            page["analyses"],
+            start_token=page["start_token"],
+            next_token=page["next_token"],
+        )
+
+    def get_analysis_status(self, sample_id: str) -> AnalysisStatus:
+        route = ANALYSIS_STATUS_ROUTE.format(sample_id=quote(sample_id, safe=""))
+        return AnalysisStatus(self._request("GET", route).json()["status"])
+
+    def get_analysis_statuses(
+        self, sample_ids: Sequence[str]
+    ) -> dict[str, AnalysisStatus]:
+        # the IDs go in the body, since hundreds of them would not fit in a URL
+        response = self._request(
+            "POST", ANALYSIS_STATUSES_ROUTE, json={"sample_ids": list(sample_ids)}
+        )
+        return {
+            sample_id: AnalysisStatus(status)
+            for sample_id, status in response.json()["statuses"].items()
+        }
+
+    def close(self) -> None:
+        self.session.close()
+        if self._owns_artifact_dir:
+            shutil.rmtree(self.artifact_dir, ignore_errors=True)
+
+    def _request(
+        self, method: str, route: str, **kwargs: typing.Any
+    ) -> requests.Response:
+        """Send a request to the API, raising builtin exceptions for failures.
+
+        Raises:
+            FileNotFoundError: If the API has no such resource, or will not show it.
+            PermissionError: If the API did not accept the access token sent.
+            TimeoutError: If the API did not respond in time.
+            ConnectionError: If the API could not be reached, or failed to handle the request.
+            RuntimeError: If the API rejected the request."""
+        with _transport_errors():
+            response = self.session.request(
+                method, urljoin(self.api_url, route), timeout=self.timeout, **kwargs
+            )
+
+        if response.ok:
+            return response
+
+        response.close()
+        if response.status_code == requests.codes.unauthorized:
+            raise PermissionError(API_UNAUTHORIZED_ERROR)
+        if response.status_code in (
+            requests.codes.not_found,
+            requests.codes.forbidden,
+        ):
+            raise FileNotFoundError(ANALYSIS_NOT_FOUND_ERROR)
+        if response.status_code >= requests.codes.internal_server_error:
+            raise ConnectionError(
+                API_UNAVAILABLE_ERROR.format(error=response.status_code)
+            )
+        raise RuntimeError(API_REQUEST_ERROR.format(status=response.status_code))
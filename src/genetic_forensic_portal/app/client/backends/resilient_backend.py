@@ -0,0 +1,426 @@
+"""Contains a backend that wraps another to retry, hedge and fail fast on its reads.
+
+Every read of the genetic forensic API is idempotent, so it is safe to send again:
+- Reads that fail with a transient error (ConnectionError or TimeoutError) are retried after a random, exponentially growing backoff, so that many clients do not retry in lockstep.
+- Reads that have not answered after the 95th percentile of the recent latencies of their endpoint, and artifact if any, are hedged: a duplicate is sent from a pool thread while the read carries on on the calling thread. If the read then fails with a transient error, the duplicate's answer is used rather than retrying after a backoff. Large data artifacts are never hedged, as downloading them twice costs more than it saves.
+- Each endpoint has a circuit breaker that trips after a run of transient failures. While it is open, reads fail fast with ConnectionError instead of waiting on a degraded API.
+
+Uploads are not idempotent, so they pass straight through. Turn this on with `GF_API_RESILIENT=1`.
+"""
+
+from __future__ import annotations
+
+import random
+import statistics
+import threading
+import time
+import typing
+from collections import Counter, deque
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from enum import StrEnum
+
+from genetic_forensic_portal.app.client.models.analysis_filter import AnalysisFilter
+from genetic_forensic_portal.app.client.models.analysis_status import AnalysisStatus
+from genetic_forensic_portal.app.client.models.list_analyses_response import (
+    ListAnalysesResponse,
+)
+
+from .base import Artifact, Backend
+
+_T = typing.TypeVar("_T")
+
+# Errors that mean the API could not be reached or did not answer in time, and may not happen again
+TRANSIENT_ERRORS = (ConnectionError, TimeoutError)
+
+# Error constants:
+CIRCUIT_OPEN_ERROR = (
+    "Genetic forensic API is failing; not calling {endpoint} for another {seconds:.1f}s"
+)
+
+# Number of times a read is tried, and the bounds of the backoff between tries in seconds
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BASE_BACKOFF = 0.1
+DEFAULT_MAX_BACKOFF = 2.0
+
+# Percentile of an endpoint's recent latencies after which a read is hedged
+HEDGE_PERCENTILE = 95
+
+# Artifacts too large to download twice, so reads of them are never hedged
+UNHEDGED_ARTIFACTS = frozenset(
+    {Artifact.SCAT_DATA, Artifact.VORONOI_DATA, Artifact.FAMILIAL}
+)
+
+# Number of recent latencies kept for each endpoint and artifact, and the number needed before reads are hedged
+LATENCY_WINDOW = 100
+MIN_LATENCY_SAMPLES = 20
+
+# Number of transient failures in a row that trip a breaker, and seconds it stays open
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+
+# Number of threads that the duplicates of hedged reads run on
+HEDGE_WORKERS = 8
+
+
+class ResilienceCounter(StrEnum):
+    """The events counted by `ResilientBackend`."""
+
+    RETRIES = "retries"
+    HEDGES_SENT = "hedges sent"
+    HEDGES_WON = "hedges won"
+    BREAKER_TRIPS = "breaker trips"
+    BREAKER_REJECTIONS = "breaker rejections"
+
+
+class CircuitBreaker:
+    """Fails fast after `failure_threshold` transient failures in a row, until `reset_timeout` seconds have passed.
+
+    Then one trial call is let through. If it succeeds the breaker closes again, and if it fails the breaker stays open for another `reset_timeout`.
+
+    Args:
+        failure_threshold (int): The number of failures in a row that trip the breaker.
+        reset_timeout (float): Seconds the breaker stays open before a trial call.
+        clock (Callable[[], float]): Returns the current time in seconds.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the breaker has tripped and not yet closed again."""
+        return self._opened_at is not None
+
+    def retry_in(self) -> float:
+        """Seconds until the breaker lets a trial call through."""
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(self._opened_at + self.reset_timeout - self._clock(), 0.0)
+
+    def allow(self) -> bool:
+        """Whether a call may be made now. When the breaker is open, only one trial call is allowed once `reset_timeout` has passed."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_in_flight:
+                return False
+            if self._clock() - self._opened_at < self.reset_timeout:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        """Record that a call reached the API, closing the breaker."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """Record that a call failed with a transient error.
+
+        Returns:
+            bool: Whether this failure opened the breaker.
+        """
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or (
+                self._opened_at is None and self._failures >= self.failure_threshold
+            ):
+                self._opened_at = self._clock()
+                self._trial_in_flight = False
+                return True
+            return False
+
+
+class _LatencyWindow:
+    """The latencies of the most recent successful reads of an endpoint, or of one artifact."""
+
+    def __init__(self) -> None:
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def add(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+
+    def hedge_delay(self) -> float | None:
+        """The delay after which to hedge a read, or None if too few reads have been seen to tell."""
+        with self._lock:
+            if len(self._latencies) < MIN_LATENCY_SAMPLES:
+                return None
+            latencies = list(self._latencies)
+        return statistics.quantiles(latencies, n=100)[HEDGE_PERCENTILE - 1]
+
+
+class ResilientBackend(Backend):
+    """Wraps a backend to retry its reads with jittered backoff, hedge slow reads, and fail fast while an endpoint keeps failing.
+
+    Args:
+        backend (Backend): The backend to wrap. It is closed along with this one.
+        max_attempts (int): The number of times a read is tried before its error is raised.
+        base_backoff (float): Seconds to wait, at most, before the first retry. The bound doubles with each retry.
+        max_backoff (float): The most seconds to wait before any retry.
+        failure_threshold (int): The number of transient failures in a row that trip an endpoint's breaker.
+        reset_timeout (float): Seconds a tripped breaker fails fast for before letting a trial read through.
+        clock (Callable[[], float]): Returns the current time in seconds. Defaults to `time.monotonic`.
+    """
+
+    # The reads that are retried and hedged, each with its own breaker
+    ENDPOINTS = (
+        "get_artifact",
+        "list_analyses",
+        "get_analysis_status",
+        "get_analysis_statuses",
+    )
+
+    def __init__(
+        self,
+        backend: Backend,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        base_backoff: float = DEFAULT_BASE_BACKOFF,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.backend = backend
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._clock = clock
+        self._breakers = {
+            endpoint: CircuitBreaker(failure_threshold, reset_timeout, clock)
+            for endpoint in self.ENDPOINTS
+        }
+        # artifacts differ too much in size to share a window, and those missing are not hedged
+        self._latencies: dict[tuple[str, Artifact | None], _LatencyWindow] = {
+            (endpoint, None): _LatencyWindow()
+            for endpoint in self.ENDPOINTS
+            if endpoint != "get_artifact"
+        }
+        self._latencies.update(
+            (("get_artifact", artifact), _LatencyWindow())
+            for artifact in Artifact
+            if artifact not in UNHEDGED_ARTIFACTS
+        )
+        self._counters: Counter[ResilienceCounter] = Counter()
+        self._counters_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=HEDGE_WORKERS, thread_name_prefix="gf-hedge"
+        )
+
+    def counters(self) -> dict[ResilienceCounter, int]:
+        """Return how many times each counted event has happened."""
+        with self._counters_lock:
+            return {counter: self._counters[counter] for counter in ResilienceCounter}
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        """Return the circuit breaker of one of `ENDPOINTS`."""
+        return self._breakers[endpoint]
+
+    def upload_sample(
+        self,
+        data: typing.BinaryIO,
+        metadata: str | None,
+        content_hash: str,
+        content_encoding: str | None = None,
+    ) -> str:
+        # sending a sample twice would create two analyses
+        return self.backend.upload_sample(
+            data, metadata, content_hash, content_encoding
+        )
+
+    def start_upload(
+        self,
+        metadata: str | None,
+        content_hash: str,
+        size: int,
+        part_size: int,
+        content_encoding: str | None = None,
+    ) -> str:
+        return self.backend.start_upload(
+            metadata, content_hash, size, part_size, content_encoding
+        )
+
+    def uploaded_parts(self, upload_id: str) -> set[int]:
+        return self.backend.uploaded_parts(upload_id)
+
+    def upload_part(
+        self, upload_id: str, part_number: int, data: bytes, part_hash: str
+    ) -> None:
+        # parts are resent by `chunked_upload.send_parts`, which knows which ones arrived
+        self.backend.upload_part(upload_id, part_number, data, part_hash)
+
+    def complete_upload(self, upload_id: str) -> str:
+        return self.backend.complete_upload(upload_id)
+
+    def get_artifact(self, sample_id: str, artifact: Artifact) -> str:
+        return self._read(
+            "get_artifact", artifact, self.backend.get_artifact, sample_id, artifact
+        )
+
+    def artifact_name(self, sample_id: str, artifact: Artifact) -> str:
+        return self.backend.artifact_name(sample_id, artifact)
+
+    def iter_artifact(
+        self, sample_id: str, artifact: Artifact, start: int = 0
+    ) -> Iterator[bytes]:
+        # a stream cannot be retried or hedged whole once it has started; the wrapped backend resumes it instead
+        return self.backend.iter_artifact(sample_id, artifact, start)
+
+    def list_analyses(
+        self,
+        next_token: int,
+        page_size: int,
+        analysis_filter: AnalysisFilter | None = None,
+    ) -> ListAnalysesResponse:
+        return self._read(
+            "list_analyses",
+            None,
+            self.backend.list_analyses,
+            next_token,
+            page_size,
+            analysis_filter,
+        )
+
+    def get_analysis_status(self, sample_id: str) -> AnalysisStatus:
+        return self._read(
+            "get_analysis_status", None, self.backend.get_analysis_status, sample_id
+        )
+
+    def get_analysis_statuses(
+        self, sample_ids: Sequence[str]
+    ) -> dict[str, AnalysisStatus]:
+        return self._read(
+            "get_analysis_statuses",
+            None,
+            self.backend.get_analysis_statuses,
+            sample_ids,
+        )
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.backend.close()
+
+    def _count(self, counter: ResilienceCounter) -> None:
+        with self._counters_lock:
+            self._counters[counter] += 1
+
+    def _backoff(self, retry: int) -> float:
+        # "full jitter": anywhere between no wait and the exponential bound
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * 2**retry))
+
+    def _read(
+        self,
+        endpoint: str,
+        artifact: Artifact | None,
+        function: Callable[..., _T],
+        *args: typing.Any,
+    ) -> _T:
+        breaker = self._breakers[endpoint]
+        attempt = 1
+        while True:
+            if not breaker.allow():
+                self._count(ResilienceCounter.BREAKER_REJECTIONS)
+                raise ConnectionError(
+                    CIRCUIT_OPEN_ERROR.format(
+                        endpoint=endpoint, seconds=breaker.retry_in()
+                    )
+                )
+
+            try:
+                result = self._hedged(
+                    self._latencies.get((endpoint, artifact)), function, *args
+                )
+            except TRANSIENT_ERRORS:
+                if breaker.record_failure():
+                    self._count(ResilienceCounter.BREAKER_TRIPS)
+                if attempt >= self.max_attempts or breaker.is_open:
+                    raise
+            except Exception:
+                # the API answered, even if only to say no
+                breaker.record_success()
+                raise
+            else:
+                breaker.record_success()
+                return result
+
+            self._count(ResilienceCounter.RETRIES)
+            time.sleep(self._backoff(attempt - 1))
+            attempt += 1
+
+    def _hedged(
+        self,
+        latencies: _LatencyWindow | None,
+        function: Callable[..., _T],
+        *args: typing.Any,
+    ) -> _T:
+        """Call a read on the calling thread, sending a duplicate from the pool if it is slower than most recent reads like it.
+
+        The duplicate's answer is used if the read fails with a transient error, whether it came before the failure or after. Reads without a latency window are not hedged."""
+        delay = None if latencies is None else latencies.hedge_delay()
+        start = self._clock()
+
+        if latencies is None or delay is None:
+            result = function(*args)
+            if latencies is not None:
+                latencies.add(self._clock() - start)
+            return result
+
+        answered = threading.Event()
+        hedge = self._executor.submit(
+            self._hedge, answered, start + delay, function, *args
+        )
+        try:
+            result = function(*args)
+        except TRANSIENT_ERRORS:
+            answered.set()
+            if hedge.cancel():
+                raise
+            # the duplicate's error, if it failed too, is raised in place of the read's
+            sent, hedged = hedge.result()
+            if not sent:
+                raise
+            self._count(ResilienceCounter.HEDGES_WON)
+            result = typing.cast(_T, hedged)
+        except BaseException:
+            answered.set()
+            hedge.cancel()
+            raise
+        else:
+            answered.set()
+            # a duplicate that has already been sent is left to finish, and its answer dropped
+            hedge.cancel()
+
+        latencies.add(self._clock() - start)
+        return result
+
+    def _hedge(
+        self,
+        answered: threading.Event,
+        send_at: float,
+        function: Callable[..., _T],
+        *args: typing.Any,
+    ) -> tuple[bool, _T | None]:
+        """Send the duplicate of a read at `send_at`, unless the read has been answered by then.
+
+        Returns:
+            tuple[bool, _T | None]: Whether the duplicate was sent, and its answer if so."""
+        if answered.wait(max(send_at - self._clock(), 0.0)):
+            return False, None
+        self._count(ResilienceCounter.HEDGES_SENT)
+        return True, function(*args)
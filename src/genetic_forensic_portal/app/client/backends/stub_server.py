@@ -0,0 +1,403 @@
+"""Contains a local stand-in for the genetic forensic API that serves the canned analyses over HTTP.
+
+It speaks the protocol `http_backend` expects, with keep-alive connections, so the HTTP backend can be tested and its throughput measured without network access. Run it with `gf-api-stub [--port 8081]`, then start the portal with `GF_API_BACKEND=http`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import re
+import sys
+import tempfile
+import threading
+import typing
+from collections.abc import Callable
+from email.utils import formatdate, parsedate_to_datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from genetic_forensic_portal.app.client import keycloak_client
+from genetic_forensic_portal.app.client.models.analysis_filter import AnalysisFilter
+
+from .base import Artifact, Backend
+from .canned_backend import CannedBackend
+from .http_backend import (
+    ANALYSES_ROUTE,
+    AUTHORIZATION_HEADER,
+    CONTENT_ENCODING_HEADER,
+    CONTENT_HASH_HEADER,
+    CONTENT_TYPE_HEADER,
+    ETAG_HEADER,
+    IF_MODIFIED_SINCE_HEADER,
+    IF_NONE_MATCH_HEADER,
+    LAST_MODIFIED_HEADER,
+    RANGE_HEADER,
+    SAMPLES_ROUTE,
+    UPLOADS_ROUTE,
+    parse_authorization_header,
+    parse_encoding_headers,
+    parse_filter_params,
+)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8081
+
+# Size of the pieces request and response bodies are copied in
+COPY_CHUNK_SIZE = 64 * 1024
+
+CONTENT_TYPES = {
+    ".png": "image/png",
+    ".zip": "application/zip",
+    ".tsv": "text/tab-separated-values",
+}
+
+# The single range of bytes "first-[last]" that files are served in part for. Other ranges are answered with the whole file, which HTTP allows.
+BYTE_RANGE = re.compile(r"bytes=(\d+)-(\d*)")
+
+# Error constants:
+CONTENT_HASH_MISMATCH = "Body does not match its X-Content-SHA256 header"
+MISSING_TOKEN = "Listing analyses needs a bearer access token"
+UNKNOWN_ROUTE = "No such route"
+
+logger = logging.getLogger(__name__)
+
+
+class StubApiHandler(BaseHTTPRequestHandler):
+    """Handles one connection to the stub API, answering from the server's backend."""
+
+    # HTTP/1.1 keeps connections alive between requests, like the real API would
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, so without this each response waits on a delayed ACK
+    disable_nagle_algorithm = True
+    server: StubApiServer
+    _body_read: bool
+
+    def do_GET(self) -> None:
+        self._dispatch(self._get)
+
+    def do_POST(self) -> None:
+        self._dispatch(self._post)
+
+    def do_PUT(self) -> None:
+        self._dispatch(self._put)
+
+    def _dispatch(
+        self, handle: Callable[[list[str], dict[str, list[str]]], None]
+    ) -> None:
+        """Answer a request with `handle`, turning the errors it raises into error responses."""
+        url = urlsplit(self.path)
+        route = [unquote(segment) for segment in url.path.strip("/").split("/")]
+        self._body_read = False
+
+        try:
+            handle(route, parse_qs(url.query))
+            return
+        except FileNotFoundError as e:
+            status, error = HTTPStatus.NOT_FOUND, str(e)
+        except PermissionError as e:
+            status, error = HTTPStatus.UNAUTHORIZED, str(e)
+        except (KeyError, ValueError) as e:
+            status, error = HTTPStatus.BAD_REQUEST, str(e)
+        except Exception as e:
+            logger.exception("Error handling %s", self.path)
+            status, error = HTTPStatus.INTERNAL_SERVER_ERROR, str(e)
+
+        if not self._body_read and int(self.headers.get("Content-Length", 0)):
+            # the body is left unread, so the connection cannot be reused
+            self.close_connection = True
+        self._send_json({"error": error}, status)
+
+    def _get(self, route: list[str], all_query: dict[str, list[str]]) -> None:
+        query = {key: values[-1] for key, values in all_query.items()}
+        backend = self.server.backend
+        match route:
+            case [analyses] if analyses == ANALYSES_ROUTE:
+                page = backend.list_analyses(
+                    int(query.get("next_token", 0)),
+                    int(query["page_size"]),
+                    self._viewer_filter(parse_filter_params(all_query)),
+                )
+                self._send_json(
+                    {
+                        "analyses": page.analyses,
+                        "start_token": page.start_token,
+                        "next_token": page.next_token,
+                    }
+                )
+            case [analyses, sample_id, "status"] if analyses == ANALYSES_ROUTE:
+                status = backend.get_analysis_status(sample_id)
+                self._send_json({"status": status.value})
+            case [analyses, sample_id, "artifacts", artifact] if (
+                analyses == ANALYSES_ROUTE
+            ):
+                self._send_file(backend.get_artifact(sample_id, Artifact(artifact)))
+            case [uploads, upload_id] if uploads == UPLOADS_ROUTE:
+                self._send_json({"parts": sorted(backend.uploaded_parts(upload_id))})
+            case _:
+                raise FileNotFoundError(UNKNOWN_ROUTE)
+
+    def _post(self, route: list[str], query: dict[str, list[str]]) -> None:
+        backend = self.server.backend
+        match route:
+            case [samples] if samples == SAMPLES_ROUTE:
+                self._post_sample(query.get("metadata", [None])[-1])
+            case [analyses, "statuses"] if analyses == ANALYSES_ROUTE:
+                statuses = backend.get_analysis_statuses(
+                    json.loads(self._read_body())["sample_ids"]
+                )
+                self._send_json(
+                    {
+                        "statuses": {
+                            sample_id: status.value
+                            for sample_id, status in statuses.items()
+                        }
+                    }
+                )
+            case [uploads] if uploads == UPLOADS_ROUTE:
+                upload = json.loads(self._read_body())
+                upload_id = backend.start_upload(
+                    upload["metadata"],
+                    upload["content_hash"],
+                    int(upload["size"]),
+                    int(upload["part_size"]),
+                    upload.get("content_encoding"),
+                )
+                self._send_json({"upload_id": upload_id}, HTTPStatus.CREATED)
+            case [uploads, upload_id, "complete"] if uploads == UPLOADS_ROUTE:
+                uuid = backend.complete_upload(upload_id)
+                self._send_json({"uuid": uuid}, HTTPStatus.CREATED)
+            case _:
+                raise FileNotFoundError(UNKNOWN_ROUTE)
+
+    def _put(self, route: list[str], _query: dict[str, list[str]]) -> None:
+        match route:
+            case [uploads, upload_id, "parts", part_number] if uploads == UPLOADS_ROUTE:
+                self.server.backend.upload_part(
+                    upload_id,
+                    int(part_number),
+                    self._read_body(),
+                    self.headers.get(CONTENT_HASH_HEADER, ""),
+                )
+                self._send_json({"part": int(part_number)})
+            case _:
+                raise FileNotFoundError(UNKNOWN_ROUTE)
+
+    def _viewer_filter(self, analysis_filter: AnalysisFilter | None) -> AnalysisFilter:
+        """Limit a filter to the analyses that the user whose access token the request carries may view, unless they may list them all.
+
+        Raises:
+            PermissionError: If the request carries no access token, or one the server does not accept."""
+        access_token = parse_authorization_header(
+            self.headers.get(AUTHORIZATION_HEADER)
+        )
+        if access_token is None:
+            raise PermissionError(MISSING_TOKEN)
+        viewer, roles = self.server.get_token_user(access_token)
+
+        analysis_filter = analysis_filter or AnalysisFilter()
+        if not keycloak_client.check_list_all_access(viewer, roles):
+            analysis_filter.viewer = viewer
+            analysis_filter.viewer_roles = roles
+        return analysis_filter
+
+    def _read_body(self) -> bytes:
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._body_read = True
+        return body
+
+    def _post_sample(self, metadata: str | None) -> None:
+        with tempfile.SpooledTemporaryFile(max_size=COPY_CHUNK_SIZE) as body:
+            digest = hashlib.sha256()
+            remaining = int(self.headers.get("Content-Length", 0))
+            while remaining > 0:
+                chunk = self.rfile.read(min(remaining, COPY_CHUNK_SIZE))
+                if not chunk:
+                    break
+                digest.update(chunk)
+                body.write(chunk)
+                remaining -= len(chunk)
+            self._body_read = True
+
+            content_hash = self.headers.get(CONTENT_HASH_HEADER)
+            if content_hash != digest.hexdigest():
+                raise ValueError(CONTENT_HASH_MISMATCH)
+
+            body.seek(0)
+            uuid = self.server.backend.upload_sample(
+                typing.cast(typing.BinaryIO, body),
+                metadata,
+                content_hash,
+                parse_encoding_headers(
+                    self.headers.get(CONTENT_TYPE_HEADER),
+                    self.headers.get(CONTENT_ENCODING_HEADER),
+                ),
+            )
+        self._send_json({"uuid": uuid}, HTTPStatus.CREATED)
+
+    def log_message(self, format: str, *args: typing.Any) -> None:
+        logger.debug(format, *args)
+
+    def _send_json(self, body: object, status: HTTPStatus = HTTPStatus.OK) -> None:
+        encoded = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def _send_file(self, path: str) -> None:
+        file_path = Path(path)
+        stat = file_path.stat()
+        size = stat.st_size
+        first, last = 0, size - 1
+        # like common web servers, the ETag is derived from the size and modification time rather than the contents
+        etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+
+        if self._is_not_modified(etag, stat.st_mtime):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header(ETAG_HEADER, etag)
+            self.send_header(LAST_MODIFIED_HEADER, last_modified)
+            self.end_headers()
+            return
+
+        requested = BYTE_RANGE.fullmatch(self.headers.get(RANGE_HEADER, ""))
+        if requested is not None:
+            first = int(requested[1])
+            if first >= size:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if requested[2]:
+                last = min(int(requested[2]), size - 1)
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header("Content-Range", f"bytes {first}-{last}/{size}")
+        else:
+            self.send_response(HTTPStatus.OK)
+
+        self.send_header(
+            "Content-Type",
+            CONTENT_TYPES.get(file_path.suffix, "application/octet-stream"),
+        )
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header(ETAG_HEADER, etag)
+        self.send_header(LAST_MODIFIED_HEADER, last_modified)
+        self.send_header("Content-Length", str(last - first + 1))
+        self.end_headers()
+        with file_path.open("rb") as file:
+            file.seek(first)
+            remaining = last - first + 1
+            while remaining > 0 and (
+                chunk := file.read(min(COPY_CHUNK_SIZE, remaining))
+            ):
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+
+    def _is_not_modified(self, etag: str, modified_at: float) -> bool:
+        """Return whether the request's conditions say the client's copy of a file is still current."""
+        if_none_match = self.headers.get(IF_NONE_MATCH_HEADER)
+        if if_none_match is not None:
+            # If-Modified-Since is ignored when If-None-Match is sent
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags
+
+        if_modified_since = self.headers.get(IF_MODIFIED_SINCE_HEADER)
+        if if_modified_since is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have whole seconds
+        return int(modified_at) <= since.timestamp()
+
+
+class StubApiServer(ThreadingHTTPServer):
+    """A stand-in for the genetic forensic API, answering each connection on its own thread.
+
+    Args:
+        address (tuple[str, int]): The host and port to listen on. Port 0 picks a free port.
+        backend (Backend | None): The backend to answer from. Defaults to the canned analyses.
+        get_token_user (Callable[[str], tuple[str, list[str]]]): Returns the username and roles of the user an access token was issued to, raising PermissionError if it is not accepted. Defaults to asking Keycloak, as the real API would.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int] = (DEFAULT_HOST, DEFAULT_PORT),
+        backend: Backend | None = None,
+        get_token_user: Callable[
+            [str], tuple[str, list[str]]
+        ] = keycloak_client.get_token_user,
+    ):
+        super().__init__(address, StubApiHandler)
+        self.backend = backend if backend is not None else CannedBackend()
+        self.get_token_user = get_token_user
+
+    def handle_error(
+        self,
+        request: typing.Any,  # noqa: ARG002
+        client_address: tuple[str, int],
+    ) -> None:
+        """Log an error raised while handling a connection, rather than printing its traceback to stderr.
+
+        A client that gives up waiting, like one whose read times out, closes its connection before the response is written, which is expected and only logged at debug level.
+        """
+        error = sys.exception()
+        if isinstance(error, ConnectionError):
+            logger.debug("Client %s disconnected: %s", client_address, error)
+        else:
+            logger.exception("Error handling a connection from %s", client_address)
+
+    @property
+    def url(self) -> str:
+        """The base URL of the API, to pass to `HttpBackend`."""
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}/"
+
+
+def start_stub_server(
+    host: str = DEFAULT_HOST,
+    port: int = 0,
+    backend: Backend | None = None,
+    get_token_user: Callable[
+        [str], tuple[str, list[str]]
+    ] = keycloak_client.get_token_user,
+) -> StubApiServer:
+    """Start a stub API server on a background thread.
+
+    Stop it with `shutdown()` and then `server_close()`.
+
+    Args:
+        host (str): The host to listen on.
+        port (int): The port to listen on. Defaults to a free port; see `StubApiServer.url`.
+        backend (Backend | None): The backend to answer from. Defaults to the canned analyses.
+        get_token_user (Callable[[str], tuple[str, list[str]]]): Returns the username and roles of the user an access token was issued to; see `StubApiServer`.
+    """
+    server = StubApiServer((host, port), backend, get_token_user)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with StubApiServer((args.host, args.port)) as server:
+        logger.info("Serving the stub genetic forensic API at %s", server.url)
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
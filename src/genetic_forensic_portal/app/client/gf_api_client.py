@@ -1,90 +1,217 @@
 """This module contains the client-side logic for interfacing with a (currently non-existent) Genetic Forensic API.
 
-The functions in this module are placeholders for the real API calls that will be made in the future. They are designed to mimic the behavior of the real API calls, but with hard-coded responses. These modules have been designed in such a way that the real API calls can be easily swapped in when they are available. These functions also hook into a local client to check for user permissions before \"calling\" the API.
+The functions in this module check the current user's permissions with a local client and then call the API through a backend (see `backends`). By default the backend mimics the behavior of the real API with hard-coded responses; setting `GF_API_BACKEND=http` and `GF_API_URL` calls a real API, or the local stub server, over HTTP instead.
 """
 
 from __future__ import annotations
 
+import functools
 import io
+import itertools
 import logging
+import os
+import shutil
+import tempfile
+import threading
+import typing
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime
 from pathlib import Path
 
 import pandas as pd
+import requests
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
+# newer Streamlit defines this in script_run_context_attr and only imports it here
+from streamlit.runtime.scriptrunner_utils.script_run_context import (  # type: ignore[attr-defined]
+    SCRIPT_RUN_CONTEXT_ATTR_NAME,
+)
+
+from genetic_forensic_portal.app.client.models.analysis_filter import AnalysisFilter
 from genetic_forensic_portal.app.client.models.analysis_status import AnalysisStatus
 from genetic_forensic_portal.app.client.models.get_analyses_response import (
     GetAnalysesResponse,
 )
-from genetic_forensic_portal.app.common.constants import (
+from genetic_forensic_portal.app.common.constants import (  # noqa: F401 (re-exported for callers)
     ANALYSIS_FAILED_UUID,
     FAMILIAL_FILE_PARSE_ERROR_UUID,
     IN_PROGRESS_UUID,
     NO_METADATA_UUID,
     NOT_AUTHORIZED_UUID,
     NOT_FOUND_UUID,
+    PREFETCH_SCHEDULER,
     ROLES,
     SAMPLE_UUID,
+    TOKEN,
     USERNAME,
 )
-from genetic_forensic_portal.app.utils import validate_input_file
+from genetic_forensic_portal.app.utils import (
+    compression,
+    familial_analysis_utils,
+    frame_cache,
+    hashing,
+    image_pyramid,
+    prefetch_scheduler,
+    process_pool,
+    sample_id_tracker,
+    single_flight,
+    ttl_cache,
+    validate_input_file,
+    validation_cache,
+)
 
+from . import backends
 from . import keycloak_client as auth_client
+from .backends import ANALYSIS_NOT_FOUND_ERROR, Artifact, chunked_upload
+from .backends.canned_backend import (  # noqa: F401 (re-exported for callers)
+    FAMILIAL_SAMPLE_DATA,
+    FAMILIAL_SAMPLE_DATA_2,
+    FAMILIAL_SAMPLE_DATA_ERRORS,
+    SCAT_SAMPLE_DATA_PATH,
+    SCAT_SAMPLE_DATA_PATH_2,
+    SCAT_SAMPLE_IMAGE,
+    SCAT_SAMPLE_IMAGE_2,
+    UUID_LIST,
+    VORONOI_SAMPLE_DATA_PATH,
+    VORONOI_SAMPLE_DATA_PATH_2,
+    VORONOI_SAMPLE_IMAGE,
+    VORONOI_SAMPLE_IMAGE_2,
+)
+from .models.artifact_download import ArtifactDownload
+from .models.familial_matches_page import FamilialMatchesPage
 from .models.list_analyses_response import ListAnalysesResponse
+from .models.upload_sample_response import UploadSampleResponse
 
 logger = logging.getLogger(__name__)
 
+_T = typing.TypeVar("_T")
+
 MISSING_DATA_ERROR = "data is required"
 MISSING_UUID_ERROR = "uuid is required"
 UPLOAD_DENIED_ERROR = "User does not have permission to upload sample analysis"
-ANALYSIS_NOT_FOUND_ERROR = "Analysis not found"
 FAMILIAL_TSV_ERROR = (
     "Error reading familial matching results. Please contact system administrator."
 )
 
-UUID_LIST = [
-    SAMPLE_UUID,
-    NO_METADATA_UUID,
-    NOT_FOUND_UUID,
-    NOT_AUTHORIZED_UUID,
-    IN_PROGRESS_UUID,
-    ANALYSIS_FAILED_UUID,
-    FAMILIAL_FILE_PARSE_ERROR_UUID,
-]
-
-SAMPLE_PATH = Path(__file__).parents[2] / "resources"  # equivalent to ../../resources
-
-SAMPLE_IMAGE_PATH = SAMPLE_PATH / "sample_images"
-SCAT_SAMPLE_IMAGE = str(SAMPLE_IMAGE_PATH / "tst_07-16_0.7t_scat_median.png")
-SCAT_SAMPLE_DATA_PATH = str(SAMPLE_IMAGE_PATH / "tst_07-16_scat.zip")
-SCAT_SAMPLE_IMAGE_2 = str(SAMPLE_IMAGE_PATH / "tst2_07-17_0.7t_scat_median.png")
-SCAT_SAMPLE_DATA_PATH_2 = str(SAMPLE_IMAGE_PATH / "tst2_07-17_scat.zip")
-
-# Add Voronoi sample image paths
-VORONOI_SAMPLE_IMAGE = str(SAMPLE_IMAGE_PATH / "tst_07-16_0.7t_voronoi_median.png")
-VORONOI_SAMPLE_DATA_PATH = str(SAMPLE_IMAGE_PATH / "tst_07-16_voronoi.zip")
-VORONOI_SAMPLE_IMAGE_2 = str(SAMPLE_IMAGE_PATH / "tst2_07-17_0.7t_voronoi_median.png")
-VORONOI_SAMPLE_DATA_PATH_2 = str(SAMPLE_IMAGE_PATH / "tst2_07-17_voronoi.zip")
-
-SAMPLE_DATA_PATH = SAMPLE_PATH / "sample_data"
-FAMILIAL_SAMPLE_DATA = str(SAMPLE_DATA_PATH / "sample_familial_matches.tsv")
-FAMILIAL_SAMPLE_DATA_2 = str(SAMPLE_DATA_PATH / "sample_familial_matches1.tsv")
-FAMILIAL_SAMPLE_DATA_ERRORS = str(
-    SAMPLE_DATA_PATH / "sample_familial_matches_errors.tsv"
+# Errors that fail one file of a batch upload rather than the batch: the file is invalid, or the API refused or could not be reached. Anything else is a bug and is raised.
+UPLOAD_ERRORS = (
+    ValueError,
+    ConnectionError,
+    TimeoutError,
+    FileNotFoundError,
+    RuntimeError,
+    requests.RequestException,
 )
 
 # Arbitrarily chosen to demonstrate pagination
 DEFAULT_LIST_PAGE_SIZE = 3
 
+# Number of familial matches shown at once
+FAMILIAL_PAGE_SIZE = 100
+
+# Seconds the full list of analyses a user may view is reused for, across reruns of a page
+ANALYSIS_LIST_TTL = 30.0
+
+# Number of users whose lists of analyses are kept
+ANALYSIS_LIST_CACHE_SIZE = 128
+
+# Files at least this big are uploaded in parts of UPLOAD_PART_SIZE, UPLOAD_PART_WORKERS at a time
+CHUNKED_UPLOAD_THRESHOLD = 32 * 2**20
+UPLOAD_PART_SIZE = chunked_upload.DEFAULT_PART_SIZE
+UPLOAD_PART_WORKERS = chunked_upload.DEFAULT_PART_WORKERS
+
+# Bytes of parsed familial results kept in memory, across reruns of a page
+FAMILIAL_CACHE_BYTES = 256 * 2**20
+
+# Number of analyses whose statuses are fetched from the API in one request
+STATUS_BATCH_SIZE = 100
+
+# Number of worker processes shared by the validations of every batch upload
+VALIDATION_WORKERS = os.cpu_count() or 1
+
+# Size of the pieces the files of a batch upload are copied to disk in, for the validation workers to read
+SPOOL_CHUNK_SIZE = 2**20
+
+# Directory to keep validation results of uploaded files in, so that they outlive the process
+VALIDATION_CACHE_DIR = os.environ.get("GF_VALIDATION_CACHE_DIR")
+
+# Directory to keep downscaled analysis images in, so that they outlive the process, and the bytes of them kept
+IMAGE_CACHE_DIR = os.environ.get("GF_IMAGE_CACHE_DIR")
+IMAGE_CACHE_BYTES = image_pyramid.DEFAULT_MAX_BYTES
+
+# Seconds get_all_analyses waits for the analyses of a sample before giving up on those still loading
+DEFAULT_ANALYSIS_TIMEOUT = 30.0
+
+# Number of threads shared by calls that fetch from the API side by side
+FETCH_WORKERS = 8
 
-def upload_sample_analysis(data: io.BytesIO, metadata: str | None = None) -> str:
+# Number of analyses get_all_analyses fetches for a sample, each on its own thread
+ANALYSIS_TYPES = 3
+
+# Number of threads shared by the prefetches of every session, kept below FETCH_WORKERS so that prefetches leave room for the fetches of the page being shown
+PREFETCH_WORKERS = 2
+
+# Number of listed analyses whose results are prefetched, counting from the top of the list
+PREFETCH_LIMIT = 10
+
+_validation_cache = validation_cache.ValidationCache(directory=VALIDATION_CACHE_DIR)
+
+_image_pyramid = image_pyramid.ImagePyramid(
+    directory=IMAGE_CACHE_DIR, max_bytes=IMAGE_CACHE_BYTES
+)
+
+# Validating a file is CPU-bound, so the files of a batch are validated in parallel in worker processes
+_validation_pool = process_pool.ProcessPool(max_workers=VALIDATION_WORKERS)
+
+# Fetches wait on the API rather than the CPU, so threads are enough to overlap them
+_fetch_executor = ThreadPoolExecutor(
+    max_workers=FETCH_WORKERS, thread_name_prefix="gf-fetch"
+)
+
+_prefetch_executor = ThreadPoolExecutor(
+    max_workers=PREFETCH_WORKERS, thread_name_prefix="gf-prefetch"
+)
+
+# maps (username, roles) to the analyses that user may view
+_analysis_list_cache: ttl_cache.TtlCache[tuple[str, tuple[str, ...]], list[str]] = (
+    ttl_cache.TtlCache(max_entries=ANALYSIS_LIST_CACHE_SIZE, ttl=ANALYSIS_LIST_TTL)
+)
+
+# maps (UUID, size and modification time of the downloaded file) to the parsed familial results, and (UUID, size, modification time, start, stop, columns) to a page of Arrow IPC or Parquet results
+_familial_cache: frame_cache.FrameCache[tuple[typing.Hashable, ...]] = (
+    frame_cache.FrameCache(max_bytes=FAMILIAL_CACHE_BYTES)
+)
+
+# maps (function, arguments) to the fetch running for them, so that sessions asking for the same analysis at once share one fetch
+_in_flight: single_flight.SingleFlight[tuple[typing.Hashable, ...], typing.Any] = (
+    single_flight.SingleFlight()
+)
+
+# maps (content hash, metadata) to the ID of an upload in parts that was cut off
+_pending_uploads: dict[tuple[str, str | None], str] = {}
+_pending_uploads_lock = threading.Lock()
+
+_backend = backends.create_backend()
+
+
+def upload_sample_analysis(
+    data: io.BytesIO,
+    metadata: str | None = None,
+    max_errors: int | None = validate_input_file.DEFAULT_MAX_ERRORS,
+) -> str:
     """Uploads a sample analysis from the web portal to the API
 
+    The upload is validated as a stream straight from its bytes and then the same stream is sent on, so the file is never copied in memory. Validation results are cached by the SHA-256 of the upload, so a file that is submitted again is only hashed, not validated again. Uploads compressed with gzip, zip or zstd are decompressed as they are validated, and sent on still compressed.
+
     Args:
         data (bytes): The data to upload
-        metadata (str | None): The metadata to upload"""
-    # This is a placeholder. Eventually, the real API call will be here
-    # and we can return its response
+        metadata (str | None): The metadata to upload
+        max_errors (int | None): The number of validation errors to collect before giving up on the file
+
+    Raises:
+        validate_input_file.InvalidInputFileError: If the data is not a legal input file. Its `report` lists the errors found."""
     if data is None:
         raise ValueError(MISSING_DATA_ERROR)
 
@@ -93,25 +220,286 @@ def upload_sample_analysis(data: io.BytesIO, metadata: str | None = None) -> str
     ):
         raise PermissionError(UPLOAD_DENIED_ERROR)
 
-    data_as_string = io.StringIO(data.getvalue().decode("utf-8"))
-    validate_input_file.validate_input_file(data_as_string)
+    data.seek(0)
+    content_hash = hashing.hash_stream(data)
+    report = _cached_report(content_hash, max_errors)
+    if report is None:
+        report = _check_sample(data, max_errors)
+        _validation_cache.put(content_hash, report)
 
-    sample_identifier = SAMPLE_UUID
+    if not report.is_valid:
+        raise validate_input_file.InvalidInputFileError(report)
 
-    if metadata is None:
-        sample_identifier = NO_METADATA_UUID
+    data.seek(0)
+    content_encoding = compression.detect_encoding(data)
+    data.seek(0)
+    return _send_sample(data, metadata, content_hash, content_encoding)
 
-    return sample_identifier
 
+def iter_upload_sample_analyses(
+    files: Sequence[io.BytesIO],
+    metadata: str | None = None,
+    max_errors: int | None = validate_input_file.DEFAULT_MAX_ERRORS,
+    max_workers: int | None = None,
+) -> Iterator[UploadSampleResponse]:
+    """Uploads a batch of sample analyses from the web portal to the API, yielding each file's result as soon as it is known
 
-def get_scat_analysis(sample_id: str) -> str:
-    """Gets the SCAT analysis for a sample
+    Validating a file is CPU-bound, so the files of a batch are validated in parallel by a pool of worker processes that every session shares. Each file is copied to a temporary file for its worker to read, rather than sent to it in memory. A batch with only one file to validate is validated as a stream on this thread, like `upload_sample_analysis`, as handing it to a worker would only add a copy. Each file that passes validation is then sent to the API.
 
     Args:
-        sample_id (str): The sample ID to get the SCAT analysis for"""
-    # This is a placeholder. Eventually, the real API call will be here
-    # and we can return its response
+        files (Sequence[io.BytesIO]): The files to upload
+        metadata (str | None): The metadata to upload with every file
+        max_errors (int | None): The number of validation errors to collect for each file before giving up on it
+        max_workers (int | None): The number of files of the batch handed to the pool at once, which bounds the temporary files on disk. Defaults to one per file, up to VALIDATION_WORKERS
+
+    Yields:
+        UploadSampleResponse: The result for each file, in the order they finish"""
+    for _, response in _upload_sample_analyses(
+        files, metadata, max_errors, max_workers
+    ):
+        yield response
+
+
+def upload_sample_analyses(
+    files: Sequence[io.BytesIO],
+    metadata: str | None = None,
+    max_errors: int | None = validate_input_file.DEFAULT_MAX_ERRORS,
+    max_workers: int | None = None,
+) -> list[UploadSampleResponse]:
+    """Uploads a batch of sample analyses from the web portal to the API
+
+    See `iter_upload_sample_analyses`.
+
+    Returns:
+        list[UploadSampleResponse]: The result for each file, in the same order as `files`"""
+    responses = dict(_upload_sample_analyses(files, metadata, max_errors, max_workers))
+    return [responses[index] for index in range(len(files))]
+
+
+def _upload_sample_analyses(
+    files: Sequence[io.BytesIO],
+    metadata: str | None,
+    max_errors: int | None,
+    max_workers: int | None,
+) -> Iterator[tuple[int, UploadSampleResponse]]:
+    if not files:
+        raise ValueError(MISSING_DATA_ERROR)
 
+    if not auth_client.check_create_access(
+        st.session_state[USERNAME], st.session_state[ROLES]
+    ):
+        raise PermissionError(UPLOAD_DENIED_ERROR)
+
+    content_hashes = []
+    for file in files:
+        file.seek(0)
+        content_hashes.append(hashing.hash_stream(file))
+
+    # files seen before skip validation entirely
+    cached_reports = {
+        index: report
+        for index, content_hash in enumerate(content_hashes)
+        if (report := _cached_report(content_hash, max_errors)) is not None
+    }
+    for index, report in cached_reports.items():
+        yield (
+            index,
+            _send_validated_sample(
+                files[index], content_hashes[index], report, metadata
+            ),
+        )
+
+    unchecked = [index for index in range(len(files)) if index not in cached_reports]
+    if len(unchecked) == 1:
+        index = unchecked[0]
+        yield (
+            index,
+            _send_validated_sample(
+                files[index],
+                content_hashes[index],
+                functools.partial(_check_sample, files[index], max_errors),
+                metadata,
+            ),
+        )
+        return
+
+    if max_workers is None:
+        max_workers = min(len(unchecked), VALIDATION_WORKERS)
+
+    # maps each file being validated to its index and the temporary file its worker reads
+    validations: dict[
+        Future[validate_input_file.ValidationReport], tuple[int, str]
+    ] = {}
+    queued = iter(unchecked)
+    try:
+        while True:
+            for index in itertools.islice(queued, max_workers - len(validations)):
+                path = _spool_to_disk(files[index])
+                validation = _validation_pool.submit(
+                    validate_input_file.check_input_path,
+                    path,
+                    max_errors,
+                    sample_id_tracker.DEFAULT_SPILL_THRESHOLD,
+                )
+                validations[validation] = (index, path)
+            if not validations:
+                return
+
+            done, _ = wait(validations, return_when=FIRST_COMPLETED)
+            for validation in done:
+                index, path = validations.pop(validation)
+                Path(path).unlink(missing_ok=True)
+                yield (
+                    index,
+                    _send_validated_sample(
+                        files[index], content_hashes[index], validation, metadata
+                    ),
+                )
+    finally:
+        # the batch was abandoned or failed; a worker that is still reading its file keeps it open until it is done
+        for validation, (_, path) in validations.items():
+            validation.cancel()
+            Path(path).unlink(missing_ok=True)
+
+
+def _check_sample(
+    data: io.BytesIO, max_errors: int | None
+) -> validate_input_file.ValidationReport:
+    """Validates an upload as a stream on this thread, decompressing it if need be"""
+    data.seek(0)
+    content_encoding = compression.detect_encoding(data)
+    return validate_input_file.check_input_stream(
+        compression.decompressed(data, content_encoding),
+        max_errors=max_errors,
+        sid_spill_threshold=sample_id_tracker.DEFAULT_SPILL_THRESHOLD,
+    )
+
+
+def _spool_to_disk(data: io.BytesIO) -> str:
+    """Copies an upload to a temporary file for a validation worker to read, and returns its path"""
+    descriptor, path = tempfile.mkstemp(prefix="gf-validate-")
+    with os.fdopen(descriptor, "wb") as spooled:
+        data.seek(0)
+        shutil.copyfileobj(data, spooled, SPOOL_CHUNK_SIZE)
+    return path
+
+
+def _cached_report(
+    content_hash: str, max_errors: int | None
+) -> validate_input_file.ValidationReport | None:
+    """Returns the cached validation report for a file, if it answers a validation with this error budget"""
+    report = _validation_cache.get(content_hash)
+    if report is None or not (report.is_valid or report.max_errors == max_errors):
+        return None
+    logger.info("Reusing validation result for file %s", content_hash)
+    return report
+
+
+def _send_validated_sample(
+    data: io.BytesIO,
+    content_hash: str,
+    validation: Future[validate_input_file.ValidationReport]
+    | Callable[[], validate_input_file.ValidationReport]
+    | validate_input_file.ValidationReport,
+    metadata: str | None,
+) -> UploadSampleResponse:
+    """Sends one file of a batch to the API if it passed validation, capturing any error
+
+    `validation` is the file's report, or the validation running in the pool or still to run on this thread, whose report is cached"""
+    file_name = getattr(data, "name", "")
+    try:
+        if isinstance(validation, validate_input_file.ValidationReport):
+            report = validation
+        else:
+            report = (
+                validation.result() if isinstance(validation, Future) else validation()
+            )
+            _validation_cache.put(content_hash, report)
+        if not report.is_valid:
+            raise validate_input_file.InvalidInputFileError(report)
+
+        data.seek(0)
+        content_encoding = compression.detect_encoding(data)
+        return UploadSampleResponse(
+            file_name,
+            uuid=_send_sample(data, metadata, content_hash, content_encoding),
+        )
+    except UPLOAD_ERRORS as e:
+        logger.info("Failed to upload %s: %s", file_name, e)
+        return UploadSampleResponse(file_name, error=e)
+
+
+def _send_sample(
+    data: typing.BinaryIO,
+    metadata: str | None,
+    content_hash: str,
+    content_encoding: compression.ContentEncoding | None = None,
+) -> str:
+    """Sends a validated sample to the API and returns the UUID of the new analysis
+
+    Args:
+        data (typing.BinaryIO): The sample data, positioned at its start
+        metadata (str | None): The metadata to upload
+        content_hash (str): The SHA-256 of the sample data, so that the API can store each distinct file once
+        content_encoding (compression.ContentEncoding | None): How the sample data is compressed, sent in the headers of the request so the API can store it as it is"""
+    size = data.seek(0, io.SEEK_END)
+    data.seek(0)
+    if size < CHUNKED_UPLOAD_THRESHOLD:
+        uuid = _backend.upload_sample(data, metadata, content_hash, content_encoding)
+    else:
+        uuid = _send_sample_in_parts(
+            data, metadata, content_hash, content_encoding, size
+        )
+    # the new analysis may be visible to any user, so every cached list is stale
+    _analysis_list_cache.clear()
+    return uuid
+
+
+def _send_sample_in_parts(
+    data: typing.BinaryIO,
+    metadata: str | None,
+    content_hash: str,
+    content_encoding: compression.ContentEncoding | None,
+    size: int,
+) -> str:
+    """Sends a large validated sample to the API in parts and returns the UUID of the new analysis
+
+    If the upload is cut off for good, it is remembered, so submitting the same file again resumes it from the parts the API acknowledged rather than starting over. An upload is taken out of the pending uploads while it is being sent, so two sessions sending the same file at once never send to the same upload."""
+    key = (content_hash, metadata)
+    with _pending_uploads_lock:
+        upload_id = _pending_uploads.pop(key, None)
+    if upload_id is not None:
+        try:
+            _backend.uploaded_parts(upload_id)
+        except FileNotFoundError:
+            # the API has given up on the upload
+            upload_id = None
+    if upload_id is None:
+        upload_id = _backend.start_upload(
+            metadata, content_hash, size, UPLOAD_PART_SIZE, content_encoding
+        )
+    else:
+        logger.info("Resuming upload %s", upload_id)
+
+    try:
+        chunked_upload.send_parts(
+            _backend, upload_id, data, size, UPLOAD_PART_SIZE, UPLOAD_PART_WORKERS
+        )
+        return _backend.complete_upload(upload_id)
+    except Exception:
+        with _pending_uploads_lock:
+            _pending_uploads[key] = upload_id
+        raise
+
+
+def get_scat_analysis(
+    sample_id: str, size: image_pyramid.ImageSize = image_pyramid.ImageSize.FULL
+) -> str:
+    """Gets the SCAT analysis for a sample
+
+    Args:
+        sample_id (str): The sample ID to get the SCAT analysis for
+        size (ImageSize): The size to get the image at. Smaller sizes are downscaled once and cached."""
     if sample_id is None:
         raise ValueError(MISSING_UUID_ERROR)
 
@@ -120,19 +508,7 @@ def get_scat_analysis(sample_id: str) -> str:
     ):
         raise FileNotFoundError(ANALYSIS_NOT_FOUND_ERROR)
 
-    analysis = None
-
-    if sample_id == SAMPLE_UUID:
-        analysis = SCAT_SAMPLE_IMAGE
-    elif sample_id == NO_METADATA_UUID:
-        analysis = SCAT_SAMPLE_IMAGE_2
-    elif sample_id == IN_PROGRESS_UUID:
-        analysis = SCAT_SAMPLE_IMAGE  # This can be any image that represents an in-progress state
-
-    if analysis is None:
-        raise FileNotFoundError(ANALYSIS_NOT_FOUND_ERROR)
-
-    return analysis
+    return _shared_fetch(_get_analysis_image, sample_id, Artifact.SCAT_IMAGE, size)
 
 
 def get_scat_analysis_data(sample_id: str) -> str:
@@ -140,9 +516,6 @@ def get_scat_analysis_data(sample_id: str) -> str:
 
     Args:
         sample_id (str): The sample ID to get the SCAT analysis data for"""
-    # This is a placeholder. Eventually, the real API call will be here
-    # and we can return its response
-
     if sample_id is None:
         raise ValueError(MISSING_UUID_ERROR)
 
@@ -151,39 +524,25 @@ def get_scat_analysis_data(sample_id: str) -> str:
     ):
         raise FileNotFoundError(ANALYSIS_NOT_FOUND_ERROR)
 
-    # This placeholder just returns the local file location of the data zip.
-    # In the real implementation, the data returned would probably live in
-    #    some sort of blob storage system -- like S3 or Azure Blob Storage.
-    # In that case, the actual API call would return a URL to the data with
-    #    particular, temporary access associated with it.
-    # With S3, this would be a pre-signed URL:
-    #    https://docs.aws.amazon.com/AmazonS3/latest/userguide/ShareObjectPreSignedURL.html
-    # With Azure Blob Storage, this would be an SAS token:
-    #    https://docs.microsoft.com/en-us/azure/storage/common/storage-sas-overview
-
-    analysis_path = None
-
-    if sample_id == SAMPLE_UUID:
-        analysis_path = SCAT_SAMPLE_DATA_PATH
-    elif sample_id == NO_METADATA_UUID:
-        analysis_path = SCAT_SAMPLE_DATA_PATH_2
-    elif sample_id == IN_PROGRESS_UUID:
-        analysis_path = SCAT_SAMPLE_DATA_PATH
-
-    if analysis_path is None:
-        raise FileNotFoundError(ANALYSIS_NOT_FOUND_ERROR)
+    return _shared_fetch(_backend.get_artifact, sample_id, Artifact.SCAT_DATA)
 
-    return analysis_path
 
+def get_scat_analysis_data_download(sample_id: str) -> ArtifactDownload:
+    """Gets the SCAT analysis data for a sample, to be fetched only once it is downloaded
 
-def get_voronoi_analysis(sample_id: str) -> str:
+    Args:
+        sample_id (str): The sample ID to get the SCAT analysis data for"""
+    return _get_artifact_download(sample_id, Artifact.SCAT_DATA)
+
+
+def get_voronoi_analysis(
+    sample_id: str, size: image_pyramid.ImageSize = image_pyramid.ImageSize.FULL
+) -> str:
     """Gets the Voronoi analysis for a sample
 
     Args:
-        sample_id (str): The sample ID to get the Voronoi analysis for"""
-    # This is a placeholder. Eventually, the real API call will be here
-    # and we can return its response
-
+        sample_id (str): The sample ID to get the Voronoi analysis for
+        size (ImageSize): The size to get the image at. Smaller sizes are downscaled once and cached."""
     if sample_id is None:
         raise ValueError(MISSING_UUID_ERROR)
 
@@ -192,17 +551,7 @@ def get_voronoi_analysis(sample_id: str) -> str:
     ):
         raise FileNotFoundError(ANALYSIS_NOT_FOUND_ERROR)
 
-    analysis = None
-
-    if sample_id == SAMPLE_UUID:
-        analysis = VORONOI_SAMPLE_IMAGE
-    elif sample_id == NO_METADATA_UUID:
-        analysis = VORONOI_SAMPLE_IMAGE_2
-
-    if analysis is None:
-        raise FileNotFoundError(ANALYSIS_NOT_FOUND_ERROR)
-
-    return analysis
+    return _shared_fetch(_get_analysis_image, sample_id, Artifact.VORONOI_IMAGE, size)
 
 
 def get_voronoi_analysis_data(sample_id: str) -> str:
@@ -210,9 +559,6 @@ def get_voronoi_analysis_data(sample_id: str) -> str:
 
     Args:
         sample_id (str): The sample ID to get the Voronoi analysis for"""
-    # This is a placeholder. Eventually, the real API call will be here
-    # and we can return its response
-
     if sample_id is None:
         raise ValueError(MISSING_UUID_ERROR)
 
@@ -221,37 +567,96 @@ def get_voronoi_analysis_data(sample_id: str) -> str:
     ):
         raise FileNotFoundError(ANALYSIS_NOT_FOUND_ERROR)
 
-    # This placeholder just returns the local file location of the data zip.
-    # In the real implementation, the data returned would probably live in
-    #    some sort of blob storage system -- like S3 or Azure Blob Storage.
-    # In that case, the actual API call would return a URL to the data with
-    #    particular, temporary access associated with it.
-    # With S3, this would be a pre-signed URL:
-    #    https://docs.aws.amazon.com/AmazonS3/latest/userguide/ShareObjectPreSignedURL.html
-    # With Azure Blob Storage, this would be an SAS token:
-    #    https://docs.microsoft.com/en-us/azure/storage/common/storage-sas-overview
+    return _shared_fetch(_backend.get_artifact, sample_id, Artifact.VORONOI_DATA)
 
-    analysis = None
 
-    if sample_id == SAMPLE_UUID:
-        analysis = VORONOI_SAMPLE_DATA_PATH
-    elif sample_id == NO_METADATA_UUID:
-        analysis = VORONOI_SAMPLE_DATA_PATH_2
+def get_voronoi_analysis_data_download(sample_id: str) -> ArtifactDownload:
+    """Gets the Voronoi analysis data for a sample, to be fetched only once it is downloaded
 
-    if analysis is None:
+    Args:
+        sample_id (str): The sample ID to get the Voronoi analysis data for"""
+    return _get_artifact_download(sample_id, Artifact.VORONOI_DATA)
+
+
+def _get_analysis_image(
+    sample_id: str, artifact: Artifact, size: image_pyramid.ImageSize
+) -> str:
+    return _image_pyramid.get(_backend.get_artifact(sample_id, artifact), size)
+
+
+def _get_artifact_download(sample_id: str, artifact: Artifact) -> ArtifactDownload:
+    if sample_id is None:
+        raise ValueError(MISSING_UUID_ERROR)
+
+    # access is checked now, since the download is fetched on a thread without the user's session
+    if not auth_client.check_download_access(
+        st.session_state[USERNAME], st.session_state[ROLES], sample_id
+    ):
         raise FileNotFoundError(ANALYSIS_NOT_FOUND_ERROR)
 
-    return analysis
+    return ArtifactDownload(
+        _backend.artifact_name(sample_id, artifact),
+        functools.partial(_backend.iter_artifact, sample_id, artifact),
+    )
 
 
 def get_familial_analysis(sample_id: str) -> pd.DataFrame:
     """Retrieves the familial analysis for a sample
 
+    The results may be a TSV report or an Arrow IPC or Parquet table. The parsed results are kept in memory until the file they were parsed from changes, so they are shared between reruns and pages and must not be modified.
+
     Args:
         sample_id (str): The sample ID to get the familial analysis for"""
-    # This is a placeholder. Eventually, the real API call will be here
-    # and we can return its response
+    analysis_path = _get_familial_artifact(sample_id)
+
+    try:
+        return _read_familial_results(sample_id, analysis_path)
+    except Exception:
+        logger.exception("Error loading familial results")
+        raise RuntimeError(FAMILIAL_TSV_ERROR) from None
+
+
+def get_familial_matches_page(
+    sample_id: str,
+    start: int = 0,
+    page_size: int = FAMILIAL_PAGE_SIZE,
+    columns: Sequence[str] | None = None,
+) -> FamilialMatchesPage:
+    """Retrieves a page of the matches found by the familial analysis for a sample
+
+    Only the requested rows and columns of Arrow IPC and Parquet results are read, so the first page of a large table is shown without reading the rest of it, and each page read is kept like parsed results are. A TSV report has to be parsed whole, so it is parsed once and kept as in `get_familial_analysis`.
+
+    Args:
+        sample_id (str): The sample ID to get the familial matches for
+        start (int): The position of the first match on the page
+        page_size (int): The number of matches on a full page
+        columns (Sequence[str] | None): The columns to get. Defaults to all of them."""
+    analysis_path = _get_familial_artifact(sample_id)
+    stop = start + page_size
 
+    try:
+        if (
+            familial_analysis_utils.detect_familial_format(analysis_path)
+            == familial_analysis_utils.FamilialFormat.TSV
+        ):
+            familial = _read_familial_results(sample_id, analysis_path)
+            matches = familial.iloc[start:stop]
+            if columns is not None:
+                matches = matches[list(columns)]
+            total = len(familial)
+        else:
+            matches = _read_familial_page(
+                sample_id, analysis_path, columns, start, stop
+            )
+            total = familial_analysis_utils.count_familial_results(analysis_path)
+    except Exception:
+        logger.exception("Error loading familial results")
+        raise RuntimeError(FAMILIAL_TSV_ERROR) from None
+
+    return FamilialMatchesPage(matches, start, total)
+
+
+def _get_familial_artifact(sample_id: str) -> str:
     if sample_id is None:
         raise ValueError(MISSING_UUID_ERROR)
 
@@ -260,81 +665,149 @@ def get_familial_analysis(sample_id: str) -> pd.DataFrame:
     ):
         raise FileNotFoundError(ANALYSIS_NOT_FOUND_ERROR)
 
-    analysis_path = None
+    return _shared_fetch(_backend.get_artifact, sample_id, Artifact.FAMILIAL)
+
+
+def _read_familial_results(sample_id: str, analysis_path: str) -> pd.DataFrame:
+    stat = Path(analysis_path).stat()
+    key = (sample_id, stat.st_size, stat.st_mtime_ns)
+    cached = _familial_cache.get(key)
+    if cached is not None:
+        return cached
+
+    return _shared_fetch(_parse_familial_results, key, analysis_path)
+
+
+def _parse_familial_results(
+    key: tuple[str, int, int], analysis_path: str
+) -> pd.DataFrame:
+    familial = familial_analysis_utils.read_familial_results(analysis_path)
+    _familial_cache.put(key, familial)
+    return familial
+
+
+def _read_familial_page(
+    sample_id: str,
+    analysis_path: str,
+    columns: Sequence[str] | None,
+    start: int,
+    stop: int,
+) -> pd.DataFrame:
+    stat = Path(analysis_path).stat()
+    key = (
+        sample_id,
+        stat.st_size,
+        stat.st_mtime_ns,
+        start,
+        stop,
+        None if columns is None else tuple(columns),
+    )
+    cached = _familial_cache.get(key)
+    if cached is not None:
+        return cached
 
-    if sample_id == SAMPLE_UUID:
-        analysis_path = FAMILIAL_SAMPLE_DATA
-    elif sample_id == NO_METADATA_UUID:
-        analysis_path = FAMILIAL_SAMPLE_DATA_2
-    elif sample_id == FAMILIAL_FILE_PARSE_ERROR_UUID:
-        analysis_path = FAMILIAL_SAMPLE_DATA_ERRORS
+    page = familial_analysis_utils.read_familial_results(
+        analysis_path, columns, start, stop
+    )
+    _familial_cache.put(key, page)
+    return page
 
-    if analysis_path is None:
-        raise FileNotFoundError(ANALYSIS_NOT_FOUND_ERROR)
 
-    try:
-        return pd.read_csv(analysis_path, sep="\t", skiprows=1)
-    except Exception:
-        logger.exception("Error loading familial results")
-        raise RuntimeError(FAMILIAL_TSV_ERROR) from None
+def _access_token() -> str | None:
+    """Return the access token of the session's user, or None if they did not log in through Keycloak."""
+    token = st.session_state.get(TOKEN)
+    return None if token is None else typing.cast(str, token["access_token"])
 
 
-def list_analyses(next_token: int = 0) -> ListAnalysesResponse:
+def list_analyses(
+    next_token: int = 0,
+    page_size: int = DEFAULT_LIST_PAGE_SIZE,
+    status: AnalysisStatus | None = None,
+    owner: str | None = None,
+    submitted_after: datetime | None = None,
+) -> ListAnalysesResponse:
     """Lists UUIDs for all SCAT analyses
 
+    The filters, including which analyses the user may view, are applied by the API, so only the analyses on the page are sent back. The API is sent the user's access token, from which it derives who they are.
+
+    Args:
+        next_token (int): Where the page starts, from the `next_token` of the previous page
+        page_size (int): The number of analyses in a full page
+        status (AnalysisStatus | None): Only list analyses with this status
+        owner (str | None): Only list analyses owned by this user or group
+        submitted_after (datetime | None): Only list analyses submitted after this time. Must be timezone-aware
+
     Returns:
         ListAnalysesResponse: A list of all SCAT analyses with indications of pagination"""
-    # This is a placeholder. Eventually, the real API call will be here
-    # and we can return its response
-
     list_all_access = auth_client.check_list_all_access(
         st.session_state[USERNAME], st.session_state[ROLES]
     )
 
-    # check for out of bounds
-    if next_token >= len(UUID_LIST):
-        return ListAnalysesResponse([])
+    analysis_filter = AnalysisFilter(
+        status=status,
+        owner=owner,
+        submitted_after=submitted_after,
+        viewer=None if list_all_access else st.session_state[USERNAME],
+        viewer_roles=None if list_all_access else st.session_state[ROLES],
+        viewer_token=_access_token(),
+    )
 
     # set reasonable bounds for the page
-    new_start_token = max(next_token, 0)
+    return _backend.list_analyses(max(next_token, 0), page_size, analysis_filter)
 
-    available_analyses: list[str] = []
-    index = new_start_token
 
-    while index < len(UUID_LIST) and len(available_analyses) < DEFAULT_LIST_PAGE_SIZE:
-        if list_all_access or auth_client.check_view_access(
-            st.session_state[USERNAME], st.session_state[ROLES], UUID_LIST[index]
-        ):
-            available_analyses.append(UUID_LIST[index])
-        index += 1
+def iter_analyses(
+    next_token: int = 0,
+    page_size: int = DEFAULT_LIST_PAGE_SIZE,
+    **filters: typing.Any,
+) -> Iterator[str]:
+    """Yields UUIDs for all analyses, page by page
 
-    new_end_token = min(index, len(UUID_LIST))
-    new_next_token = new_end_token if new_end_token < len(UUID_LIST) else None
+    While the caller works through one page, the next is fetched on a background thread, so walking every page costs little more than fetching the first.
 
-    return ListAnalysesResponse(
-        available_analyses,
-        start_token=new_start_token,
-        next_token=new_next_token,
-    )
+    Args:
+        next_token (int): Where to start, from the `next_token` of a page of `list_analyses`
+        page_size (int): The number of analyses in each page
+        filters: The `status`, `owner` and `submitted_after` filters of `list_analyses`
+
+    Returns:
+        Iterator[str]: The UUIDs of the analyses the user may view, in the order `list_analyses` pages them"""
+    page = list_analyses(next_token, page_size, **filters)
+    upcoming: Future[ListAnalysesResponse] | None = None
+    try:
+        while True:
+            if page.next_token is not None:
+                upcoming = _submit_fetch(
+                    functools.partial(list_analyses, page_size=page_size, **filters),
+                    page.next_token,
+                )
+            yield from page.analyses
+            if upcoming is None:
+                return
+            page = upcoming.result()
+            upcoming = None
+    finally:
+        # the caller stopped early; a prefetch that has not started is not needed
+        if upcoming is not None:
+            upcoming.cancel()
 
 
 def list_all_analyses() -> list[str]:
     """Lists UUIDs for all analyses
 
+    Reading every page is slow and pages call this on every rerun, so each user's list is cached for `ANALYSIS_LIST_TTL` seconds, or until a sample is uploaded.
+
     Returns:
         list[str]: A list of all analyses"""
-    # This is a placeholder. Eventually, the real API call will be here
-    # and we can return its response
-    analyses = []
-
-    retrieved_analyses = list_analyses()
+    key = (st.session_state[USERNAME], tuple(sorted(st.session_state[ROLES])))
+    cached = _analysis_list_cache.get(key)
+    if cached is not None:
+        # a copy, so that callers cannot change the cached list
+        return list(cached)
 
-    while retrieved_analyses.next_token is not None:
-        analyses.extend(retrieved_analyses.analyses)
-        retrieved_analyses = list_analyses(retrieved_analyses.next_token)
-
-    analyses.extend(retrieved_analyses.analyses)
-    return analyses
+    analyses = list(iter_analyses())
+    _analysis_list_cache.put(key, analyses)
+    return list(analyses)
 
 
 def get_analysis_status(sample_id: str) -> AnalysisStatus:
@@ -357,43 +830,191 @@ def get_analysis_status(sample_id: str) -> AnalysisStatus:
     ):
         raise FileNotFoundError(ANALYSIS_NOT_FOUND_ERROR)
 
-    if sample_id in [SAMPLE_UUID, NO_METADATA_UUID]:
-        return AnalysisStatus.ANALYSIS_SUCCEEDED
-    if sample_id == IN_PROGRESS_UUID:
-        return AnalysisStatus.ANALYSIS_IN_PROGRESS
-    if sample_id == ANALYSIS_FAILED_UUID:
-        return AnalysisStatus.ANALYSIS_FAILED
+    return _shared_fetch(_backend.get_analysis_status, sample_id)
+
+
+def get_analysis_statuses(sample_ids: Sequence[str]) -> dict[str, AnalysisStatus]:
+    """
+    Retrieves the statuses of several analyses at once.
+
+    Permissions are checked for all the analyses in one pass, and the statuses of those the user may view are fetched `STATUS_BATCH_SIZE` at a time, so a page of hundreds of analyses takes a handful of requests rather than one each. Unlike `get_analysis_status`, a missing or failed analysis does not raise; it is given a status saying so.
 
-    raise FileNotFoundError(ANALYSIS_NOT_FOUND_ERROR)
+    Args:
+        sample_ids (Sequence[str]): The UUIDs of the analyses to retrieve the statuses for.
+
+    Returns:
+        dict[str, AnalysisStatus]: The status of each analysis, in the order given. Analyses that do not exist or that the user may not view are ANALYSIS_NOT_FOUND, and those whose status could not be fetched are ANALYSIS_ERROR.
+    """
+    statuses = dict.fromkeys(sample_ids, AnalysisStatus.ANALYSIS_NOT_FOUND)
+
+    view_access = auth_client.check_bulk_view_access(
+        st.session_state[USERNAME], st.session_state[ROLES], statuses
+    )
+    viewable = [sample_id for sample_id, allowed in view_access.items() if allowed]
 
+    for start in range(0, len(viewable), STATUS_BATCH_SIZE):
+        batch = viewable[start : start + STATUS_BATCH_SIZE]
+        try:
+            fetched = _shared_fetch(_backend.get_analysis_statuses, tuple(batch))
+        except Exception:
+            logger.exception("Failed to get the statuses of %d analyses", len(batch))
+            fetched = dict.fromkeys(batch, AnalysisStatus.ANALYSIS_ERROR)
+        statuses.update(
+            (sample_id, fetched[sample_id])
+            for sample_id in batch
+            if sample_id in fetched
+        )
 
-def get_all_analyses(sample_id: str) -> GetAnalysesResponse:
+    return statuses
+
+
+def get_scat_thumbnails(sample_ids: Sequence[str]) -> dict[str, str]:
+    """Gets thumbnails of the SCAT analyses of several samples, fetching them side by side
+
+    Samples whose SCAT analysis is missing, cannot be viewed by the user, or fails to load are left out.
+
+    Args:
+        sample_ids (Sequence[str]): The sample IDs to get thumbnails for"""
+    fetches = {
+        sample_id: _submit_fetch(
+            get_scat_analysis, sample_id, image_pyramid.ImageSize.THUMBNAIL
+        )
+        for sample_id in sample_ids
+    }
+
+    thumbnails = {}
+    for sample_id, fetch in fetches.items():
+        try:
+            thumbnails[sample_id] = fetch.result()
+        except FileNotFoundError:
+            continue
+        except Exception:
+            logger.exception("Failed to load SCAT thumbnail for UUID: %s", sample_id)
+    return thumbnails
+
+
+def get_all_analyses(
+    sample_id: str, timeout: float | None = DEFAULT_ANALYSIS_TIMEOUT
+) -> GetAnalysesResponse:
     """
     Fetches all types of analyses for a given sample ID.
 
+    The analyses are fetched concurrently, so this takes as long as the slowest of them rather than their sum. They are fetched on threads of their own rather than the shared fetch threads, so `timeout` counts from when they start and is never spent queued behind other sessions' fetches. An analysis that is not found, fails to load or is still loading after `timeout` is logged and left as None.
+
     Args:
         sample_id (str): The UUID of the sample.
+        timeout (float | None): Seconds to wait for the analyses before returning whatever has arrived. None waits for all of them.
 
     Returns:
         GetAnalysesResponse: An object containing results from all analysis types.
     """
-    scat = None
-    voronoi = None
-    familial = None
+    executor = ThreadPoolExecutor(
+        max_workers=ANALYSIS_TYPES, thread_name_prefix="gf-analyses"
+    )
+    scat = executor.submit(_in_script_run(get_scat_analysis, sample_id))
+    voronoi = executor.submit(_in_script_run(get_voronoi_analysis, sample_id))
+    familial = executor.submit(_in_script_run(get_familial_analysis, sample_id))
+    fetches: list[Future[typing.Any]] = [scat, voronoi, familial]
+    # the fetches run side by side, so they share one deadline
+    wait(fetches, timeout=timeout)
+    # fetches that timed out are left to finish on their threads, which then exit
+    executor.shutdown(wait=False)
 
-    try:
-        scat = get_scat_analysis(sample_id)
-    except FileNotFoundError:
-        logger.error("SCAT analysis not found for UUID: %s", sample_id)
+    response = GetAnalysesResponse()
 
-    try:
-        voronoi = get_voronoi_analysis(sample_id)
-    except FileNotFoundError:
-        logger.error("Voronoi analysis not found for UUID: %s", sample_id)
+    if not _timed_out(scat, "SCAT", sample_id):
+        try:
+            response.scat = scat.result()
+        except FileNotFoundError:
+            logger.error("SCAT analysis not found for UUID: %s", sample_id)
+
+    if not _timed_out(voronoi, "Voronoi", sample_id):
+        try:
+            response.voronoi = voronoi.result()
+        except FileNotFoundError:
+            logger.error("Voronoi analysis not found for UUID: %s", sample_id)
+
+    if not _timed_out(familial, "Familial", sample_id):
+        try:
+            response.familial = familial.result()
+        except Exception:
+            logger.exception("Failed to load familial analysis for UUID: %s", sample_id)
 
+    return response
+
+
+def prefetch_analyses(sample_ids: Sequence[str]) -> None:
+    """Starts loading the analyses of several samples into the caches in the background, so that their pages open without waiting
+
+    The SCAT and Voronoi previews and the first page of familial matches are prefetched, in the order given, for at most `PREFETCH_LIMIT` samples. Prefetches for other samples that have not started yet are cancelled, so calling this with the samples the user is now looking at drops those they have moved on from. Access is checked as each analysis is fetched, and analyses that are missing or that the user may not view are skipped.
+
+    Args:
+        sample_ids (Sequence[str]): The sample IDs to prefetch, those most likely to be opened first"""
+    scheduler = st.session_state.get(PREFETCH_SCHEDULER)
+    if scheduler is None:
+        scheduler = st.session_state[PREFETCH_SCHEDULER] = (
+            prefetch_scheduler.PrefetchScheduler(_prefetch_executor)
+        )
+
+    prefetches: dict[tuple[str, str], Callable[[], None]] = {}
+    for sample_id in sample_ids[:PREFETCH_LIMIT]:
+        prefetches[(sample_id, "SCAT")] = _in_script_run(
+            _prefetch, get_scat_analysis, sample_id, image_pyramid.ImageSize.PREVIEW
+        )
+        prefetches[(sample_id, "Voronoi")] = _in_script_run(
+            _prefetch, get_voronoi_analysis, sample_id, image_pyramid.ImageSize.PREVIEW
+        )
+        prefetches[(sample_id, "Familial")] = _in_script_run(
+            _prefetch, get_familial_matches_page, sample_id
+        )
+    scheduler.schedule(prefetches)
+
+
+def _prefetch(function: Callable[..., typing.Any], *args: typing.Any) -> None:
     try:
-        familial = get_familial_analysis(sample_id)
+        function(*args)
     except Exception:
-        logger.exception("Failed to load familial analysis for UUID: %s", sample_id)
+        logger.debug("Prefetch of %s%r failed", function.__name__, args, exc_info=True)
+
+
+def _submit_fetch(function: Callable[..., _T], *args: typing.Any) -> Future[_T]:
+    """Run a fetch on the shared fetch threads, where it can still read this script run's `st.session_state`."""
+    return _fetch_executor.submit(_in_script_run(function, *args))
+
+
+def _in_script_run(function: Callable[..., _T], *args: typing.Any) -> Callable[[], _T]:
+    """Wrap a call so that it can still read this script run's `st.session_state` when run on another thread.
+
+    The threads running these calls are pooled, so the context is detached again once the call returns, and a later call from outside a script run never sees the session of an earlier one."""
+    ctx = get_script_run_ctx(suppress_warning=True)
+
+    def call() -> _T:
+        thread = threading.current_thread()
+        previous = get_script_run_ctx(suppress_warning=True)
+        if ctx is not None:
+            add_script_run_ctx(thread, ctx)
+        else:
+            setattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, None)
+        try:
+            return function(*args)
+        finally:
+            setattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, previous)
+
+    return call
+
+
+def _shared_fetch(function: Callable[..., _T], *args: typing.Hashable) -> _T:
+    """Call `function(*args)`, or wait for the same call already running for another session and share its result.
+
+    The result is handed to every session that asked for it, so this must only be called once the current user's access to it has been checked."""
+    result: _T = _in_flight.do((function, *args), functools.partial(function, *args))
+    return result
+
 
-    return GetAnalysesResponse(scat=scat, voronoi=voronoi, familial=familial)
+def _timed_out(future: Future[typing.Any], analysis: str, sample_id: str) -> bool:
+    if future.done():
+        return False
+    # a fetch that has started cannot be stopped, but its result is dropped
+    future.cancel()
+    logger.error("%s analysis timed out for UUID: %s", analysis, sample_id)
+    return True
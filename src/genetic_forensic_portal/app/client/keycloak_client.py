@@ -10,6 +10,7 @@ Before going to production, this module should be replaced with a real and robus
 from __future__ import annotations
 
 import os
+from collections.abc import Iterable
 from typing import Any
 
 from keycloak import KeycloakOpenID
@@ -216,6 +217,9 @@ MOCK_RESOURCE_AUTH_CACHE: dict[str, dict[str, dict[Action, bool]]] = {}
 # format: {username: {action: decision}}
 MOCK_USER_AUTH_CACHE: dict[str, dict[Action, bool | None]] = {}
 
+# Error constants:
+INACTIVE_TOKEN_ERROR = "Access token has expired or been revoked"
+
 
 def login_user(username: str, password: str) -> Any:
     """Log in a user and return the token
@@ -236,6 +240,21 @@ def get_user_roles(token: dict[Any, Any]) -> Any:
     return keycloak_openid.introspect(token["access_token"])["realm_access"]["roles"]
 
 
+def get_token_user(access_token: str) -> tuple[str, list[str]]:
+    """Get the username and roles of the user an access token was issued to
+
+    Args:
+        access_token (str): the access token of a user's token previously obtained by calling login_user
+
+    Raises:
+        PermissionError: If the token has expired or been revoked.
+    """
+    token_info = keycloak_openid.introspect(access_token)
+    if not token_info.get("active"):
+        raise PermissionError(INACTIVE_TOKEN_ERROR)
+    return token_info["username"], token_info["realm_access"]["roles"]
+
+
 def logout_user(token: dict[Any, Any]) -> None:
     """Logs out a user
 
@@ -384,6 +403,31 @@ def check_view_access(user: str, roles: list[str], analysis_id: str) -> bool:
     return resource_access and (user_access is None or user_access)
 
 
+def check_bulk_view_access(
+    user: str, roles: list[str], analysis_ids: Iterable[str]
+) -> dict[str, bool]:
+    """Check if a user has access to view each of several resources.
+
+    The user's own permissions are checked once for the whole batch rather than once per resource, and if they deny viewing, no resource is checked at all.
+
+    Args:
+        user (str): the user requesting access
+        roles (list[str]): the roles of the user
+        analysis_ids (Iterable[str]): the analysis_ids of the resources
+
+    Returns:
+        dict[str, bool]: the computed auth decision for each analysis_id
+    """
+    user_access = check_user_access(user, roles, Action.VIEW)
+    if user_access is False:
+        return dict.fromkeys(analysis_ids, False)
+
+    return {
+        analysis_id: check_resource_access(user, roles, Action.VIEW, analysis_id)
+        for analysis_id in analysis_ids
+    }
+
+
 def check_download_access(user: str, roles: list[str], analysis_id: str) -> bool:
     """Check if a user has access to download a specific resource.
 
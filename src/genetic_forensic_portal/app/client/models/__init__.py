@@ -3,8 +3,12 @@
 These models are used to represent data that is retrieved from the genetic forensic portal API, and holds them in standardized Python objects that can be used by the rest of the application.
 
 Models:
+- `analysis_filter`: Contains the model for the conditions a listed analysis must meet.
 - `analysis_permissions`: Contains the models for the permissions that can be assigned to users and groups for a given analysis and action.
 - `analysis_status`: Contains the model for the lifecycle status of an analysis.
+- `artifact_download`: Contains the model for a result file of an analysis that is only fetched once the user downloads it.
+- `familial_matches_page`: Contains the model for a page of the matches found by a familial analysis.
 - `get_analyses_response`: Contains the model for the response from the genetic forensic portal API when retrieving all analyses for a sample.
 - `list_analyses_response`: Contains the model for the response from the genetic forensic portal API when listing analyses.
+- `upload_sample_response`: Contains the model for the result of uploading one file from a batch of samples.
 """
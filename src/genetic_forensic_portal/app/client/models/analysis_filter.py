@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from .analysis_status import AnalysisStatus
+
+
+class AnalysisFilter:
+    """The model for the conditions a listed analysis must meet, applied by the genetic forensic portal API rather than the portal.
+
+    Attributes:
+    - `status`: Only list analyses with this status.
+    - `owner`: Only list analyses owned by this user or group.
+    - `submitted_after`: Only list analyses submitted after this time. Must be timezone-aware.
+    - `viewer`: Only list analyses this user may view, or None to list them whoever may view them.
+    - `viewer_roles`: The roles of `viewer`.
+    - `viewer_token`: The access token of the user listing analyses. An API that is called over the network does not trust `viewer` and `viewer_roles`, but derives from this token who the viewer is and whether they may list every analysis.
+    """
+
+    def __init__(
+        self,
+        status: AnalysisStatus | None = None,
+        owner: str | None = None,
+        submitted_after: datetime | None = None,
+        viewer: str | None = None,
+        viewer_roles: list[str] | None = None,
+        viewer_token: str | None = None,
+    ):
+        self.status = status
+        self.owner = owner
+        self.submitted_after = submitted_after
+        self.viewer = viewer
+        self.viewer_roles = viewer_roles if viewer_roles else []
+        self.viewer_token = viewer_token
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import tempfile
+from collections.abc import Callable, Iterator
+
+
+class ArtifactDownload:
+    """The model for a result file of an analysis that is only fetched once the user downloads it.
+
+    Attributes:
+    - `file_name`: The name to download the file as.
+    - `chunks`: Called to stream the file from the API, in chunks.
+    """
+
+    def __init__(self, file_name: str, chunks: Callable[[], Iterator[bytes]]):
+        self.file_name = file_name
+        self.chunks = chunks
+
+    def read(self) -> bytes:
+        """Fetch the whole file.
+
+        The file is streamed into a temporary file a chunk at a time and read back once, so fetching it needs memory for one copy of it rather than for its chunks and their join as well. That copy is still the whole file: Streamlit's `st.download_button` serves downloads from memory, and keeps it for as long as the download may be repeated.
+        """
+        with tempfile.TemporaryFile() as spool:
+            for chunk in self.chunks():
+                spool.write(chunk)
+            spool.seek(0)
+            return spool.read()
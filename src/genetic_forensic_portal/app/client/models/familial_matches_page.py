@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import pandas as pd
+
+
+class FamilialMatchesPage:
+    """The model for a page of the matches found by a familial analysis.
+
+    Attributes:
+    - `matches`: The matches on this page, indexed by their position among all of the matches.
+    - `start`: The position of the first match on this page.
+    - `total`: The number of matches found by the whole analysis.
+    """
+
+    def __init__(self, matches: pd.DataFrame, start: int, total: int):
+        self.matches = matches
+        self.start = start
+        self.total = total
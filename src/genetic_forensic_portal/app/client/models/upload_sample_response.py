@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+
+class UploadSampleResponse:
+    """The model for the result of uploading one file from a batch of samples to the genetic forensic portal API.
+
+    Attributes:
+    - `file_name`: The name of the uploaded file.
+    - `uuid`: The UUID of the new analysis, if the upload succeeded.
+    - `error`: The error that stopped the file from being uploaded, if it failed.
+    """
+
+    def __init__(
+        self,
+        file_name: str,
+        uuid: str | None = None,
+        error: Exception | None = None,
+    ):
+        self.file_name = file_name
+        self.uuid = uuid
+        self.error = error
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether the file was uploaded."""
+        return self.error is None
@@ -2,6 +2,7 @@
 
 Types of constants found in this module:
 - Authentication session state keys
+- Prefetching session state keys
 - Sample, canned analysis \"UUID\"s used for testing
 """
 
@@ -13,6 +14,11 @@ ROLES = "roles"
 TOKEN = "token"
 
 
+# Prefetching
+
+PREFETCH_SCHEDULER = "prefetch_scheduler"
+
+
 # Analyses
 
 SAMPLE_UUID = "this-is-a-uuid"
@@ -1,9 +1,11 @@
-"""Contains Streamlit buttons for downloading files while handling auth decisions. Contained here because it is used in multiple places."""
+"""Contains Streamlit buttons for downloading files while handling auth decisions. Contained here because it is used in multiple places.
+
+The buttons only check that the user may download the file when the page is rendered. The file itself is streamed from the API when the button is pressed, so rendering a page never sends it to the browser. Streamlit then holds the whole file in memory to serve it.
+"""
 
 from __future__ import annotations
 
 import logging
-from pathlib import Path
 
 import streamlit as st
 
@@ -16,16 +18,13 @@ logger = logging.getLogger(__name__)
 def scat_analysis_download_button(uuid: str) -> None:
     """Create a download button for SCAT analysis data."""
     try:
-        analysis_data_path = client.get_scat_analysis_data(uuid)
-        if analysis_data_path:
-            analysis_file_name = analysis_data_path.split("/")[-1]
-            with Path(analysis_data_path).open("rb") as f:
-                st.download_button(
-                    label="Download SCAT Analysis",
-                    data=f.read(),
-                    file_name=analysis_file_name,
-                    mime="application/zip",
-                )
+        download = client.get_scat_analysis_data_download(uuid)
+        st.download_button(
+            label="Download SCAT Analysis",
+            data=download.read,
+            file_name=download.file_name,
+            mime="application/zip",
+        )
     except FileNotFoundError:
         logger.debug(
             "SCAT analysis data not found: %s for user %s",
@@ -37,16 +36,13 @@ def scat_analysis_download_button(uuid: str) -> None:
 def voronoi_analysis_download_button(uuid: str) -> None:
     """Create a download button for Voronoi analysis data."""
     try:
-        analysis_data_path = client.get_voronoi_analysis_data(uuid)
-        if analysis_data_path:
-            analysis_file_name = analysis_data_path.split("/")[-1]
-            with Path(analysis_data_path).open("rb") as f:
-                st.download_button(
-                    label="Download Voronoi Analysis",
-                    data=f.read(),
-                    file_name=analysis_file_name,
-                    mime="application/zip",
-                )
+        download = client.get_voronoi_analysis_data_download(uuid)
+        st.download_button(
+            label="Download Voronoi Analysis",
+            data=download.read,
+            file_name=download.file_name,
+            mime="application/zip",
+        )
     except FileNotFoundError:
         logger.debug(
             "Voronoi analysis data not found: %s for user %s",
@@ -3,8 +3,32 @@ from __future__ import annotations
 import streamlit as st
 
 from genetic_forensic_portal.app.client import gf_api_client as client
+from genetic_forensic_portal.app.client.models.upload_sample_response import (
+    UploadSampleResponse,
+)
 from genetic_forensic_portal.app.common import setup
 from genetic_forensic_portal.app.common.constants import AUTHENTICATED
+from genetic_forensic_portal.app.utils.validate_input_file import InvalidInputFileError
+
+
+def show_upload_response(response: UploadSampleResponse, metadata: str) -> None:
+    st.subheader(response.file_name)
+    if response.succeeded:
+        st.write("Sample uploaded successfully!")
+        st.write("metadata: ", metadata)
+        st.write("Sample UUID: ", response.uuid)
+    elif isinstance(response.error, InvalidInputFileError):
+        report = response.error.report
+        st.error(
+            f"Found {len(report.errors)} problem(s) in the uploaded file. "
+            "Please fix them and upload the file again."
+        )
+        if report.truncated:
+            st.warning(f"Stopped checking the file after {report.max_errors} errors.")
+        st.dataframe(report.to_dataframe(), hide_index=True)
+    else:
+        st.write("Error uploading sample: ", response.error)
+
 
 st.title("Upload Sample")
 
@@ -12,16 +36,25 @@ setup.initialize()
 
 if st.session_state[AUTHENTICATED]:
     with st.form(key="my_form"):
-        data = st.file_uploader(
-            "Upload Sample Data: ", type=["tsv"], accept_multiple_files=False
+        # compressed files are recognized by their contents, not their extension
+        files = st.file_uploader(
+            "Upload Sample Data: ",
+            type=["tsv", "gz", "zip", "zst"],
+            accept_multiple_files=True,
         )
         location = st.text_input("Location seized: ")
         submit_button = st.form_submit_button(label="Submit")
         if submit_button:
             try:
-                uuid = client.upload_sample_analysis(data=data, metadata=location)
-                st.write("Sample uploaded successfully!")
-                st.write("metadata: ", location)
-                st.write("Sample UUID: ", uuid)
+                progress = st.progress(0.0, text="Validating files...")
+                for done, response in enumerate(
+                    client.iter_upload_sample_analyses(files, metadata=location),
+                    start=1,
+                ):
+                    progress.progress(
+                        done / len(files),
+                        text=f"Processed {done} of {len(files)} files",
+                    )
+                    show_upload_response(response, location)
             except Exception as e:
                 st.write("Error uploading sample: ", e)
@@ -6,6 +6,7 @@ from genetic_forensic_portal.app.client import gf_api_client as client
 from genetic_forensic_portal.app.client import keycloak_client as auth_client
 from genetic_forensic_portal.app.common import download_buttons, setup
 from genetic_forensic_portal.app.common.constants import AUTHENTICATED, ROLES, USERNAME
+from genetic_forensic_portal.app.utils.image_pyramid import ImageSize
 
 st.header("Get Voronoi Analysis")
 
@@ -18,14 +19,17 @@ if st.session_state[AUTHENTICATED]:
 
     uuid = st.selectbox(
         "Select a sample ID",
-        client.list_all_analyses(),
+        analysis_list,
         index=getattr(st.session_state, "index", None),
         placeholder="Select sample ID...",
     )
 
     if uuid:
         try:
-            analysis = client.get_voronoi_analysis(uuid)
+            full_size = st.toggle("Show full resolution", key=f"full {uuid}")
+            analysis = client.get_voronoi_analysis(
+                uuid, ImageSize.FULL if full_size else ImageSize.PREVIEW
+            )
             st.image(analysis, caption="Voronoi Analysis")
 
             if auth_client.check_download_access(
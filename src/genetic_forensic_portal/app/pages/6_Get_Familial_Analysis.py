@@ -25,13 +25,29 @@ if st.session_state[AUTHENTICATED]:
 
     if uuid:
         try:
-            analysis = client.get_familial_analysis(uuid)
+            page_number = st.session_state.get(f"familial_page {uuid}", 1)
+            page = client.get_familial_matches_page(
+                uuid, start=(page_number - 1) * client.FAMILIAL_PAGE_SIZE
+            )
             st.dataframe(
-                analysis.style.map(
+                page.matches.style.map(
                     fam_utils.highlight_exact_matches,
                     subset=[fam_utils.EXACT_MATCH_COLUMN],
                 )
             )
+
+            page_count = max(-(-page.total // client.FAMILIAL_PAGE_SIZE), 1)
+            if page_count > 1:
+                st.number_input(
+                    f"Page (of {page_count})",
+                    min_value=1,
+                    max_value=page_count,
+                    key=f"familial_page {uuid}",
+                )
+            if page.total > 0:
+                st.write(
+                    f"Showing matches {page.start + 1} to {page.start + len(page.matches)} of {page.total}."
+                )
         except FileNotFoundError:
             st.error("Analysis not found")
         except Exception as e:
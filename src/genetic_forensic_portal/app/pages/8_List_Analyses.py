@@ -1,30 +1,43 @@
 from __future__ import annotations
 
+from pathlib import Path
+
 import streamlit as st
 
 from genetic_forensic_portal.app.client import gf_api_client as client
-from genetic_forensic_portal.app.client.models.analysis_status import AnalysisStatus
 from genetic_forensic_portal.app.common import setup
 from genetic_forensic_portal.app.common.constants import AUTHENTICATED
 
-
-def try_get_analysis(uuid: str) -> AnalysisStatus:
-    try:
-        return client.get_analysis_status(uuid)
-    except FileNotFoundError:
-        return AnalysisStatus.ANALYSIS_NOT_FOUND
-    except Exception:
-        return AnalysisStatus.ANALYSIS_ERROR
-
-
 st.session_state.sorted_results = getattr(st.session_state, "sorted_results", [])
 st.session_state.analysis_start = getattr(st.session_state, "analysis_start", 0)
 st.session_state.analysis_next = getattr(st.session_state, "analysis_next", None)
+# maps each listed analysis to the path of its thumbnail, or None if it has none
+st.session_state.thumbnails = getattr(st.session_state, "thumbnails", {})
 
 
 def update_session_state(uuid: str, index: int) -> None:
     st.session_state.uuid = uuid
     st.session_state.index = index
+    # the user has chosen an analysis, so stop prefetching the others
+    client.prefetch_analyses([uuid])
+
+
+def retrieve_thumbnails(analyses: list[str]) -> dict[str, str | None]:
+    # only fetch those not fetched on an earlier run, or whose thumbnail has since been evicted from the image cache
+    thumbnails: dict[str, str | None] = st.session_state.thumbnails
+    missing = [
+        analysis
+        for analysis in analyses
+        if analysis not in thumbnails
+        or (
+            (thumbnail := thumbnails[analysis]) is not None
+            and not Path(thumbnail).exists()
+        )
+    ]
+    if missing:
+        fetched = client.get_scat_thumbnails(missing)
+        thumbnails.update((analysis, fetched.get(analysis)) for analysis in missing)
+    return thumbnails
 
 
 def retrieve_analyses(start: int = 0) -> list[str]:
@@ -41,7 +54,8 @@ def retrieve_analyses(start: int = 0) -> list[str]:
 
 def retrieve_and_sort_analyses(start: int = 0) -> None:
     analyses = retrieve_analyses(start)
-    statuses = [try_get_analysis(analysis) for analysis in analyses]
+    statuses_by_id = client.get_analysis_statuses(analyses)
+    statuses = [statuses_by_id[analysis] for analysis in analyses]
     results = list(
         zip(range(start, start + len(analyses)), analyses, statuses, strict=True)
     )
@@ -68,19 +82,32 @@ if st.session_state[AUTHENTICATED]:
             ),
         )
 
-    ana_col, status_col, scat_col, vor_col, fam_col = st.columns(
-        [1, 0.7, 0.5, 0.5, 0.5]
+    map_col, ana_col, status_col, scat_col, vor_col, fam_col = st.columns(
+        [0.4, 1, 0.7, 0.5, 0.5, 0.5]
     )
+    map_col.write("**Map**")
     ana_col.write("**Analysis ID**")
     status_col.write("**Status**")
     scat_col.write("**SCAT Analysis**")
     vor_col.write("**Voronoi Analysis**")
     fam_col.write("**Familial Analysis**")
 
+    thumbnails = retrieve_thumbnails(
+        [analysis for _, analysis, _ in st.session_state.sorted_results]
+    )
+
+    # load the listed analyses in the background, so that their pages open from the caches
+    client.prefetch_analyses(
+        [analysis for _, analysis, _ in st.session_state.sorted_results]
+    )
+
     for index, analysis, status in st.session_state.sorted_results:
-        ana_col, status_col, scat_col, vor_col, fam_col = st.columns(
-            [1, 0.7, 0.5, 0.5, 0.5]
+        map_col, ana_col, status_col, scat_col, vor_col, fam_col = st.columns(
+            [0.4, 1, 0.7, 0.5, 0.5, 0.5]
         )
+        thumbnail = thumbnails.get(analysis)
+        if thumbnail is not None:
+            map_col.image(thumbnail)
         ana_col.write(analysis)
         status_col.write(status.value)
         with scat_col:
@@ -1,6 +1,16 @@
 """Contains various utility functions used throughout the application.
 
 Modules:
-- `familial_analysis_utils`: Contains utility functions for displaying familial analysis results.
+- `compression`: Contains utility functions for reading compressed uploads as a stream of their decompressed bytes.
+- `familial_analysis_utils`: Contains utility functions for reading and displaying familial analysis results.
+- `frame_cache`: Contains an in-memory cache of DataFrames bounded by the memory they use rather than by their number.
+- `hashing`: Contains utility functions for hashing files without reading them into memory whole.
+- `image_pyramid`: Contains a cache of downscaled copies of analysis images, keyed by the SHA-256 of the full-size image.
+- `prefetch_scheduler`: Contains a scheduler that fetches, in the background, what a user is likely to open next.
+- `process_pool`: Contains a pool of worker processes that lasts as long as the server and is replaced if a worker dies.
+- `sample_id_tracker`: Contains a bounded-memory counter of the sample IDs found in an input file.
+- `single_flight`: Contains a way for concurrent identical calls to share one run of a slow function.
+- `ttl_cache`: Contains a bounded in-memory cache whose entries expire a fixed time after they are stored.
 - `validate_input_files`: Contains utility functions for validating that user-uploaded TSV files are in the correct format that can be processed.
+- `validation_cache`: Contains a bounded cache of the validation results of input files, keyed by the SHA-256 of their contents.
 """
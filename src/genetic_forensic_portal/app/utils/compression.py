@@ -0,0 +1,177 @@
+"""Contains utility functions for reading compressed uploads (gzip, zip or zstd) as a stream of their decompressed bytes.
+
+The format is detected from the magic bytes at the start of the file rather than its name. zstd support needs the optional `zstandard` package (`pip install genetic-forensic-portal[zstd]`).
+"""
+
+from __future__ import annotations
+
+import functools
+import gzip
+import io
+import typing
+import zipfile
+from collections.abc import Callable
+from enum import StrEnum
+
+try:
+    import zstandard
+except ImportError:  # zstd support is optional
+    zstandard = None  # type: ignore[assignment]
+
+_T = typing.TypeVar("_T")
+
+# Error constants:
+ZIP_MUST_HOLD_ONE_FILE = "Zip archive must hold exactly one file but holds {count}"
+DECOMPRESSION_FAILED = "Could not decompress {encoding} file: {error}"
+ZSTD_NOT_INSTALLED = (
+    "Reading zstd-compressed files needs the zstandard package. Install it with "
+    "`pip install genetic-forensic-portal[zstd]`."
+)
+
+# Size of the pieces skipped over when rewinding a decompressed stream
+_SKIP_CHUNK_SIZE = 64 * 1024
+
+
+class ContentEncoding(StrEnum):
+    """The compression formats accepted for uploads, named as the HTTP content-codings gzip and zstd are. zip is not a content-coding, so `http_backend` sends it as the Content-Type application/zip instead."""
+
+    GZIP = "gzip"
+    ZIP = "zip"
+    ZSTD = "zstd"
+
+
+MAGIC_BYTES = {
+    ContentEncoding.GZIP: b"\x1f\x8b",
+    ContentEncoding.ZIP: b"PK\x03\x04",
+    ContentEncoding.ZSTD: b"\x28\xb5\x2f\xfd",
+}
+
+
+def detect_encoding(stream: typing.BinaryIO) -> ContentEncoding | None:
+    """Detect how a stream is compressed from its magic bytes, leaving it where it was.
+
+    Args:
+        stream (typing.BinaryIO): The stream to check, positioned at its start.
+
+    Returns:
+        ContentEncoding | None: The compression format, or None if the stream is not compressed.
+    """
+    start = stream.tell()
+    magic = stream.read(max(len(magic) for magic in MAGIC_BYTES.values()))
+    stream.seek(start)
+    for encoding, encoding_magic in MAGIC_BYTES.items():
+        if magic.startswith(encoding_magic):
+            return encoding
+    return None
+
+
+class _RewindableReader(io.RawIOBase):
+    """A read-only stream over a decompressor that can be sought by decompressing again from the start.
+
+    Errors from the decompressor, e.g. on a truncated file, are raised as ValueError."""
+
+    def __init__(
+        self,
+        encoding: ContentEncoding,
+        open_reader: Callable[[], typing.BinaryIO],
+    ):
+        self._encoding = encoding
+        self._open_reader = open_reader
+        self._reader = self._call(open_reader)
+        self._position = 0
+
+    def _call(self, function: Callable[[], _T]) -> _T:
+        try:
+            return function()
+        except ValueError:
+            raise
+        except Exception as e:
+            # each decompressor raises its own errors, so catch them all here
+            raise ValueError(
+                DECOMPRESSION_FAILED.format(encoding=self._encoding, error=e)
+            ) from e
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def readinto(self, buffer: typing.Any) -> int:
+        data = self._call(functools.partial(self._reader.read, len(buffer)))
+        buffer[: len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence != io.SEEK_SET:
+            msg = "Decompressed streams can only be sought from the start"
+            raise io.UnsupportedOperation(msg)
+
+        if offset < self._position:
+            self._reader.close()
+            self._reader = self._call(self._open_reader)
+            self._position = 0
+        while self._position < offset:
+            size = min(offset - self._position, _SKIP_CHUNK_SIZE)
+            skipped = self._call(functools.partial(self._reader.read, size))
+            if not skipped:
+                break
+            self._position += len(skipped)
+        return self._position
+
+    def close(self) -> None:
+        self._reader.close()
+        super().close()
+
+
+def _open_zip_member(stream: typing.BinaryIO) -> typing.BinaryIO:
+    archive = zipfile.ZipFile(stream)
+    members = [info for info in archive.infolist() if not info.is_dir()]
+    if len(members) != 1:
+        raise ValueError(ZIP_MUST_HOLD_ONE_FILE.format(count=len(members)))
+    return typing.cast(typing.BinaryIO, archive.open(members[0]))
+
+
+def _open_zstd(stream: typing.BinaryIO) -> typing.BinaryIO:
+    if zstandard is None:
+        raise ValueError(ZSTD_NOT_INSTALLED)
+    reader: typing.BinaryIO = zstandard.ZstdDecompressor().stream_reader(
+        stream, closefd=False
+    )
+    return reader
+
+
+def decompressed(
+    stream: typing.BinaryIO, encoding: ContentEncoding | None
+) -> typing.BinaryIO:
+    """Return a stream of the decompressed bytes of a compressed stream, decompressing as it is read.
+
+    The returned stream can be sought back to its start, which decompresses the file again, so it can be read twice in bounded memory.
+
+    Args:
+        stream (typing.BinaryIO): The compressed stream, positioned at its start. It must be seekable.
+        encoding (ContentEncoding | None): How the stream is compressed, from `detect_encoding`. If None, `stream` itself is returned.
+
+    Raises:
+        ValueError: If the stream cannot be decompressed.
+    """
+    if encoding is None:
+        return stream
+
+    start = stream.tell()
+
+    def open_reader() -> typing.BinaryIO:
+        stream.seek(start)
+        if encoding == ContentEncoding.GZIP:
+            return typing.cast(typing.BinaryIO, gzip.GzipFile(fileobj=stream))
+        if encoding == ContentEncoding.ZIP:
+            return _open_zip_member(stream)
+        return _open_zstd(stream)
+
+    return typing.cast(typing.BinaryIO, _RewindableReader(encoding, open_reader))
@@ -1,12 +1,224 @@
-"""Contains utility functions for displaying familial analysis results."""
+"""Contains utility functions for reading and displaying familial analysis results.
+
+Results are read from a TSV report, or from an Arrow IPC or Parquet table with the same columns, and the format is detected from the magic bytes at the start of the file rather than its name. A TSV report has to be parsed whole, but a page of rows or a subset of the columns can be read from an Arrow or Parquet table without reading the rest of it: an Arrow file is memory-mapped, so only the pages of the file holding the requested record batches are read from disk, and a Parquet file is read one row group at a time. Arrow and Parquet support needs the optional `pyarrow` package (`pip install genetic-forensic-portal[arrow]`), which also speeds up parsing TSV reports.
+"""
 
 from __future__ import annotations
 
 import typing
+from collections.abc import Sequence
+from enum import StrEnum
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Arrow and Parquet support is optional
+    pa = None
+    pq = None
 
+SEIZURE_COLUMN = "Seizure"
+MATCH_SCORE_COLUMN = "Weighted Match Score"
 EXACT_MATCH_COLUMN = "Includes exact match(es)"
 GREEN_BACKGROUND = "background-color: green"
 
+# Types of the columns of a familial matching report. The exact match flag only ever holds "Y" or "N", so it is kept as a category rather than a string per row.
+FAMILIAL_DTYPES = {
+    SEIZURE_COLUMN: "string",
+    MATCH_SCORE_COLUMN: "float64",
+    EXACT_MATCH_COLUMN: "category",
+}
+
+# pyarrow parses in parallel and is several times faster than pandas' own parser on large reports
+FAMILIAL_PARSER_ENGINE: typing.Literal["c", "pyarrow"] = (
+    "c" if pa is None else "pyarrow"
+)
+
+# Error constants:
+PYARROW_NOT_INSTALLED = (
+    "Reading {format} familial results needs the pyarrow package. Install it with "
+    "`pip install genetic-forensic-portal[arrow]`."
+)
+
+
+class FamilialFormat(StrEnum):
+    """The file formats familial matching results are accepted in."""
+
+    TSV = "tsv"
+    ARROW = "arrow"
+    PARQUET = "parquet"
+
+
+MAGIC_BYTES = {
+    FamilialFormat.ARROW: b"ARROW1",
+    FamilialFormat.PARQUET: b"PAR1",
+}
+
+
+def detect_familial_format(path: Path | str) -> FamilialFormat:
+    """Detect the format of a familial results file from its magic bytes. Files that are neither Arrow IPC nor Parquet are taken to be TSV reports.
+
+    Args:
+        path (Path | str): The path to the results.
+    """
+    with Path(path).open("rb") as results:
+        magic = results.read(max(len(magic) for magic in MAGIC_BYTES.values()))
+    for familial_format, format_magic in MAGIC_BYTES.items():
+        if magic.startswith(format_magic):
+            return familial_format
+    return FamilialFormat.TSV
+
+
+def read_familial_results(
+    path: Path | str,
+    columns: Sequence[str] | None = None,
+    start: int = 0,
+    stop: int | None = None,
+) -> pd.DataFrame:
+    """Read familial matching results, or a range of their rows.
+
+    A TSV report starts with a title line, then a blank line, then a table of the matching seizures separated by tabs. Arrow IPC and Parquet results hold the same table.
+
+    Args:
+        path (Path | str): The path to the results.
+        columns (Sequence[str] | None): The columns to read. Defaults to all of them.
+        start (int): The position of the first row to read.
+        stop (int | None): The position after the last row to read. Defaults to the end of the table.
+
+    Returns:
+        pd.DataFrame: The rows of the table from `start` to `stop`, indexed by their position in the whole table, with the column types in `FAMILIAL_DTYPES`.
+
+    Raises:
+        ValueError: If the table is malformed, for instance if a row has more fields than the header, or if the results are Arrow IPC or Parquet and pyarrow is not installed.
+    """
+    familial_format = detect_familial_format(path)
+    if familial_format == FamilialFormat.TSV:
+        results = _read_tsv(path, columns)
+        if start != 0 or stop is not None:
+            results = results.iloc[start:stop]
+        return results
+
+    results = (
+        _read_arrow(path, columns, start, stop)
+        if familial_format == FamilialFormat.ARROW
+        else _read_parquet(path, columns, start, stop)
+    )
+    results.index = pd.RangeIndex(start, start + len(results))
+    return results.astype(
+        {
+            column: dtype
+            for column, dtype in FAMILIAL_DTYPES.items()
+            if column in results.columns
+        }
+    )
+
+
+def count_familial_results(path: Path | str) -> int:
+    """Return the number of rows in familial matching results. The rows of Arrow IPC and Parquet results are counted without reading them.
+
+    Args:
+        path (Path | str): The path to the results.
+
+    Raises:
+        ValueError: If the results are malformed, or are Arrow IPC or Parquet and pyarrow is not installed.
+    """
+    familial_format = detect_familial_format(path)
+    if familial_format == FamilialFormat.TSV:
+        return len(_read_tsv(path, None))
+
+    _require_pyarrow(familial_format)
+    if familial_format == FamilialFormat.ARROW:
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            return sum(
+                reader.get_batch(batch).num_rows
+                for batch in range(reader.num_record_batches)
+            )
+    return int(pq.ParquetFile(path).metadata.num_rows)
+
+
+def _read_tsv(path: Path | str, columns: Sequence[str] | None) -> pd.DataFrame:
+    with Path(path).open("rb") as report:
+        report.readline()  # title
+        # skip to the header ourselves, as the pyarrow parser treats a blank line as the header
+        while True:
+            position = report.tell()
+            line = report.readline()
+            if not line or line.strip():
+                report.seek(position)
+                break
+        return pd.read_csv(
+            report,
+            sep="\t",
+            usecols=None if columns is None else list(columns),
+            dtype=FAMILIAL_DTYPES,
+            engine=FAMILIAL_PARSER_ENGINE,
+        )
+
+
+def _read_arrow(
+    path: Path | str, columns: Sequence[str] | None, start: int, stop: int | None
+) -> pd.DataFrame:
+    _require_pyarrow(FamilialFormat.ARROW)
+    with pa.memory_map(str(path)) as source:
+        reader = pa.ipc.open_file(source)
+        schema = reader.schema
+        if columns is not None:
+            schema = pa.schema([schema.field(column) for column in columns])
+
+        # record batches are memory-mapped, so those outside the range are never read
+        batches = []
+        offset = 0
+        for index in range(reader.num_record_batches):
+            if stop is not None and offset >= stop:
+                break
+            batch = reader.get_batch(index)
+            rows = batch.num_rows
+            if offset + rows > start:
+                first = max(start - offset, 0)
+                last = rows if stop is None else min(stop - offset, rows)
+                batch = batch.slice(first, last - first)
+                batches.append(batch if columns is None else batch.select(columns))
+            offset += rows
+
+        # convert while the file is still mapped, as the batches point into it
+        results: pd.DataFrame = pa.Table.from_batches(
+            batches, schema=schema
+        ).to_pandas()
+        return results
+
+
+def _read_parquet(
+    path: Path | str, columns: Sequence[str] | None, start: int, stop: int | None
+) -> pd.DataFrame:
+    _require_pyarrow(FamilialFormat.PARQUET)
+    parquet = pq.ParquetFile(path, memory_map=True)
+
+    # only the row groups that overlap the range are read
+    row_groups = []
+    first_offset = None
+    offset = 0
+    for index in range(parquet.metadata.num_row_groups):
+        rows = parquet.metadata.row_group(index).num_rows
+        if offset + rows > start and (stop is None or offset < stop):
+            row_groups.append(index)
+            if first_offset is None:
+                first_offset = offset
+        offset += rows
+
+    table = parquet.read_row_groups(row_groups, columns=columns)
+    first = start - (start if first_offset is None else first_offset)
+    length = None if stop is None else max(stop - start, 0)
+    results: pd.DataFrame = table.slice(first, length).to_pandas()
+    return results
+
+
+def _require_pyarrow(familial_format: FamilialFormat) -> None:
+    if pa is None:
+        raise ValueError(PYARROW_NOT_INSTALLED.format(format=familial_format))
+
 
 def highlight_exact_matches(cell: typing.Any) -> str | None:
     if str(cell) == "Y":
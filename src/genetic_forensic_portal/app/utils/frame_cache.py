@@ -0,0 +1,95 @@
+"""Contains an in-memory cache of DataFrames bounded by the memory they use rather than by their number.
+
+Parsed analysis results vary from a few rows to millions, so a cache that keeps a fixed number of them either wastes its budget on small tables or runs out of memory on large ones.
+"""
+
+from __future__ import annotations
+
+import threading
+import typing
+from collections import OrderedDict
+from collections.abc import Hashable
+
+import pandas as pd
+
+K = typing.TypeVar("K", bound=Hashable)
+
+# Bytes of DataFrames kept
+DEFAULT_MAX_BYTES = 256 * 2**20
+
+
+def frame_size(frame: pd.DataFrame) -> int:
+    """Return the bytes a DataFrame uses, counting the contents of its strings."""
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+class FrameCache(typing.Generic[K]):
+    """A least-recently-used cache of DataFrames that evicts entries once they use more than `max_bytes` between them.
+
+    Cached DataFrames are shared with every caller that gets them, so they must not be modified. The cache is safe to share between threads.
+
+    Args:
+        max_bytes (int): The bytes of DataFrames to keep. A DataFrame bigger than this is never cached.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        # maps each key to its DataFrame and the bytes it uses
+        self._entries: OrderedDict[K, tuple[pd.DataFrame, int]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        """The bytes used by the cached DataFrames."""
+        return self._size
+
+    def get(self, key: K) -> pd.DataFrame | None:
+        """Return the DataFrame cached for a key, or None if there is none.
+
+        Args:
+            key (K): The key the DataFrame was stored under.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: K, frame: pd.DataFrame) -> None:
+        """Cache a DataFrame, evicting the least recently used ones until the cache fits in `max_bytes`.
+
+        Args:
+            key (K): The key to store the DataFrame under.
+            frame (pd.DataFrame): The DataFrame to store.
+        """
+        size = frame_size(frame)
+        with self._lock:
+            self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (frame, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def discard(self, key: K) -> None:
+        """Remove the DataFrame cached for a key, if there is one."""
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        """Remove every cached DataFrame."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: K) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[1]
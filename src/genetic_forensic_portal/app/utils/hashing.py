@@ -0,0 +1,24 @@
+"""Contains utility functions for hashing files without reading them into memory whole."""
+
+from __future__ import annotations
+
+import hashlib
+import typing
+
+# Size of the pieces a stream is read in when hashing it
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def hash_stream(stream: typing.BinaryIO) -> str:
+    """Compute the SHA-256 of a binary stream from its current position, reading it in chunks.
+
+    Args:
+        stream (typing.BinaryIO): The stream to hash. It is left at its end.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256()
+    while chunk := stream.read(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    return digest.hexdigest()
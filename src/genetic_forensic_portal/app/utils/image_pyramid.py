@@ -0,0 +1,160 @@
+"""Contains a cache of downscaled copies of analysis images, keyed by the SHA-256 of the full-size image.
+
+A page that lists hundreds of analyses can show each one's map as a small thumbnail, and a detail page can show a mid-size preview until the full-size image is asked for. Each downscaled copy is made once and kept on disk, and once the copies outgrow `max_bytes` the least recently used ones are removed.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from enum import StrEnum
+from pathlib import Path
+
+from PIL import Image
+
+from genetic_forensic_portal.app.utils.hashing import hash_stream
+
+# Bytes of downscaled images kept on disk
+DEFAULT_MAX_BYTES = 64 * 2**20
+
+# Number of full-size images whose SHA-256 is remembered, so that they are not hashed on every use
+HASH_CACHE_SIZE = 1024
+
+logger = logging.getLogger(__name__)
+
+
+class ImageSize(StrEnum):
+    """The sizes an analysis image can be shown at."""
+
+    THUMBNAIL = "thumbnail"
+    PREVIEW = "preview"
+    FULL = "full"
+
+
+# Longest side, in pixels, of each downscaled size. Images already smaller are not enlarged.
+MAX_DIMENSIONS = {
+    ImageSize.THUMBNAIL: 128,
+    ImageSize.PREVIEW: 480,
+}
+
+
+class ImagePyramid:
+    """A least-recently-used cache of downscaled copies of images, kept on disk and bounded by the bytes they use.
+
+    Copies are named by the SHA-256 of the full-size image and their size, so an image that changes gets new copies, and the same image fetched for different analyses shares them. The directory is only created once the first copy is made. The cache is safe to share between threads and between processes using the same directory.
+
+    Args:
+        directory (Path | str | None): The directory to keep the copies in. Defaults to a temporary directory, which is removed when the cache is garbage collected or the process exits.
+        max_bytes (int): The bytes of copies to keep.
+    """
+
+    def __init__(
+        self, directory: Path | str | None = None, max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self._directory = None if directory is None else Path(directory)
+        self.max_bytes = max_bytes
+        # maps (path, size, modification time) of each full-size image to its SHA-256
+        self._hashes: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self) -> Path:
+        """The directory the copies are kept in, created the first time it is asked for."""
+        with self._lock:
+            if self._directory is None:
+                self._directory = Path(tempfile.mkdtemp(prefix="gf-images-"))
+                # a finalizer also runs at exit, so the temporary directory never outlives the process
+                weakref.finalize(
+                    self, shutil.rmtree, self._directory, ignore_errors=True
+                )
+            self._directory.mkdir(parents=True, exist_ok=True)
+            return self._directory
+
+    def get(self, image_path: Path | str, size: ImageSize) -> str:
+        """Return the path of an image at the given size, downscaling it the first time it is asked for.
+
+        Args:
+            image_path (Path | str): The path of the full-size image.
+            size (ImageSize): The size to show the image at. `ImageSize.FULL` returns `image_path` itself.
+
+        Raises:
+            FileNotFoundError: If there is no image at `image_path`.
+            PIL.UnidentifiedImageError: If the file is not an image.
+        """
+        if size == ImageSize.FULL:
+            return str(image_path)
+
+        path = self.directory / f"{self._hash(Path(image_path))}-{size}.png"
+        try:
+            # the file's modification time orders the copies by last use
+            os.utime(path)
+            return str(path)
+        except FileNotFoundError:
+            pass
+
+        # write then rename, so that a concurrent reader never sees a partial image
+        partial_path = path.with_suffix(f".{threading.get_ident()}.partial")
+        with Image.open(image_path) as image:
+            image.thumbnail(
+                (MAX_DIMENSIONS[size], MAX_DIMENSIONS[size]), Image.Resampling.LANCZOS
+            )
+            image.save(partial_path, format="PNG", optimize=True)
+        partial_path.replace(path)
+
+        self._evict(keep=path)
+        return str(path)
+
+    def size(self) -> int:
+        """Return the bytes used by the cached copies."""
+        return sum(stat.st_size for _, stat in self._entries())
+
+    def clear(self) -> None:
+        """Remove every cached copy."""
+        for entry, _ in self._entries():
+            entry.unlink(missing_ok=True)
+
+    def _hash(self, image_path: Path) -> str:
+        stat = image_path.stat()
+        key = (str(image_path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            content_hash = self._hashes.get(key)
+            if content_hash is not None:
+                self._hashes.move_to_end(key)
+                return content_hash
+
+        with image_path.open("rb") as image:
+            content_hash = hash_stream(image)
+
+        with self._lock:
+            self._hashes[key] = content_hash
+            while len(self._hashes) > HASH_CACHE_SIZE:
+                self._hashes.popitem(last=False)
+        return content_hash
+
+    def _entries(self) -> list[tuple[Path, os.stat_result]]:
+        entries: list[tuple[Path, os.stat_result]] = []
+        if self._directory is None:
+            return entries  # no copy has been made yet
+        for entry in self._directory.glob("*.png"):
+            try:
+                entries.append((entry, entry.stat()))
+            except FileNotFoundError:
+                continue  # removed by another thread or process
+        return entries
+
+    def _evict(self, keep: Path) -> None:
+        entries = sorted(self._entries(), key=lambda entry: entry[1].st_mtime)
+        total = sum(stat.st_size for _, stat in entries)
+        for entry, stat in entries:
+            if total <= self.max_bytes:
+                break
+            if entry == keep:
+                continue
+            entry.unlink(missing_ok=True)
+            total -= stat.st_size
+            logger.debug("Evicted %s from the image cache", entry.name)
@@ -0,0 +1,53 @@
+"""Contains a scheduler that fetches, in the background, what a user is likely to open next.
+
+A page that lists analyses knows which of them the user can see and might open, so their results can be loaded into the caches while the user is still reading the list. Once the user moves on, the prefetches they no longer need are cancelled, so that they do not hold up those of other users.
+"""
+
+from __future__ import annotations
+
+import threading
+import typing
+from collections.abc import Callable, Hashable, Mapping
+from concurrent.futures import Executor, Future
+
+K = typing.TypeVar("K", bound=Hashable)
+
+
+class PrefetchScheduler(typing.Generic[K]):
+    """Runs prefetches on a shared pool of threads, cancelling those that have not started once they are no longer wanted.
+
+    A prefetch that has started cannot be stopped, so it runs to the end and fills the caches anyway. The scheduler is safe to share between threads.
+
+    Args:
+        executor (Executor): The threads to run prefetches on. Sharing them between schedulers bounds the prefetches of every user together.
+    """
+
+    def __init__(self, executor: Executor):
+        self._executor = executor
+        # maps each wanted key to its latest prefetch, which may have finished
+        self._prefetches: dict[K, Future[typing.Any]] = {}
+        self._lock = threading.Lock()
+
+    def schedule(self, prefetches: Mapping[K, Callable[[], typing.Any]]) -> None:
+        """Queue prefetches in the order given, and cancel every other prefetch that has not started.
+
+        Keys whose prefetch is still queued or running are not prefetched again, so a page can schedule the same keys on each rerun. Keys whose prefetch has finished are prefetched again, in case what it cached has since been evicted.
+
+        Args:
+            prefetches (Mapping[K, Callable[[], typing.Any]]): The prefetch to run for each wanted key. The prefetches should not raise, as nothing waits for their results.
+        """
+        with self._lock:
+            for key in [key for key in self._prefetches if key not in prefetches]:
+                self._prefetches.pop(key).cancel()
+            for key, prefetch in prefetches.items():
+                if key not in self._prefetches or self._prefetches[key].done():
+                    self._prefetches[key] = self._executor.submit(prefetch)
+
+    def cancel(self) -> None:
+        """Cancel every prefetch that has not started."""
+        self.schedule({})
+
+    def pending(self) -> int:
+        """Return the number of prefetches that are queued or running."""
+        with self._lock:
+            return sum(not prefetch.done() for prefetch in self._prefetches.values())
@@ -0,0 +1,58 @@
+"""Contains a pool of worker processes that lasts as long as the server and is replaced if a worker dies.
+
+Starting worker processes is slow, all the more so with "spawn", so CPU-bound work from every session shares one long-lived pool rather than each call starting its own. A worker that dies, for instance when it is killed for using too much memory, breaks a `ProcessPoolExecutor` for good, so the pool is replaced rather than failing every later call.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import threading
+import typing
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+T = typing.TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessPool:
+    """Runs functions in worker processes that are started on first use and kept until `shutdown`.
+
+    The functions, their arguments and their results must be picklable. The pool is safe to share between threads.
+
+    Args:
+        max_workers (int): The number of worker processes.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, function: Callable[..., T], *args: typing.Any) -> Future[T]:
+        """Run `function(*args)` in a worker process, starting a new pool if there is none or a worker of the last one died.
+
+        Calls that were running when a worker died raise BrokenProcessPool, a RuntimeError, from their futures."""
+        with self._lock:
+            if self._executor is not None:
+                try:
+                    return self._executor.submit(function, *args)
+                except BrokenProcessPool:
+                    logger.warning("A worker process died; starting a new pool")
+                    self._executor.shutdown(wait=False)
+            # "spawn" rather than "fork": forking the multi-threaded Streamlit server is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            return self._executor.submit(function, *args)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, cancelling the calls that have not started. The next `submit` starts a new pool."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,153 @@
+"""Contains a bounded-memory counter of how often each SID (sample ID) occurs in an input file.
+
+Consolidated reference-panel files can hold millions of samples, and keeping a Python list of line numbers per SID costs hundreds of MB. This tracker keeps only a count and the first line number for each SID, in arrays, and once it has seen more SIDs than a threshold it moves them to a temporary on-disk SQLite database.
+"""
+
+from __future__ import annotations
+
+import array
+import sqlite3
+import sys
+from collections.abc import Iterator
+from types import TracebackType
+from typing import Self
+
+# Number of distinct SIDs kept in memory before spilling them to disk
+DEFAULT_SPILL_THRESHOLD = 200_000
+
+# Number of SID occurrences buffered in memory between writes once spilled
+SPILL_BATCH_SIZE = 10_000
+
+_CREATE_TABLE = """
+    CREATE TABLE sids (
+        sid TEXT PRIMARY KEY,
+        ordinal INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        first_line INTEGER NOT NULL
+    )
+"""
+# a SID seen before keeps its ordinal and first line, and only its count grows
+_UPSERT = """
+    INSERT INTO sids (sid, ordinal, count, first_line) VALUES (?, ?, ?, ?)
+    ON CONFLICT (sid) DO UPDATE SET count = count + excluded.count
+"""
+_SELECT_UNPAIRED = """
+    SELECT sid, count, first_line FROM sids WHERE count != 2 ORDER BY ordinal
+"""
+
+
+class SampleIdTracker:
+    """Counts the occurrences of each SID, along with the line it was first seen on.
+
+    Use as a context manager, or call `close`, to remove the on-disk store once done.
+
+    Args:
+        spill_threshold (int): The number of distinct SIDs to keep in memory before moving them to disk.
+    """
+
+    def __init__(self, spill_threshold: int = DEFAULT_SPILL_THRESHOLD):
+        self.spill_threshold = spill_threshold
+        self._ordinals: dict[str, int] = {}
+        self._counts = array.array("L")
+        self._first_lines = array.array("Q")
+        self._connection: sqlite3.Connection | None = None
+        self._pending: dict[str, list[int]] = {}
+        self._next_ordinal = 0
+
+    @property
+    def spilled(self) -> bool:
+        """Whether the SIDs have been moved to disk."""
+        return self._connection is not None
+
+    def add(self, sid: str, lineno: int) -> None:
+        """Record that a SID was found on a line.
+
+        Args:
+            sid (str): The SID found.
+            lineno (int): The line it was found on.
+        """
+        if self._connection is not None:
+            self._add_pending(sid, lineno)
+            return
+
+        ordinal = self._ordinals.get(sid)
+        if ordinal is None:
+            self._ordinals[sys.intern(sid)] = len(self._counts)
+            self._counts.append(1)
+            self._first_lines.append(lineno)
+            if len(self._counts) > self.spill_threshold:
+                self._spill()
+        else:
+            self._counts[ordinal] += 1
+
+    def iter_unpaired(self) -> Iterator[tuple[str, int, int]]:
+        """Yield each SID not found exactly twice, in the order they were first seen.
+
+        Yields:
+            tuple[str, int, int]: The SID, the number of times it was found, and the first line it was found on.
+        """
+        if self._connection is None:
+            for sid, ordinal in self._ordinals.items():
+                if self._counts[ordinal] != 2:
+                    yield sid, self._counts[ordinal], self._first_lines[ordinal]
+            return
+
+        self._flush()
+        yield from self._connection.execute(_SELECT_UNPAIRED)
+
+    def close(self) -> None:
+        """Release the on-disk store, if any."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _spill(self) -> None:
+        # an empty filename gives a private on-disk database that is deleted on close
+        self._connection = sqlite3.connect("")
+        self._connection.execute(_CREATE_TABLE)
+        self._connection.executemany(
+            _UPSERT,
+            (
+                (sid, ordinal, self._counts[ordinal], self._first_lines[ordinal])
+                for sid, ordinal in self._ordinals.items()
+            ),
+        )
+        self._next_ordinal = len(self._counts)
+        self._ordinals = {}
+        self._counts = array.array("L")
+        self._first_lines = array.array("Q")
+
+    def _add_pending(self, sid: str, lineno: int) -> None:
+        pending = self._pending.get(sid)
+        if pending is None:
+            self._pending[sid] = [self._next_ordinal, 1, lineno]
+            self._next_ordinal += 1
+        else:
+            pending[1] += 1
+
+        if len(self._pending) >= SPILL_BATCH_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._connection is None or not self._pending:
+            return
+
+        self._connection.executemany(
+            _UPSERT,
+            (
+                (sid, ordinal, count, first_line)
+                for sid, (ordinal, count, first_line) in self._pending.items()
+            ),
+        )
+        self._pending = {}
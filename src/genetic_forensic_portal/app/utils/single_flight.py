@@ -0,0 +1,60 @@
+"""Contains a way for concurrent identical calls to share one run of a slow function.
+
+Every Streamlit session runs its page scripts on its own thread, so when an analysis is shared with a team, many sessions ask for the same results at the same moment. Rather than each of them fetching the results from the API, the first caller fetches them and the rest wait for its result.
+"""
+
+from __future__ import annotations
+
+import threading
+import typing
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+
+K = typing.TypeVar("K", bound=Hashable)
+V = typing.TypeVar("V")
+
+
+class SingleFlight(typing.Generic[K, V]):
+    """Runs at most one call per key at a time, handing its result, or the exception it raised, to every caller that asked for the same key while it ran.
+
+    Nothing is kept once a call finishes, so a caller that arrives afterwards runs the function again. Callers that share a call share the object it returned, so it must not be modified. The object is safe to share between threads.
+    """
+
+    def __init__(self) -> None:
+        # maps each key to the result of the call running for it
+        self._calls: dict[K, Future[V]] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: K, function: Callable[[], V]) -> V:
+        """Call `function`, or wait for the call already running for `key` and return its result.
+
+        Args:
+            key (K): Identifies the calls that can share a result.
+            function (Callable[[], V]): The function to call if no call is running for `key`.
+
+        Raises:
+            Exception: Whatever the shared call raised.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = Future()
+
+        if not leader:
+            return call.result()
+
+        try:
+            result = function()
+        except BaseException as error:
+            call.set_exception(error)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def __len__(self) -> int:
+        return len(self._calls)
@@ -0,0 +1,84 @@
+"""Contains a bounded in-memory cache whose entries expire a fixed time after they are stored.
+
+Streamlit reruns a page's whole script on every widget interaction, so results that are slow to fetch but change rarely, like the list of analyses a user may view, are worth keeping for a short while between runs.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import typing
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+
+K = typing.TypeVar("K", bound=Hashable)
+V = typing.TypeVar("V")
+
+# Number of entries kept
+DEFAULT_MAX_ENTRIES = 128
+
+# Seconds an entry is kept for after it is stored
+DEFAULT_TTL = 30.0
+
+
+class TtlCache(typing.Generic[K, V]):
+    """A least-recently-used cache whose entries also expire `ttl` seconds after they are stored.
+
+    The cache is safe to share between threads.
+
+    Args:
+        max_entries (int): The number of entries to keep.
+        ttl (float): Seconds an entry is kept for after it is stored.
+        clock (Callable[[], float]): Returns the current time in seconds. Defaults to `time.monotonic`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl: float = DEFAULT_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        # maps each key to its value and the time it expires at
+        self._entries: OrderedDict[K, tuple[V, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        """Return the value cached for a key, or None if there is none or it has expired.
+
+        Args:
+            key (K): The key the value was stored under.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if self._clock() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: K, value: V) -> None:
+        """Cache a value, evicting the least recently used entry if the cache is full.
+
+        Args:
+            key (K): The key to store the value under.
+            value (V): The value to store.
+        """
+        with self._lock:
+            self._entries[key] = (value, self._clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every cached value."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
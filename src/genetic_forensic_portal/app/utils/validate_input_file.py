@@ -4,8 +4,25 @@ This file originally from Mary (mkkuhner) @ UW's Center for Environmental Forens
 
 # This file originally from Mary (mkkuhner) @ UW's Center for Environmental Forensic Science
 
+from __future__ import annotations
+
+import array
+import codecs
+import csv
 import io
+import itertools
 import logging
+import typing
+from collections.abc import Callable, Iterable, Iterator
+from enum import StrEnum
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from genetic_forensic_portal.app.utils import compression
+from genetic_forensic_portal.app.utils.sample_id_tracker import SampleIdTracker
 
 # Check an input microsatellite file for legality
 
@@ -28,6 +45,19 @@ MSAT_NAMES = [
     "S04",
 ]
 MSATS = len(MSAT_NAMES)
+MAX_MSAT_VALUE = 300
+MISSING_MSAT_VALUE = -999
+
+# Identifies the panel and the rules above. Bump it whenever either changes, so that
+# validation results cached for a file are not reused under the new rules.
+PANEL_VERSION = "1"
+
+# Every canonical spelling of a legal msat value, mapped to its value. The alphabet is
+# shared by all the loci in the panel, so one table serves every column, and the values
+# are shared int objects rather than a fresh int per cell.
+LEGAL_MSAT_TOKENS: dict[str, int] = {
+    str(value): value for value in (*range(1, MAX_MSAT_VALUE + 1), MISSING_MSAT_VALUE)
+}
 
 # Error constants:
 ERROR_TEMPLATE = "Error in uploaded file line {lineno}:  {error}"
@@ -41,14 +71,130 @@ ILLEGAL_MSAT_VALUE = "Illegal msat value {msat_value}"
 ONLY_ONE_HAPLOTYPE_FOR_SID = "{sid} has {count} haplotype but should have 2"
 TOO_MANY_HAPLOTYPES_FOR_SID = "{sid} has {count} haplotypes but should have 2"
 
+# Size of the pieces an uploaded file is read in when validating it as a stream
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Number of errors after which a validation report stops checking the file
+DEFAULT_MAX_ERRORS = 1000
+
+# Validation report table columns:
+LINE_COLUMN = "Line"
+ERROR_TYPE_COLUMN = "Error type"
+ERROR_COLUMN = "Error"
+
 logger = logging.getLogger(__name__)
 
-# functions
+# classes
+
+
+class ErrorType(StrEnum):
+    """The kinds of problems that can be found in an input file."""
+
+    HEADER = "Header"
+    MSAT_COUNT = "Microsatellite count"
+    MSAT_VALUE = "Microsatellite value"
+    HAPLOTYPE_COUNT = "Haplotype count"
+
+
+class _ErrorBudgetExhausted(Exception):
+    """Raised internally to stop validating once a report holds its maximum number of errors."""
 
 
-def report_error(lineno: str | int, error: str) -> None:
-    """Raise an error with a line number and error message."""
-    raise ValueError(ERROR_TEMPLATE.format(lineno=lineno, error=error))
+class ValidationReport:
+    """The errors found while validating an input file.
+
+    Validation stops once `max_errors` errors have been found, so the report for a file with many problems may not cover the whole file.
+
+    Attributes:
+    - `errors`: The errors found, in the order they were found, as (error type, line number(s), error message) tuples.
+    - `max_errors`: The number of errors after which validation stops, or None to check the whole file.
+    - `truncated`: Whether validation stopped because `max_errors` was reached.
+    """
+
+    def __init__(self, max_errors: int | None = DEFAULT_MAX_ERRORS):
+        self.errors: list[tuple[ErrorType, str, str]] = []
+        self.max_errors = max_errors
+        self.truncated = False
+
+    @property
+    def is_valid(self) -> bool:
+        """Whether no errors were found."""
+        return not self.errors
+
+    def add_error(self, error_type: ErrorType, lineno: str | int, error: str) -> None:
+        """Record an error with a line number and error message, stopping validation if the error budget is used up."""
+        self.errors.append((error_type, str(lineno), error))
+        if self.max_errors is not None and len(self.errors) >= self.max_errors:
+            self.truncated = True
+            raise _ErrorBudgetExhausted
+
+    def messages(self) -> list[str]:
+        """The errors formatted as they are shown to the user."""
+        return [
+            ERROR_TEMPLATE.format(lineno=lineno, error=error)
+            for _, lineno, error in self.errors
+        ]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """The errors as a table with one row per error."""
+        return pd.DataFrame(
+            [
+                (lineno, error_type.value, error)
+                for error_type, lineno, error in self.errors
+            ],
+            columns=[LINE_COLUMN, ERROR_TYPE_COLUMN, ERROR_COLUMN],
+        )
+
+
+class GenotypeMatrix:
+    """The genotypes read from a legal input file, one row per sample.
+
+    Attributes:
+    - `sample_ids`: The SIDs (sample IDs), in the order they first appear in the file.
+    - `alleles`: A masked int16 array of shape (number of samples, 2, MSATS) holding the two haplotypes of each sample in file order, with missing values (-999) masked.
+    - `msat_names`: The microsatellite each column of `alleles` holds.
+    """
+
+    def __init__(
+        self, sample_ids: list[str], alleles: np.ma.MaskedArray[typing.Any, typing.Any]
+    ):
+        self.sample_ids = sample_ids
+        self.alleles = alleles
+        self.msat_names = MSAT_NAMES
+
+    def __len__(self) -> int:
+        return len(self.sample_ids)
+
+    @classmethod
+    def from_haplotypes(
+        cls, sidlines: dict[str, list[int]], haplotypes: array.array[int]
+    ) -> GenotypeMatrix:
+        """Build the matrix from the msat values of every data line, in file order, and the line numbers each SID was found on.
+
+        Args:
+            sidlines (dict[str, list[int]]): The two line numbers each SID was found on.
+            haplotypes (array.array[int]): The msat values of every data line, one after the other.
+        """
+        lines = np.frombuffer(haplotypes, dtype=np.int16).reshape(-1, MSATS)
+        # data lines start at line 2
+        rows = np.array(list(sidlines.values()), dtype=np.intp).reshape(-1, 2) - 2
+        return cls(
+            list(sidlines),
+            np.ma.masked_equal(lines[rows], MISSING_MSAT_VALUE),
+        )
+
+
+class InvalidInputFileError(ValueError):
+    """Raised when an input file is not legal.
+
+    The message is the first error found; the full report is available as `report`."""
+
+    def __init__(self, report: ValidationReport):
+        super().__init__(report.messages()[0])
+        self.report = report
+
+
+# functions
 
 
 def legal_msat_value(msat: str | int) -> bool:
@@ -61,66 +207,90 @@ def legal_msat_value(msat: str | int) -> bool:
         msat = int(msat)
     except ValueError:
         return False
-    if msat == -999:
+    if msat == MISSING_MSAT_VALUE:
         return True
-    return 0 < msat <= 300
+    return 0 < msat <= MAX_MSAT_VALUE
 
 
-def validate_input_file(infile: io.StringIO) -> None:
-    """Check that the input file is legal.
+def parse_msat_value(msat: str) -> int | None:
+    """Parse a microsatellite value, returning None if it is not legal.
 
-    That is to say, check the following:
-    - The header starts with "MatchID"
-    - The header contains the correct number of microsatellites
-    - The header contains the correct microsatellites
-    - Each line contains the correct number of microsatellites
-    - Each microsatellite value is legal
-    - Each SID (sample ID) is present exactly twice
+    Canonical spellings are a single lookup in `LEGAL_MSAT_TOKENS`; only other spellings that `int()` accepts (such as "+12" or "012") fall back to `legal_msat_value`. Either way the value returned is the shared int from the table.
 
     Args:
-        infile (io.StringIO): The input file to check.
+        msat (str): The microsatellite value to parse.
     """
-    # read input file
-    headerline = infile.readline()
-    datalines = infile.readlines()
+    value = LEGAL_MSAT_TOKENS.get(msat)
+    if value is None and legal_msat_value(msat):
+        value = LEGAL_MSAT_TOKENS[str(int(msat))]
+    return value
 
-    # check header legality:
+
+def validate_header(headerline: str, report: ValidationReport) -> None:
+    """Check that the header line of an input file is legal.
+
+    Args:
+        headerline (str): The first line of the input file.
+        report (ValidationReport): The report to record errors in.
+    """
     lineno = 1
     header = headerline.rstrip().split("\t")
 
     if header[0] != "MatchID":
         errormsg = HEADER_MUST_START_WITH_MATCHID
-        report_error(lineno, errormsg)
+        report.add_error(ErrorType.HEADER, lineno, errormsg)
 
     msatnames = header[1:]
     num_msats = len(msatnames)
     if num_msats != MSATS:
         errormsg = INCORRECT_NUM_MSATS_IN_HEADER.format(num_msats_found=num_msats)
-        report_error(lineno, errormsg)
+        report.add_error(ErrorType.HEADER, lineno, errormsg)
     if msatnames != MSAT_NAMES:
         errormsg = INCORRECT_MSAT_NAMES
-        report_error(lineno, errormsg)
+        report.add_error(ErrorType.HEADER, lineno, errormsg)
 
-    # check entry legality:
-    sidlines: dict[str, list[int]] = {}
-    for dataline in datalines:
-        lineno += 1
-        line = dataline.rstrip().split("\t")
-        sid = line[0]
-        if sid not in sidlines:
-            sidlines[sid] = []
-        sidlines[sid].append(lineno)
-        msats = line[1:]
-        if len(msats) != MSATS:
-            errormsg = INCORRECT_NUM_MSATS.format(num_msats_found=len(msats))
-            report_error(lineno, errormsg)
 
-        for msat in msats:
-            if not legal_msat_value(msat):
+def validate_line(
+    lineno: int, dataline: str, report: ValidationReport
+) -> tuple[str, list[int | None]]:
+    """Check that a single data line of an input file is legal.
+
+    Args:
+        lineno (int): The line number of the data line, used in error messages.
+        dataline (str): The data line to check.
+        report (ValidationReport): The report to record errors in.
+
+    Returns:
+        tuple[str, list[int | None]]: The SID (sample ID) found on the line, and its parsed msat values (None where illegal).
+    """
+    line = dataline.rstrip().split("\t")
+    sid = line[0]
+    msats = line[1:]
+    if len(msats) != MSATS:
+        errormsg = INCORRECT_NUM_MSATS.format(num_msats_found=len(msats))
+        report.add_error(ErrorType.MSAT_COUNT, lineno, errormsg)
+
+    # look every value up in one pass, and only go back over the line if one missed
+    alleles = list(map(LEGAL_MSAT_TOKENS.get, msats))
+    if None in alleles:
+        for index, msat in enumerate(msats):
+            alleles[index] = parse_msat_value(msat)
+            if alleles[index] is None:
                 errormsg = ILLEGAL_MSAT_VALUE.format(msat_value=msat)
-                report_error(lineno, errormsg)
+                report.add_error(ErrorType.MSAT_VALUE, lineno, errormsg)
 
-    # check that each SID present exactly twice
+    return sid, alleles
+
+
+def validate_haplotype_counts(
+    sidlines: dict[str, list[int]], report: ValidationReport
+) -> None:
+    """Check that each SID (sample ID) is present exactly twice.
+
+    Args:
+        sidlines (dict[str, list[int]]): The line numbers each SID was found on, in the order the SIDs were first seen.
+        report (ValidationReport): The report to record errors in.
+    """
     for sid, lines in sidlines.items():
         count = len(lines)
         if count != 2:
@@ -130,6 +300,451 @@ def validate_input_file(infile: io.StringIO) -> None:
                 errormsg = ONLY_ONE_HAPLOTYPE_FOR_SID.format(sid=sid, count=count)
             else:
                 errormsg = TOO_MANY_HAPLOTYPES_FOR_SID.format(sid=sid, count=count)
-            report_error(reporting_lines, errormsg)
+            report.add_error(ErrorType.HAPLOTYPE_COUNT, reporting_lines, errormsg)
+
+
+def _run_checks(
+    checks: Callable[[ValidationReport], object], report: ValidationReport
+) -> ValidationReport:
+    """Run validation checks against a report, stopping early if its error budget is used up."""
+    try:
+        checks(report)
+    except _ErrorBudgetExhausted:
+        logger.info("Stopped validating after %d errors", len(report.errors))
+
+    if report.is_valid:
+        logger.info("No errors detected")
+
+    return report
+
+
+def _raise_if_invalid(report: ValidationReport) -> None:
+    if not report.is_valid:
+        raise InvalidInputFileError(report)
+
+
+def _validate_lines(
+    lines: Iterable[str],
+    report: ValidationReport,
+    alleles: array.array[int] | None = None,
+) -> dict[str, list[int]]:
+    """Check that the lines of an input file, header first, are legal.
+
+    While no errors have been found, the msat values of each line are appended to `alleles`, if given. Returns the line numbers each SID was found on."""
+    lines = iter(lines)
+
+    # check header legality:
+    validate_header(next(lines, ""), report)
+
+    # check entry legality:
+    sidlines: dict[str, list[int]] = {}
+    for lineno, dataline in enumerate(lines, start=2):
+        sid, line_alleles = validate_line(lineno, dataline, report)
+        if sid not in sidlines:
+            sidlines[sid] = []
+        sidlines[sid].append(lineno)
+        if alleles is not None and report.is_valid:
+            alleles.extend(typing.cast(list[int], line_alleles))
+
+    # check that each SID present exactly twice
+    validate_haplotype_counts(sidlines, report)
+
+    return sidlines
+
+
+def _validate_lines_bounded(
+    read_lines: Callable[[], Iterable[str]],
+    report: ValidationReport,
+    sid_spill_threshold: int,
+) -> None:
+    """Check that the lines of an input file, header first, are legal, tracking SIDs in bounded memory.
+
+    Only a count and the first line number are kept for each SID, so the lines are read a second time, with `read_lines`, to find every line of the SIDs that were found more than twice."""
+    lines = iter(read_lines())
+
+    # check header legality:
+    validate_header(next(lines, ""), report)
+
+    # check entry legality:
+    with SampleIdTracker(sid_spill_threshold) as sid_tracker:
+        for lineno, dataline in enumerate(lines, start=2):
+            sid, _ = validate_line(lineno, dataline, report)
+            sid_tracker.add(sid, lineno)
+
+        # only as many bad SIDs as the report still has room for are needed
+        remaining_errors = (
+            None
+            if report.max_errors is None
+            else report.max_errors - len(report.errors)
+        )
+        unpaired = list(itertools.islice(sid_tracker.iter_unpaired(), remaining_errors))
+
+    # re-scan the file for the lines of SIDs found more than twice
+    sidlines = {
+        sid: [first_line] if count == 1 else [] for sid, count, first_line in unpaired
+    }
+    repeated = {sid for sid, count, _ in unpaired if count > 2}
+    if repeated:
+        data_lines = itertools.islice(read_lines(), 1, None)
+        for lineno, dataline in enumerate(data_lines, start=2):
+            sid = dataline.rstrip().split("\t", 1)[0]
+            if sid in repeated:
+                sidlines[sid].append(lineno)
+
+    # check that each SID present exactly twice
+    validate_haplotype_counts(sidlines, report)
+
+
+def _check_lines(
+    read_lines: Callable[[], Iterable[str]],
+    max_errors: int | None,
+    sid_spill_threshold: int | None,
+) -> ValidationReport:
+    """Check the lines of an input file, returned by `read_lines` from the start of the file each time it is called."""
+
+    def checks(report: ValidationReport) -> None:
+        if sid_spill_threshold is None:
+            _validate_lines(read_lines(), report)
+        else:
+            _validate_lines_bounded(read_lines, report, sid_spill_threshold)
+
+    return _run_checks(checks, ValidationReport(max_errors))
+
+
+def check_input_file(
+    infile: io.StringIO,
+    max_errors: int | None = DEFAULT_MAX_ERRORS,
+    sid_spill_threshold: int | None = None,
+) -> ValidationReport:
+    """Check that the input file is legal and report every error found.
+
+    Performs the same checks as `validate_input_file`, but keeps going after an error so that all the problems with a file can be fixed at once.
 
-    logger.info("No errors detected")
+    Args:
+        infile (io.StringIO): The input file to check.
+        max_errors (int | None): The number of errors after which to stop checking, or None to check the whole file.
+        sid_spill_threshold (int | None): If set, track SIDs in bounded memory, moving them to disk once more than this many have been seen. The file may then be read twice.
+
+    Returns:
+        ValidationReport: The errors found.
+    """
+    start = infile.tell()
+
+    def read_lines() -> io.StringIO:
+        infile.seek(start)
+        return infile
+
+    return _check_lines(read_lines, max_errors, sid_spill_threshold)
+
+
+def validate_input_file(
+    infile: io.StringIO,
+    max_errors: int | None = 1,
+    sid_spill_threshold: int | None = None,
+) -> None:
+    """Check that the input file is legal.
+
+    That is to say, check the following:
+    - The header starts with "MatchID"
+    - The header contains the correct number of microsatellites
+    - The header contains the correct microsatellites
+    - Each line contains the correct number of microsatellites
+    - Each microsatellite value is legal
+    - Each SID (sample ID) is present exactly twice
+
+    Args:
+        infile (io.StringIO): The input file to check.
+        max_errors (int | None): The number of errors to collect before raising. By default, raises on the first error.
+        sid_spill_threshold (int | None): If set, track SIDs in bounded memory. See `check_input_file`.
+
+    Raises:
+        InvalidInputFileError: If the file is not legal.
+    """
+    _raise_if_invalid(check_input_file(infile, max_errors, sid_spill_threshold))
+
+
+def _read_genotypes(lines: Iterable[str], max_errors: int | None) -> GenotypeMatrix:
+    haplotypes = array.array("h")
+    sidlines: dict[str, list[int]] = {}
+
+    def checks(report: ValidationReport) -> None:
+        sidlines.update(_validate_lines(lines, report, haplotypes))
+
+    _raise_if_invalid(_run_checks(checks, ValidationReport(max_errors)))
+    return GenotypeMatrix.from_haplotypes(sidlines, haplotypes)
+
+
+def read_genotypes(infile: io.StringIO, max_errors: int | None = 1) -> GenotypeMatrix:
+    """Check that the input file is legal and return its genotypes.
+
+    Performs the same checks as `validate_input_file`, keeping the parsed values as it goes, so later steps can use the genotypes without parsing the file again.
+
+    Args:
+        infile (io.StringIO): The input file to read.
+        max_errors (int | None): The number of errors to collect before raising. By default, raises on the first error.
+
+    Returns:
+        GenotypeMatrix: The genotypes of every sample in the file.
+
+    Raises:
+        InvalidInputFileError: If the file is not legal.
+    """
+    return _read_genotypes(infile, max_errors)
+
+
+def iter_lines(
+    stream: typing.BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[str]:
+    """Decode a binary UTF-8 stream incrementally and yield its lines.
+
+    The stream is read in fixed-size chunks, so only one chunk and the line currently being assembled are held in memory at a time. Lines keep their trailing newline, as they would when iterating over a text file.
+
+    Args:
+        stream (typing.BinaryIO): The binary file-like object to read.
+        chunk_size (int): The number of bytes to read at a time.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    partial_line = ""
+    while chunk := stream.read(chunk_size):
+        lines = (partial_line + decoder.decode(chunk)).split("\n")
+        partial_line = lines.pop()
+        for line in lines:
+            yield line + "\n"
+
+    partial_line += decoder.decode(b"", final=True)
+    if partial_line:
+        yield partial_line
+
+
+def check_input_stream(
+    stream: typing.BinaryIO,
+    max_errors: int | None = DEFAULT_MAX_ERRORS,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    sid_spill_threshold: int | None = None,
+) -> ValidationReport:
+    """Check that an uploaded input file is legal, reading it as a stream of bytes, and report every error found.
+
+    Performs the same checks as `validate_input_file`, but decodes and validates the file line by line as it is read, so the file itself is never held in memory. With `sid_spill_threshold` set, the SIDs seen are kept in bounded memory too, so peak memory stays flat however large the file is. The stream is left where validation stopped.
+
+    Args:
+        stream (typing.BinaryIO): The binary file-like object to check, e.g. the file returned by `st.file_uploader`.
+        max_errors (int | None): The number of errors after which to stop checking, or None to check the whole file.
+        chunk_size (int): The number of bytes to read at a time.
+        sid_spill_threshold (int | None): If set, track SIDs in bounded memory, moving them to disk once more than this many have been seen. The stream must then be seekable, as it may be read twice.
+
+    Returns:
+        ValidationReport: The errors found.
+    """
+    start = stream.tell()
+
+    def read_lines() -> Iterator[str]:
+        stream.seek(start)
+        return iter_lines(stream, chunk_size)
+
+    return _check_lines(read_lines, max_errors, sid_spill_threshold)
+
+
+def check_input_bytes(
+    data: bytes,
+    max_errors: int | None = DEFAULT_MAX_ERRORS,
+    sid_spill_threshold: int | None = None,
+) -> ValidationReport:
+    """Check that an input file held in memory as bytes is legal and report every error found.
+
+    Takes and returns only picklable values, so it can be run in a worker process. Compressed files are decompressed as they are checked.
+
+    Args:
+        data (bytes): The contents of the input file, optionally compressed with one of the formats in `compression.ContentEncoding`.
+        max_errors (int | None): The number of errors after which to stop checking, or None to check the whole file.
+        sid_spill_threshold (int | None): If set, track SIDs in bounded memory. See `check_input_stream`.
+
+    Returns:
+        ValidationReport: The errors found.
+
+    Raises:
+        ValueError: If the file is compressed but cannot be decompressed.
+    """
+    stream = io.BytesIO(data)
+    return check_input_stream(
+        compression.decompressed(stream, compression.detect_encoding(stream)),
+        max_errors,
+        sid_spill_threshold=sid_spill_threshold,
+    )
+
+
+def check_input_path(
+    path: str,
+    max_errors: int | None = DEFAULT_MAX_ERRORS,
+    sid_spill_threshold: int | None = None,
+) -> ValidationReport:
+    """Check that an input file on disk is legal and report every error found.
+
+    Takes and returns only picklable values, so it can be run in a worker process. The file is read as a stream rather than into memory, and decompressed as it is checked if need be.
+
+    Args:
+        path (str): The path of the input file, optionally compressed with one of the formats in `compression.ContentEncoding`.
+        max_errors (int | None): The number of errors after which to stop checking, or None to check the whole file.
+        sid_spill_threshold (int | None): If set, track SIDs in bounded memory. See `check_input_stream`.
+
+    Returns:
+        ValidationReport: The errors found.
+
+    Raises:
+        ValueError: If the file is compressed but cannot be decompressed.
+    """
+    with Path(path).open("rb") as stream:
+        return check_input_stream(
+            compression.decompressed(stream, compression.detect_encoding(stream)),
+            max_errors,
+            sid_spill_threshold=sid_spill_threshold,
+        )
+
+
+def validate_input_stream(
+    stream: typing.BinaryIO,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_errors: int | None = 1,
+    sid_spill_threshold: int | None = None,
+) -> None:
+    """Check that an uploaded input file is legal, reading it as a stream of bytes.
+
+    See `check_input_stream`.
+
+    Args:
+        stream (typing.BinaryIO): The binary file-like object to check, e.g. the file returned by `st.file_uploader`.
+        chunk_size (int): The number of bytes to read at a time.
+        max_errors (int | None): The number of errors to collect before raising. By default, raises on the first error.
+        sid_spill_threshold (int | None): If set, track SIDs in bounded memory. See `check_input_stream`.
+
+    Raises:
+        InvalidInputFileError: If the file is not legal.
+    """
+    _raise_if_invalid(
+        check_input_stream(stream, max_errors, chunk_size, sid_spill_threshold)
+    )
+
+
+def read_genotype_stream(
+    stream: typing.BinaryIO,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_errors: int | None = 1,
+) -> GenotypeMatrix:
+    """Check that an uploaded input file is legal, reading it as a stream of bytes, and return its genotypes.
+
+    See `read_genotypes` and `check_input_stream`.
+
+    Args:
+        stream (typing.BinaryIO): The binary file-like object to read.
+        chunk_size (int): The number of bytes to read at a time.
+        max_errors (int | None): The number of errors to collect before raising. By default, raises on the first error.
+
+    Returns:
+        GenotypeMatrix: The genotypes of every sample in the file.
+
+    Raises:
+        InvalidInputFileError: If the file is not legal.
+    """
+    return _read_genotypes(iter_lines(stream, chunk_size), max_errors)
+
+
+def _read_body(body: str, dtype: type | dict[int, type]) -> pd.DataFrame:
+    """Parse the data lines of an input file, which must all have the correct number of fields, into a DataFrame."""
+    return pd.read_csv(
+        io.StringIO(body),
+        sep="\t",
+        header=None,
+        names=range(MSATS + 1),
+        dtype=dtype,
+        na_filter=False,
+        quoting=csv.QUOTE_NONE,
+        lineterminator="\n",
+        skip_blank_lines=False,
+        low_memory=False,
+    )
+
+
+def _legal_msat_columns(body: str, frame: pd.DataFrame) -> npt.NDArray[np.bool_]:
+    """Build a boolean mask of the legal microsatellite values in a parsed body.
+
+    Columns that the CSV parser could read as integers are range-checked with array operations. Any other column holds at least one token that is not a plain integer, so its raw tokens are checked against `LEGAL_MSAT_TOKENS`, and any misses with `parse_msat_value`, to keep exactly the same notion of legality as `validate_input_file`."""
+    legal = np.empty((len(frame), MSATS), dtype=bool)
+    raw_frame = None
+    for index, column in enumerate(frame.columns[1:]):
+        values = frame[column]
+        if pd.api.types.is_signed_integer_dtype(values):
+            array = values.to_numpy()
+            legal[:, index] = ((array > 0) & (array <= MAX_MSAT_VALUE)) | (
+                array == MISSING_MSAT_VALUE
+            )
+        else:
+            if raw_frame is None:
+                raw_frame = _read_body(body, dtype=object)
+            tokens = raw_frame[column]
+            column_legal = tokens.isin(LEGAL_MSAT_TOKENS.keys()).to_numpy()
+            column_legal[~column_legal] = [
+                parse_msat_value(msat) is not None for msat in tokens[~column_legal]
+            ]
+            legal[:, index] = column_legal
+    return legal
+
+
+def _validate_vectorized(infile: io.StringIO, report: ValidationReport) -> None:
+    """Check that an input file is legal using array operations, recording the first error found."""
+    # check header legality:
+    validate_header(infile.readline(), report)
+
+    datalines = infile.read().split("\n")
+    if datalines[-1] == "":
+        datalines.pop()
+
+    if not datalines:
+        return
+
+    lines = [dataline.rstrip() for dataline in datalines]
+
+    # only the lines before the first one with the wrong number of msats can be
+    # parsed into the matrix, and any error in them is reported before it
+    tab_counts = np.fromiter(
+        (line.count("\t") for line in lines), dtype=np.int64, count=len(lines)
+    )
+    bad_counts = np.flatnonzero(tab_counts != MSATS)
+    num_parsable = int(bad_counts[0]) if bad_counts.size else len(lines)
+
+    body = "\n".join(lines[:num_parsable])
+    frame = _read_body(body, dtype={0: object})
+    bad_values = np.flatnonzero(~_legal_msat_columns(body, frame).all(axis=1))
+
+    # re-check the first offending line the slow way to get the exact error
+    if bad_values.size:
+        first_bad_line = int(bad_values[0])
+        validate_line(first_bad_line + 2, datalines[first_bad_line], report)
+    if bad_counts.size:
+        validate_line(num_parsable + 2, datalines[num_parsable], report)
+
+    # check that each SID present exactly twice, in order of first appearance
+    codes, sids = pd.factorize(frame[0])
+    counts = np.bincount(codes, minlength=len(sids))
+    bad_sids = np.flatnonzero(counts != 2)
+    if bad_sids.size:
+        first_bad_sid = bad_sids[0]
+        sid_linenos = np.flatnonzero(codes == first_bad_sid) + 2
+        validate_haplotype_counts({sids[first_bad_sid]: sid_linenos.tolist()}, report)
+
+
+def validate_input_file_vectorized(infile: io.StringIO) -> None:
+    """Check that the input file is legal, using NumPy/pandas array operations.
+
+    Performs the same checks as `validate_input_file` and raises the same errors with the same line numbers, but parses the whole body of the file into an integer matrix in one pass instead of checking each value in Python. The whole file is held in memory, so this trades memory for speed on large files.
+
+    Args:
+        infile (io.StringIO): The input file to check.
+
+    Raises:
+        InvalidInputFileError: If the file is not legal.
+    """
+    _raise_if_invalid(
+        _run_checks(
+            lambda report: _validate_vectorized(infile, report),
+            ValidationReport(max_errors=1),
+        )
+    )
@@ -0,0 +1,159 @@
+"""Contains a bounded cache of the validation results of input files, keyed by the SHA-256 of their contents.
+
+Users often resubmit the exact same file after a failed upload, and validating a large file again costs seconds. With this cache, a file that has been seen before is only hashed, which is much cheaper than parsing it.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from genetic_forensic_portal.app.utils.validate_input_file import (
+    PANEL_VERSION,
+    ErrorType,
+    ValidationReport,
+)
+
+# Number of validation results kept, in memory and on disk each
+DEFAULT_MAX_ENTRIES = 256
+
+logger = logging.getLogger(__name__)
+
+
+def _report_to_json(report: ValidationReport) -> str:
+    return json.dumps(
+        {
+            "max_errors": report.max_errors,
+            "truncated": report.truncated,
+            "errors": report.errors,
+        }
+    )
+
+
+def _report_from_json(text: str) -> ValidationReport:
+    fields = json.loads(text)
+    report = ValidationReport(fields["max_errors"])
+    report.truncated = fields["truncated"]
+    report.errors = [
+        (ErrorType(error_type), lineno, error)
+        for error_type, lineno, error in fields["errors"]
+    ]
+    return report
+
+
+class ValidationCache:
+    """A least-recently-used cache of validation reports, keyed by content hash and panel version.
+
+    Entries are kept in memory and, if a directory is given, written there as JSON so that they outlive the process. Both are bounded to `max_entries`. The cache is safe to share between threads.
+
+    Args:
+        max_entries (int): The number of reports to keep.
+        directory (Path | str | None): The directory to also keep reports in, or None to keep them in memory only.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        directory: Path | str | None = None,
+    ):
+        self.max_entries = max_entries
+        self.directory = None if directory is None else Path(directory)
+        self._entries: OrderedDict[tuple[str, str], ValidationReport] = OrderedDict()
+        self._lock = threading.Lock()
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def get(
+        self, content_hash: str, panel_version: str = PANEL_VERSION
+    ) -> ValidationReport | None:
+        """Return the report cached for a file, or None if there is none.
+
+        Args:
+            content_hash (str): The SHA-256 of the file, from `hashing.hash_stream`.
+            panel_version (str): The version of the panel the file was validated against.
+        """
+        key = (content_hash, panel_version)
+        with self._lock:
+            report = self._entries.get(key)
+            if report is not None:
+                self._entries.move_to_end(key)
+                return report
+
+        report = self._read(key)
+        if report is not None:
+            self._remember(key, report)
+        return report
+
+    def put(
+        self,
+        content_hash: str,
+        report: ValidationReport,
+        panel_version: str = PANEL_VERSION,
+    ) -> None:
+        """Cache the report for a file.
+
+        Args:
+            content_hash (str): The SHA-256 of the file, from `hashing.hash_stream`.
+            report (ValidationReport): The result of validating the file.
+            panel_version (str): The version of the panel the file was validated against.
+        """
+        key = (content_hash, panel_version)
+        self._remember(key, report)
+        self._write(key, report)
+
+    def clear(self) -> None:
+        """Remove every cached report, in memory and on disk."""
+        with self._lock:
+            self._entries.clear()
+        if self.directory is not None:
+            for path in self.directory.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remember(self, key: tuple[str, str], report: ValidationReport) -> None:
+        with self._lock:
+            self._entries[key] = report
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _path(self, key: tuple[str, str]) -> Path | None:
+        if self.directory is None:
+            return None
+        content_hash, panel_version = key
+        return self.directory / f"{panel_version}-{content_hash}.json"
+
+    def _read(self, key: tuple[str, str]) -> ValidationReport | None:
+        path = self._path(key)
+        if path is None:
+            return None
+        try:
+            report = _report_from_json(path.read_text(encoding="utf-8"))
+            # the file's modification time orders the on-disk entries by last use
+            path.touch()
+            return report
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring unreadable validation cache entry %s", path)
+            return None
+
+    def _write(self, key: tuple[str, str], report: ValidationReport) -> None:
+        path = self._path(key)
+        if path is None:
+            return
+        # write then rename, so that a concurrent reader never sees a partial entry
+        partial_path = path.with_suffix(f".{threading.get_ident()}.partial")
+        partial_path.write_text(_report_to_json(report), encoding="utf-8")
+        partial_path.replace(path)
+
+        entries = sorted(
+            path.parent.glob("*.json"), key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in entries[: -self.max_entries]:
+            entry.unlink(missing_ok=True)
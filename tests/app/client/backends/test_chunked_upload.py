@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import threading
+
+import pytest
+
+from genetic_forensic_portal.app.client.backends import CannedBackend, chunked_upload
+from genetic_forensic_portal.app.client.backends.http_backend import HttpBackend
+from genetic_forensic_portal.app.client.backends.stub_server import start_stub_server
+from genetic_forensic_portal.app.common.constants import NO_METADATA_UUID, SAMPLE_UUID
+
+PART_SIZE = 1024
+DATA = os.urandom(10 * PART_SIZE + 100)
+DATA_HASH = hashlib.sha256(DATA).hexdigest()
+
+
+class DroppingBackend(CannedBackend):
+    """Drops the connection while sending the given parts, the first time each is sent."""
+
+    def __init__(self, drop_parts):
+        super().__init__()
+        self.drop_parts = set(drop_parts)
+        self.sent_parts: list[int] = []
+        self.lock = threading.Lock()
+
+    def upload_part(self, upload_id, part_number, data, part_hash):
+        with self.lock:
+            self.sent_parts.append(part_number)
+            if part_number in self.drop_parts:
+                self.drop_parts.remove(part_number)
+                raise ConnectionError
+        super().upload_part(upload_id, part_number, data, part_hash)
+
+
+class RecordingSend:
+    def __init__(self):
+        self.data = None
+
+    def __call__(self, data, metadata, content_hash, content_encoding):  # noqa: ARG002
+        self.data = data.read()
+        return SAMPLE_UUID
+
+
+@pytest.fixture
+def stub_server():
+    server = start_stub_server()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def upload(backend, **kwargs):
+    upload_id = backend.start_upload("metadata", DATA_HASH, len(DATA), PART_SIZE)
+    chunked_upload.send_parts(
+        backend, upload_id, io.BytesIO(DATA), len(DATA), PART_SIZE, **kwargs
+    )
+    return backend.complete_upload(upload_id)
+
+
+@pytest.mark.parametrize(("size", "parts"), [(0, 1), (1, 1), (1024, 1), (1025, 2)])
+def test_part_count(size, parts):
+    assert chunked_upload.part_count(size, PART_SIZE) == parts
+
+
+def test_part_store_joins_parts_in_order(tmp_path):
+    store = chunked_upload.PartStore(tmp_path)
+    upload_id = store.start(None, DATA_HASH, len(DATA), PART_SIZE)
+    parts = [DATA[i : i + PART_SIZE] for i in range(0, len(DATA), PART_SIZE)]
+    for part in reversed(range(len(parts))):
+        store.put(upload_id, part, parts[part], chunked_upload.part_hash(parts[part]))
+    send = RecordingSend()
+
+    assert store.acknowledged(upload_id) == set(range(len(parts)))
+    assert store.complete(upload_id, send) == SAMPLE_UUID
+    assert send.data == DATA
+    assert list(tmp_path.iterdir()) == []
+    with pytest.raises(FileNotFoundError):
+        store.acknowledged(upload_id)
+
+
+def test_part_store_rejects_bad_parts(tmp_path):
+    store = chunked_upload.PartStore(tmp_path)
+    upload_id = store.start(None, DATA_HASH, len(DATA), PART_SIZE)
+    part = DATA[:PART_SIZE]
+
+    with pytest.raises(ValueError, match="does not match"):
+        store.put(upload_id, 0, part, chunked_upload.part_hash(b"other"))
+    with pytest.raises(ValueError, match="should be 1024 bytes"):
+        store.put(upload_id, 0, part[:10], chunked_upload.part_hash(part[:10]))
+    with pytest.raises(ValueError, match="not 11"):
+        store.put(upload_id, 11, part, chunked_upload.part_hash(part))
+    with pytest.raises(ValueError, match="missing parts"):
+        store.complete(upload_id, RecordingSend())
+    assert store.acknowledged(upload_id) == set()
+
+
+def test_part_store_removes_abandoned_uploads(tmp_path):
+    now = [1_000_000.0]
+    store = chunked_upload.PartStore(tmp_path, max_age=60, clock=lambda: now[0])
+    abandoned = store.start(None, DATA_HASH, len(DATA), PART_SIZE)
+    active = store.start(None, DATA_HASH, len(DATA), PART_SIZE)
+    now[0] += 50
+    part = DATA[:PART_SIZE]
+    store.put(active, 0, part, chunked_upload.part_hash(part))
+    now[0] += 20
+
+    store.start(None, DATA_HASH, len(DATA), PART_SIZE)
+
+    with pytest.raises(FileNotFoundError):
+        store.acknowledged(abandoned)
+    assert store.acknowledged(active) == {0}
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_part_store_removes_parts_left_by_other_stores(tmp_path):
+    now = 1_000_000.0
+    stale = tmp_path / f"{chunked_upload.UPLOAD_DIR_PREFIX}stale"
+    recent = tmp_path / f"{chunked_upload.UPLOAD_DIR_PREFIX}recent"
+    for directory, modified_at in [(stale, now - 120), (recent, now - 30)]:
+        directory.mkdir()
+        (directory / "0.part").write_bytes(b"part")
+        os.utime(directory, (modified_at, modified_at))
+
+    store = chunked_upload.PartStore(tmp_path, max_age=60, clock=lambda: now)
+    store.start(None, DATA_HASH, len(DATA), PART_SIZE)
+
+    assert not stale.exists()
+    assert recent.exists()
+
+
+def test_part_store_rejects_parts_not_matching_whole(tmp_path):
+    store = chunked_upload.PartStore(tmp_path)
+    upload_id = store.start(None, "not the hash", 10, PART_SIZE)
+    store.put(upload_id, 0, b"0123456789", chunked_upload.part_hash(b"0123456789"))
+
+    with pytest.raises(ValueError, match="do not match the SHA-256"):
+        store.complete(upload_id, RecordingSend())
+
+
+def test_send_parts_resumes_only_missing_parts():
+    backend = DroppingBackend(drop_parts=[3, 7])
+
+    assert upload(backend, max_workers=2) == SAMPLE_UUID
+    # every part once, plus the two that were dropped
+    assert sorted(backend.sent_parts) == sorted([*range(11), 3, 7])
+
+
+def test_send_parts_gives_up_after_max_resumes():
+    backend = DroppingBackend(drop_parts=[3])
+
+    with pytest.raises(ConnectionError):
+        upload(backend, max_resumes=0)
+
+
+def test_upload_in_parts_over_http(stub_server, tmp_path):
+    backend = HttpBackend(stub_server.url, artifact_dir=tmp_path)
+
+    assert upload(backend, max_workers=4) == SAMPLE_UUID
+
+    upload_id = backend.start_upload(None, DATA_HASH, len(DATA), PART_SIZE)
+    with pytest.raises(RuntimeError, match="400"):
+        backend.upload_part(upload_id, 0, DATA[:PART_SIZE], "not the hash")
+    backend.close()
+
+
+def test_resume_over_http_sends_missing_parts(stub_server, tmp_path):
+    backend = HttpBackend(stub_server.url, artifact_dir=tmp_path)
+    upload_id = backend.start_upload(None, DATA_HASH, len(DATA), PART_SIZE)
+    for part in (0, 2):
+        chunk = DATA[part * PART_SIZE : (part + 1) * PART_SIZE]
+        backend.upload_part(upload_id, part, chunk, chunked_upload.part_hash(chunk))
+
+    assert backend.uploaded_parts(upload_id) == {0, 2}
+
+    chunked_upload.send_parts(
+        backend, upload_id, io.BytesIO(DATA), len(DATA), PART_SIZE
+    )
+    assert backend.complete_upload(upload_id) == NO_METADATA_UUID
+    with pytest.raises(FileNotFoundError):
+        backend.uploaded_parts(upload_id)
+    backend.close()
@@ -0,0 +1,439 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+import pytest
+import requests
+
+import genetic_forensic_portal.app.client.gf_api_client as client
+from genetic_forensic_portal.app.client import backends
+from genetic_forensic_portal.app.client.backends import Artifact
+from genetic_forensic_portal.app.client.backends.base import ARTIFACT_CHUNK_SIZE
+from genetic_forensic_portal.app.client.backends.canned_backend import (
+    ARTIFACTS,
+    CannedBackend,
+)
+from genetic_forensic_portal.app.client.backends.http_backend import (
+    CONTENT_ENCODING_HEADER,
+    CONTENT_TYPE_HEADER,
+    IF_MODIFIED_SINCE_HEADER,
+    IF_NONE_MATCH_HEADER,
+    LAST_MODIFIED_HEADER,
+    RANGE_HEADER,
+    HttpBackend,
+    encoding_headers,
+)
+from genetic_forensic_portal.app.client.backends.stub_server import start_stub_server
+from genetic_forensic_portal.app.client.models.analysis_filter import AnalysisFilter
+from genetic_forensic_portal.app.client.models.analysis_status import AnalysisStatus
+from genetic_forensic_portal.app.common.constants import (
+    IN_PROGRESS_UUID,
+    NO_METADATA_UUID,
+    NOT_FOUND_UUID,
+    ROLES,
+    SAMPLE_UUID,
+    TOKEN,
+    USERNAME,
+)
+
+SAMPLE_DATA = b"MatchID\tFH67\n"
+
+# Access tokens the stub server accepts, and the username and roles of the user each was issued to
+LIST_ALL_TOKEN = "cefs-token"
+VIEWER_TOKEN = "test1-token"
+NO_ACCESS_TOKEN = "noaccess-token"
+TOKEN_USERS = {
+    LIST_ALL_TOKEN: ("cefs-user", ["cefs"]),
+    VIEWER_TOKEN: ("test1", ["admin", "other"]),
+    NO_ACCESS_TOKEN: ("noaccess", ["other"]),
+}
+
+
+def _get_token_user(access_token):
+    if access_token not in TOKEN_USERS:
+        raise PermissionError(access_token)
+    return TOKEN_USERS[access_token]
+
+
+@pytest.fixture(scope="module")
+def stub_server():
+    server = start_stub_server(get_token_user=_get_token_user)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def http_backend(stub_server, tmp_path):
+    backend = HttpBackend(stub_server.url, artifact_dir=tmp_path)
+    yield backend
+    backend.close()
+
+
+@pytest.mark.parametrize("artifact", list(Artifact))
+def test_get_artifact_downloads_canned_file(http_backend, artifact):
+    path = http_backend.get_artifact(SAMPLE_UUID, artifact)
+
+    assert Path(path).suffix == artifact.suffix
+    assert (
+        Path(path).read_bytes() == Path(ARTIFACTS[SAMPLE_UUID][artifact]).read_bytes()
+    )
+
+
+def test_get_unchanged_artifact_is_not_transferred_again(http_backend):
+    first = Path(http_backend.get_artifact(SAMPLE_UUID, Artifact.SCAT_IMAGE)).stat()
+
+    with mock.patch.object(
+        http_backend.session, "request", wraps=http_backend.session.request
+    ) as request:
+        path = http_backend.get_artifact(SAMPLE_UUID, Artifact.SCAT_IMAGE)
+
+    assert IF_NONE_MATCH_HEADER in request.call_args.kwargs["headers"]
+    second = Path(path).stat()
+    assert (second.st_ino, second.st_mtime_ns) == (first.st_ino, first.st_mtime_ns)
+
+
+def test_get_changed_artifact_downloads_it_again(http_backend, tmp_path):
+    familial = tmp_path / "changing.tsv"
+    familial.write_bytes(b"first version")
+
+    with mock.patch.dict(ARTIFACTS[SAMPLE_UUID], {Artifact.FAMILIAL: str(familial)}):
+        path = Path(http_backend.get_artifact(SAMPLE_UUID, Artifact.FAMILIAL))
+        assert path.read_bytes() == b"first version"
+
+        familial.write_bytes(b"the second version")
+        assert path == Path(http_backend.get_artifact(SAMPLE_UUID, Artifact.FAMILIAL))
+        assert path.read_bytes() == b"the second version"
+
+
+def test_get_artifact_without_local_copy_downloads_it_again(http_backend):
+    path = Path(http_backend.get_artifact(SAMPLE_UUID, Artifact.SCAT_IMAGE))
+    path.unlink()
+
+    http_backend.get_artifact(SAMPLE_UUID, Artifact.SCAT_IMAGE)
+
+    assert (
+        path.read_bytes()
+        == Path(ARTIFACTS[SAMPLE_UUID][Artifact.SCAT_IMAGE]).read_bytes()
+    )
+
+
+def test_stub_honours_if_modified_since(stub_server):
+    url = f"{stub_server.url}analyses/{SAMPLE_UUID}/artifacts/{Artifact.SCAT_IMAGE}"
+    response = requests.get(url, timeout=5)
+
+    unchanged = requests.get(
+        url,
+        headers={IF_MODIFIED_SINCE_HEADER: response.headers[LAST_MODIFIED_HEADER]},
+        timeout=5,
+    )
+    changed = requests.get(
+        url,
+        headers={IF_MODIFIED_SINCE_HEADER: "Thu, 01 Jan 1970 00:00:00 GMT"},
+        timeout=5,
+    )
+
+    assert unchanged.status_code == requests.codes.not_modified
+    assert unchanged.content == b""
+    assert changed.status_code == requests.codes.ok
+
+
+def test_get_missing_artifact_raises_not_found(http_backend):
+    with pytest.raises(FileNotFoundError, match=backends.ANALYSIS_NOT_FOUND_ERROR):
+        http_backend.get_artifact(IN_PROGRESS_UUID, Artifact.VORONOI_IMAGE)
+
+
+def test_iter_artifact_streams_file_from_offset(http_backend):
+    expected = Path(ARTIFACTS[SAMPLE_UUID][Artifact.SCAT_DATA]).read_bytes()
+
+    assert (
+        b"".join(http_backend.iter_artifact(SAMPLE_UUID, Artifact.SCAT_DATA))
+        == expected
+    )
+    assert (
+        b"".join(http_backend.iter_artifact(SAMPLE_UUID, Artifact.SCAT_DATA, 1000))
+        == expected[1000:]
+    )
+
+
+def test_stub_serves_byte_ranges(stub_server):
+    url = f"{stub_server.url}analyses/{SAMPLE_UUID}/artifacts/{Artifact.FAMILIAL}"
+    expected = Path(ARTIFACTS[SAMPLE_UUID][Artifact.FAMILIAL]).read_bytes()
+
+    partial = requests.get(url, headers={RANGE_HEADER: "bytes=10-19"}, timeout=5)
+    assert partial.status_code == requests.codes.partial_content
+    assert partial.content == expected[10:20]
+    assert partial.headers["Content-Range"] == f"bytes 10-19/{len(expected)}"
+
+    past_end = requests.get(
+        url, headers={RANGE_HEADER: f"bytes={len(expected)}-"}, timeout=5
+    )
+    assert past_end.status_code == requests.codes.requested_range_not_satisfiable
+
+
+def test_iter_artifact_resumes_cut_off_stream_with_range(http_backend):
+    expected = Path(ARTIFACTS[SAMPLE_UUID][Artifact.SCAT_DATA]).read_bytes()
+    iter_content = requests.Response.iter_content
+    ranges = []
+
+    def cut_off_once(response, chunk_size):
+        ranges.append(response.request.headers.get(RANGE_HEADER))
+        chunks = iter_content(response, chunk_size)
+        yield next(chunks)
+        if len(ranges) == 1:
+            raise requests.exceptions.ChunkedEncodingError
+        yield from chunks
+
+    with mock.patch.object(requests.Response, "iter_content", cut_off_once):
+        streamed = b"".join(http_backend.iter_artifact(SAMPLE_UUID, Artifact.SCAT_DATA))
+
+    assert streamed == expected
+    assert ranges == [None, f"bytes={ARTIFACT_CHUNK_SIZE}-"]
+
+
+def test_iter_artifact_gives_up_after_stream_resumes(stub_server, tmp_path):
+    backend = HttpBackend(stub_server.url, artifact_dir=tmp_path, stream_resumes=1)
+
+    def always_cut_off(_response, _chunk_size):
+        raise requests.exceptions.ChunkedEncodingError
+        yield
+
+    with (
+        mock.patch.object(requests.Response, "iter_content", always_cut_off),
+        pytest.raises(ConnectionError),
+    ):
+        b"".join(backend.iter_artifact(SAMPLE_UUID, Artifact.SCAT_DATA))
+    backend.close()
+
+
+def test_list_analyses_returns_canned_pages(http_backend):
+    for next_token in [0, 3, 6, 100]:
+        page = http_backend.list_analyses(
+            next_token, 3, AnalysisFilter(viewer_token=LIST_ALL_TOKEN)
+        )
+        expected = CannedBackend().list_analyses(next_token, 3)
+
+        assert page.analyses == expected.analyses
+        assert page.start_token == expected.start_token
+        assert page.next_token == expected.next_token
+
+
+@pytest.mark.parametrize(
+    "analysis_filter",
+    [
+        AnalysisFilter(status=AnalysisStatus.ANALYSIS_SUCCEEDED),
+        AnalysisFilter(owner="test1"),
+        AnalysisFilter(submitted_after=datetime(2024, 7, 17, tzinfo=UTC)),
+    ],
+)
+def test_list_analyses_applies_filter(http_backend, analysis_filter):
+    analysis_filter.viewer_token = LIST_ALL_TOKEN
+    for next_token in [0, 2, 5]:
+        page = http_backend.list_analyses(next_token, 2, analysis_filter)
+        expected = CannedBackend().list_analyses(next_token, 2, analysis_filter)
+
+        assert page.analyses == expected.analyses
+        assert page.next_token == expected.next_token
+
+
+def test_list_analyses_derives_viewer_from_token(http_backend):
+    viewer_filter = AnalysisFilter(viewer_token=VIEWER_TOKEN)
+    expected_filter = AnalysisFilter(viewer="test1", viewer_roles=["admin", "other"])
+
+    for next_token in [0, 2, 5]:
+        page = http_backend.list_analyses(next_token, 2, viewer_filter)
+        expected = CannedBackend().list_analyses(next_token, 2, expected_filter)
+
+        assert page.analyses == expected.analyses
+        assert page.next_token == expected.next_token
+
+
+def test_list_analyses_ignores_viewer_claimed_by_client(http_backend):
+    claimed = AnalysisFilter(
+        viewer="cefs-user", viewer_roles=["cefs"], viewer_token=NO_ACCESS_TOKEN
+    )
+
+    assert http_backend.list_analyses(0, 2, claimed).analyses == []
+
+
+@pytest.mark.parametrize(
+    "analysis_filter", [None, AnalysisFilter(viewer_token="not-a-token")]
+)
+def test_list_analyses_without_accepted_token_is_unauthorized(
+    http_backend, analysis_filter
+):
+    with pytest.raises(PermissionError):
+        http_backend.list_analyses(0, 2, analysis_filter)
+
+
+def test_get_analysis_status_returns_status(http_backend):
+    assert (
+        http_backend.get_analysis_status(IN_PROGRESS_UUID)
+        == AnalysisStatus.ANALYSIS_IN_PROGRESS
+    )
+
+    with pytest.raises(FileNotFoundError):
+        http_backend.get_analysis_status(NOT_FOUND_UUID)
+
+
+def test_get_analysis_statuses_returns_found_statuses(http_backend):
+    assert http_backend.get_analysis_statuses(
+        [SAMPLE_UUID, IN_PROGRESS_UUID, NOT_FOUND_UUID]
+    ) == {
+        SAMPLE_UUID: AnalysisStatus.ANALYSIS_SUCCEEDED,
+        IN_PROGRESS_UUID: AnalysisStatus.ANALYSIS_IN_PROGRESS,
+    }
+
+
+def test_upload_sample_returns_uuid(http_backend):
+    content_hash = hashlib.sha256(SAMPLE_DATA).hexdigest()
+
+    assert (
+        http_backend.upload_sample(io.BytesIO(SAMPLE_DATA), "metadata", content_hash)
+        == SAMPLE_UUID
+    )
+    assert (
+        http_backend.upload_sample(io.BytesIO(SAMPLE_DATA), None, content_hash, "gzip")
+        == NO_METADATA_UUID
+    )
+
+
+@pytest.mark.parametrize(
+    ("content_encoding", "headers"),
+    [
+        (None, {}),
+        ("gzip", {CONTENT_ENCODING_HEADER: "gzip"}),
+        ("zstd", {CONTENT_ENCODING_HEADER: "zstd"}),
+        ("zip", {CONTENT_TYPE_HEADER: "application/zip"}),
+    ],
+)
+def test_upload_sample_sends_compression_as_registered_headers(
+    http_backend, stub_server, content_encoding, headers
+):
+    content_hash = hashlib.sha256(SAMPLE_DATA).hexdigest()
+    assert encoding_headers(content_encoding) == headers
+
+    with mock.patch.object(
+        stub_server.backend, "upload_sample", return_value=SAMPLE_UUID
+    ) as upload_sample:
+        http_backend.upload_sample(
+            io.BytesIO(SAMPLE_DATA), None, content_hash, content_encoding
+        )
+
+    assert upload_sample.call_args.args[3] == content_encoding
+
+
+def test_upload_sample_with_wrong_hash_is_rejected(http_backend):
+    with pytest.raises(RuntimeError, match="400"):
+        http_backend.upload_sample(io.BytesIO(SAMPLE_DATA), None, "not the hash")
+
+
+def test_requests_reuse_one_pooled_connection(http_backend, stub_server):
+    for _ in range(5):
+        http_backend.get_analysis_status(SAMPLE_UUID)
+
+    pools = http_backend.session.get_adapter(stub_server.url).poolmanager.pools
+    assert [pools[key].num_connections for key in pools.keys()] == [1]  # noqa: SIM118
+
+
+def test_unreachable_api_raises_connection_error(tmp_path):
+    server = start_stub_server()
+    url = server.url
+    server.shutdown()
+    server.server_close()
+
+    backend = HttpBackend(url, artifact_dir=tmp_path)
+    with pytest.raises(ConnectionError):
+        backend.get_analysis_status(SAMPLE_UUID)
+
+
+class _SlowBackend(CannedBackend):
+    def get_analysis_status(self, sample_id):
+        time.sleep(0.5)
+        return super().get_analysis_status(sample_id)
+
+
+class _FailingBackend(CannedBackend):
+    def get_analysis_status(self, sample_id):  # noqa: ARG002
+        raise RuntimeError
+
+
+@pytest.mark.parametrize(
+    ("backend", "error"),
+    [(_SlowBackend(), TimeoutError), (_FailingBackend(), ConnectionError)],
+)
+def test_failing_api_raises_builtin_error(tmp_path, backend, error):
+    server = start_stub_server(backend=backend)
+    http_backend = HttpBackend(server.url, read_timeout=0.1, artifact_dir=tmp_path)
+    try:
+        with pytest.raises(error):
+            http_backend.get_analysis_status(SAMPLE_UUID)
+    finally:
+        http_backend.close()
+        server.shutdown()
+        server.server_close()
+
+
+def test_stub_server_logs_client_disconnects_quietly(capsys, caplog):
+    server = start_stub_server()
+    try:
+        try:
+            raise BrokenPipeError
+        except BrokenPipeError:
+            server.handle_error(None, ("127.0.0.1", 0))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert capsys.readouterr().err == ""
+    assert all(record.levelname == "DEBUG" for record in caplog.records)
+
+
+def test_create_backend_reads_environment(monkeypatch):
+    monkeypatch.setenv(backends.BACKEND_ENV_VAR, backends.HTTP_BACKEND)
+    monkeypatch.setenv(backends.API_URL_ENV_VAR, "http://api.example.org/v1")
+
+    backend = backends.create_backend()
+
+    assert isinstance(backend, HttpBackend)
+    assert backend.api_url == "http://api.example.org/v1/"
+    backend.close()
+
+
+def test_create_backend_defaults_to_canned(monkeypatch):
+    monkeypatch.delenv(backends.BACKEND_ENV_VAR, raising=False)
+
+    assert isinstance(backends.create_backend(), CannedBackend)
+
+
+def test_create_unknown_backend_raises_error():
+    with pytest.raises(ValueError, match="Unknown GF_API_BACKEND"):
+        backends.create_backend("carrier-pigeon")
+
+
+def test_client_over_http_matches_canned_client(http_backend, monkeypatch):
+    monkeypatch.setattr(
+        client.st,
+        "session_state",
+        {
+            USERNAME: "test1",
+            ROLES: ["admin", "other"],
+            TOKEN: {"access_token": VIEWER_TOKEN},
+        },
+    )
+    expected_analyses = client.list_all_analyses()
+    expected_familial = client.get_familial_analysis(SAMPLE_UUID)
+
+    monkeypatch.setattr(client, "_backend", http_backend)
+    client._analysis_list_cache.clear()
+
+    assert client.list_all_analyses() == expected_analyses
+    pd.testing.assert_frame_equal(
+        client.get_familial_analysis(SAMPLE_UUID), expected_familial
+    )
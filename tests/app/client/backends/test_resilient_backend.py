@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from genetic_forensic_portal.app.client import backends
+from genetic_forensic_portal.app.client.backends import (
+    Artifact,
+    CannedBackend,
+    ResilienceCounter,
+    ResilientBackend,
+)
+from genetic_forensic_portal.app.client.backends.resilient_backend import (
+    MIN_LATENCY_SAMPLES,
+    CircuitBreaker,
+)
+from genetic_forensic_portal.app.client.models.analysis_status import AnalysisStatus
+from genetic_forensic_portal.app.common.constants import NOT_FOUND_UUID, SAMPLE_UUID
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FlakyBackend(CannedBackend):
+    """Fails with a transient error the first `failures` times a status is read."""
+
+    def __init__(self, failures, error=ConnectionError):
+        super().__init__()
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    def get_analysis_status(self, sample_id):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return super().get_analysis_status(sample_id)
+
+
+class OneSlowCallBackend(CannedBackend):
+    """Answers quickly, except for the call numbered `slow_call` made on the thread that created it, which hangs until a call on another thread has answered and then raises `error`, if any."""
+
+    def __init__(self, slow_call, error=None):
+        super().__init__()
+        self.slow_call = slow_call
+        self.error = error
+        self.caller = threading.current_thread()
+        self.caller_calls = 0
+        self.other_calls = 0
+        self.release = threading.Event()
+
+    def get_analysis_status(self, sample_id):
+        if threading.current_thread() is not self.caller:
+            self.other_calls += 1
+            status = super().get_analysis_status(sample_id)
+            self.release.set()
+            return status
+
+        self.caller_calls += 1
+        if self.caller_calls == self.slow_call:
+            self.release.wait(timeout=5)
+            if self.error is not None:
+                raise self.error
+        return super().get_analysis_status(sample_id)
+
+
+class SlowArtifactBackend(CannedBackend):
+    """Fetches artifacts quickly, except for the call numbered `slow_call`, which takes a moment."""
+
+    def __init__(self, slow_call):
+        super().__init__()
+        self.slow_call = slow_call
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def get_artifact(self, sample_id, artifact):
+        with self.lock:
+            self.calls += 1
+            call = self.calls
+        if call == self.slow_call:
+            time.sleep(0.2)
+        return super().get_artifact(sample_id, artifact)
+
+
+def resilient(backend, **kwargs):
+    return ResilientBackend(backend, base_backoff=0.0, **kwargs)
+
+
+def test_transient_errors_are_retried():
+    backend = resilient(FlakyBackend(failures=2))
+
+    assert backend.get_analysis_status(SAMPLE_UUID) == AnalysisStatus.ANALYSIS_SUCCEEDED
+    assert backend.counters()[ResilienceCounter.RETRIES] == 2
+
+
+def test_error_is_raised_after_last_attempt():
+    flaky = FlakyBackend(failures=5, error=TimeoutError)
+    backend = resilient(flaky, max_attempts=3)
+
+    with pytest.raises(TimeoutError):
+        backend.get_analysis_status(SAMPLE_UUID)
+    assert flaky.calls == 3
+
+
+def test_not_found_is_not_retried():
+    backend = resilient(CannedBackend())
+
+    with pytest.raises(FileNotFoundError):
+        backend.get_analysis_status(NOT_FOUND_UUID)
+    assert backend.counters()[ResilienceCounter.RETRIES] == 0
+
+
+def test_backoff_is_jittered_below_bound():
+    backend = ResilientBackend(CannedBackend(), base_backoff=0.1, max_backoff=0.3)
+
+    backoffs = [backend._backoff(retry) for retry in range(5) for _ in range(20)]
+
+    assert all(0 <= backoff <= 0.3 for backoff in backoffs)
+    assert len(set(backoffs)) > 1
+
+
+@pytest.mark.parametrize("error", [None, TimeoutError])
+def test_slow_read_is_hedged_and_hedge_wins_if_read_fails(error):
+    slow = OneSlowCallBackend(slow_call=MIN_LATENCY_SAMPLES + 1, error=error)
+    backend = resilient(slow)
+    for _ in range(MIN_LATENCY_SAMPLES):
+        backend.get_analysis_status(SAMPLE_UUID)
+
+    start = time.perf_counter()
+    status = backend.get_analysis_status(SAMPLE_UUID)
+    elapsed = time.perf_counter() - start
+
+    assert status == AnalysisStatus.ANALYSIS_SUCCEEDED
+    assert elapsed < 1
+    # reads run on the calling thread, and only their duplicates on the pool
+    assert slow.caller_calls == MIN_LATENCY_SAMPLES + 1
+    assert slow.other_calls == 1
+    assert backend.counters()[ResilienceCounter.HEDGES_SENT] == 1
+    assert backend.counters()[ResilienceCounter.HEDGES_WON] == int(error is not None)
+    assert backend.counters()[ResilienceCounter.RETRIES] == 0
+    backend.close()
+
+
+@pytest.mark.parametrize(
+    ("warmed", "read", "hedged"),
+    [
+        (Artifact.SCAT_IMAGE, Artifact.SCAT_IMAGE, True),
+        # each artifact has its own latencies
+        (Artifact.SCAT_IMAGE, Artifact.VORONOI_IMAGE, False),
+        # large data artifacts are never downloaded twice
+        (Artifact.FAMILIAL, Artifact.FAMILIAL, False),
+    ],
+)
+def test_artifact_reads_are_hedged_by_their_own_latencies(warmed, read, hedged):
+    backend = resilient(SlowArtifactBackend(slow_call=MIN_LATENCY_SAMPLES + 1))
+    for _ in range(MIN_LATENCY_SAMPLES):
+        backend.get_artifact(SAMPLE_UUID, warmed)
+
+    backend.get_artifact(SAMPLE_UUID, read)
+
+    assert backend.counters()[ResilienceCounter.HEDGES_SENT] == int(hedged)
+    backend.close()
+
+
+def test_breaker_trips_and_fails_fast():
+    flaky = FlakyBackend(failures=100)
+    backend = resilient(flaky, max_attempts=1, failure_threshold=3)
+
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            backend.get_analysis_status(SAMPLE_UUID)
+    with pytest.raises(ConnectionError, match="not calling get_analysis_status"):
+        backend.get_analysis_status(SAMPLE_UUID)
+
+    assert flaky.calls == 3
+    assert backend.counters()[ResilienceCounter.BREAKER_TRIPS] == 1
+    assert backend.counters()[ResilienceCounter.BREAKER_REJECTIONS] == 1
+    # other endpoints have their own breakers
+    assert backend.list_analyses(0, 3).analyses
+
+
+def test_breaker_closes_after_successful_trial():
+    clock = FakeClock()
+    flaky = FlakyBackend(failures=2)
+    backend = resilient(
+        flaky, max_attempts=1, failure_threshold=2, reset_timeout=10, clock=clock
+    )
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            backend.get_analysis_status(SAMPLE_UUID)
+
+    clock.now = 10
+
+    assert backend.get_analysis_status(SAMPLE_UUID) == AnalysisStatus.ANALYSIS_SUCCEEDED
+    assert not backend.breaker("get_analysis_status").is_open
+
+
+def test_breaker_reopens_after_failed_trial():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    assert breaker.record_failure()
+
+    clock.now = 10
+    assert breaker.allow()
+    assert not breaker.allow()  # only one trial at a time
+    assert breaker.record_failure()
+
+    assert not breaker.allow()
+    assert breaker.retry_in() == 10
+
+
+def test_create_backend_wraps_when_resilient(monkeypatch):
+    monkeypatch.setenv(backends.RESILIENT_ENV_VAR, "true")
+
+    backend = backends.create_backend("canned")
+
+    assert isinstance(backend, ResilientBackend)
+    assert isinstance(backend.backend, CannedBackend)
+    assert isinstance(backends.create_backend("canned", resilient=False), CannedBackend)
@@ -217,3 +217,17 @@ def test_role_allow_user_none_resource_role_deny_access_deny():
 def test_user_none_access_deny():
     assert not keycloak_client.check_create_access(TEST_USER, [])
     assert not keycloak_client.check_list_all_access(TEST_USER, [])
+
+
+def test_bulk_view_access_matches_single_checks():
+    analysis_ids = [*keycloak_client.MOCK_RESOURCE_ACCESS_CONTROL, "unknown"]
+
+    for user, roles in [
+        (keycloak_client.TEST_USER_1, []),
+        ("someone", [keycloak_client.CEFS]),
+        (keycloak_client.NO_ACCESS_USER, [keycloak_client.ADMIN]),
+    ]:
+        assert keycloak_client.check_bulk_view_access(user, roles, analysis_ids) == {
+            analysis_id: keycloak_client.check_view_access(user, roles, analysis_id)
+            for analysis_id in analysis_ids
+        }
@@ -1,13 +1,25 @@
 from __future__ import annotations
 
+import gzip
+import hashlib
 import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from pathlib import Path
 from unittest import mock
 
 import pandas as pd
 import pytest
+import requests
 import streamlit
+from streamlit.runtime.scriptrunner_utils.script_run_context import (
+    SCRIPT_RUN_CONTEXT_ATTR_NAME,
+)
 
 import genetic_forensic_portal.app.client.gf_api_client as client
+import genetic_forensic_portal.app.utils.familial_analysis_utils as fam_utils
 from genetic_forensic_portal.app.client.models.analysis_status import AnalysisStatus
 from genetic_forensic_portal.app.client.models.get_analyses_response import (
     GetAnalysesResponse,
@@ -18,15 +30,24 @@ from genetic_forensic_portal.app.common.constants import (
     FAMILIAL_FILE_PARSE_ERROR_UUID,
     IN_PROGRESS_UUID,
     NO_METADATA_UUID,
+    PREFETCH_SCHEDULER,
     ROLES,
     SAMPLE_UUID,
     USERNAME,
 )
+from genetic_forensic_portal.app.utils.compression import ContentEncoding
+from genetic_forensic_portal.app.utils.image_pyramid import ImagePyramid, ImageSize
 from genetic_forensic_portal.app.utils.validate_input_file import (
     HEADER_MUST_START_WITH_MATCHID,
+    MSAT_NAMES,
+    InvalidInputFileError,
 )
 
 TEST_FILE_DATA = io.BytesIO(b"this is a file")
+LEGAL_LINE = "sample1\t" + "\t".join(["1"] * len(MSAT_NAMES))
+LEGAL_FILE_DATA = "\n".join(
+    ["MatchID\t" + "\t".join(MSAT_NAMES), LEGAL_LINE, LEGAL_LINE]
+).encode("utf-8")
 TEST_METADATA = "this is metadata"
 
 MOCK_STREAMLIT = streamlit
@@ -45,9 +66,29 @@ UUIDS_WITH_ACCESS = [
 ]
 
 
+@pytest.fixture(autouse=True)
+def empty_validation_cache():
+    client._validation_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def empty_analysis_list_cache():
+    client._analysis_list_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def empty_familial_cache():
+    client._familial_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def no_prefetch_scheduler():
+    MOCK_STREAMLIT.session_state.pop(PREFETCH_SCHEDULER, None)
+
+
 def test_upload_file_returns_uuid():
     with mock.patch(
-        "genetic_forensic_portal.app.utils.validate_input_file.validate_input_file"
+        "genetic_forensic_portal.app.utils.validate_input_file.check_input_stream"
     ):
         response = client.upload_sample_analysis(TEST_FILE_DATA, TEST_METADATA)
 
@@ -57,7 +98,7 @@ def test_upload_file_returns_uuid():
 def test_upload_nothing_returns_error():
     with (
         mock.patch(
-            "genetic_forensic_portal.app.utils.validate_input_file.validate_input_file"
+            "genetic_forensic_portal.app.utils.validate_input_file.check_input_stream"
         ),
         pytest.raises(ValueError, match=client.MISSING_DATA_ERROR),
     ):
@@ -66,7 +107,7 @@ def test_upload_nothing_returns_error():
 
 def test_upload_no_metadata_returns_different_uuid():
     with mock.patch(
-        "genetic_forensic_portal.app.utils.validate_input_file.validate_input_file"
+        "genetic_forensic_portal.app.utils.validate_input_file.check_input_stream"
     ):
         response = client.upload_sample_analysis(TEST_FILE_DATA)
 
@@ -76,7 +117,7 @@ def test_upload_no_metadata_returns_different_uuid():
 def test_upload_file_raises_error():
     with (
         mock.patch(
-            "genetic_forensic_portal.app.utils.validate_input_file.validate_input_file"
+            "genetic_forensic_portal.app.utils.validate_input_file.check_input_stream"
         ) as mock_validate_input_file,
     ):
         mock_validate_input_file.side_effect = ValueError(
@@ -86,6 +127,24 @@ def test_upload_file_raises_error():
             client.upload_sample_analysis(TEST_FILE_DATA, TEST_METADATA)
 
 
+def test_upload_validates_and_sends_whole_stream():
+    data = io.BytesIO(LEGAL_FILE_DATA)
+    data.seek(5)
+
+    with mock.patch(
+        "genetic_forensic_portal.app.client.gf_api_client._send_sample",
+        side_effect=lambda stream, *_: stream.read(),
+    ):
+        response = client.upload_sample_analysis(data, TEST_METADATA)
+
+    assert response == LEGAL_FILE_DATA
+
+
+def test_upload_invalid_file_raises_error():
+    with pytest.raises(ValueError, match=HEADER_MUST_START_WITH_MATCHID):
+        client.upload_sample_analysis(io.BytesIO(b"this is a file"), TEST_METADATA)
+
+
 def test_upload_no_access_returns_error():
     with (
         pytest.raises(PermissionError, match=client.UPLOAD_DENIED_ERROR),
@@ -97,6 +156,70 @@ def test_upload_no_access_returns_error():
         client.upload_sample_analysis(TEST_FILE_DATA, TEST_METADATA)
 
 
+def test_upload_same_file_again_skips_validation():
+    client.upload_sample_analysis(io.BytesIO(LEGAL_FILE_DATA), TEST_METADATA)
+
+    with mock.patch(
+        "genetic_forensic_portal.app.utils.validate_input_file.check_input_stream"
+    ) as mock_check_input_stream:
+        response = client.upload_sample_analysis(
+            io.BytesIO(LEGAL_FILE_DATA), TEST_METADATA
+        )
+
+    mock_check_input_stream.assert_not_called()
+    assert response == client.SAMPLE_UUID
+
+
+def test_upload_same_invalid_file_again_raises_cached_report():
+    with pytest.raises(InvalidInputFileError) as first_error:
+        client.upload_sample_analysis(io.BytesIO(b"this is a file"), TEST_METADATA)
+
+    with (
+        mock.patch(
+            "genetic_forensic_portal.app.utils.validate_input_file.check_input_stream"
+        ) as mock_check_input_stream,
+        pytest.raises(InvalidInputFileError) as second_error,
+    ):
+        client.upload_sample_analysis(io.BytesIO(b"this is a file"), TEST_METADATA)
+
+    mock_check_input_stream.assert_not_called()
+    assert second_error.value.report.errors == first_error.value.report.errors
+
+
+def test_upload_sends_content_hash():
+    with mock.patch(
+        "genetic_forensic_portal.app.client.gf_api_client._send_sample",
+        side_effect=lambda _stream, _metadata, content_hash, _encoding: content_hash,
+    ):
+        response = client.upload_sample_analysis(
+            io.BytesIO(LEGAL_FILE_DATA), TEST_METADATA
+        )
+
+    assert response == hashlib.sha256(LEGAL_FILE_DATA).hexdigest()
+
+
+def test_upload_gzip_file_validates_and_sends_compressed_stream():
+    compressed = gzip.compress(LEGAL_FILE_DATA)
+
+    with mock.patch(
+        "genetic_forensic_portal.app.client.gf_api_client._send_sample",
+        side_effect=lambda stream, _metadata, _hash, encoding: (
+            stream.read(),
+            encoding,
+        ),
+    ):
+        response = client.upload_sample_analysis(io.BytesIO(compressed), TEST_METADATA)
+
+    assert response == (compressed, ContentEncoding.GZIP)
+
+
+def test_upload_invalid_gzip_file_raises_error():
+    with pytest.raises(ValueError, match=HEADER_MUST_START_WITH_MATCHID):
+        client.upload_sample_analysis(
+            io.BytesIO(gzip.compress(b"this is a file")), TEST_METADATA
+        )
+
+
 # SCAT Analysis
 
 
@@ -148,6 +271,39 @@ def test_get_scat_analysis_raises_error_for_none():
 # SCAT Data Retrieval Analysis
 
 
+def test_get_scat_analysis_thumbnail_is_downscaled(tmp_path):
+    with mock.patch.object(client, "_image_pyramid", ImagePyramid(tmp_path)):
+        thumbnail = client.get_scat_analysis(client.SAMPLE_UUID, ImageSize.THUMBNAIL)
+
+    assert Path(thumbnail).parent == tmp_path
+    assert client.get_scat_analysis(client.SAMPLE_UUID) == client.SCAT_SAMPLE_IMAGE
+
+
+def test_get_scat_thumbnails_leaves_out_missing_and_hidden_analyses(tmp_path):
+    with mock.patch.object(client, "_image_pyramid", ImagePyramid(tmp_path)):
+        thumbnails = client.get_scat_thumbnails(
+            [client.SAMPLE_UUID, client.NO_METADATA_UUID, client.NOT_FOUND_UUID]
+        )
+
+    assert set(thumbnails) == {client.SAMPLE_UUID, client.NO_METADATA_UUID}
+    assert all(Path(path).parent == tmp_path for path in thumbnails.values())
+
+
+def test_prefetch_analyses_warms_caches(tmp_path):
+    with (
+        mock.patch.object(client, "_image_pyramid", ImagePyramid(tmp_path)),
+        mock.patch.object(
+            client, "_prefetch_executor", ThreadPoolExecutor(max_workers=1)
+        ) as executor,
+    ):
+        client.prefetch_analyses([client.SAMPLE_UUID, client.NOT_FOUND_UUID])
+        executor.shutdown(wait=True)
+
+    assert len(list(tmp_path.glob("*-preview.png"))) == 2
+    assert len(client._familial_cache) == 1
+    assert MOCK_STREAMLIT.session_state[PREFETCH_SCHEDULER].pending() == 0
+
+
 def test_get_scat_analysis_data_returns_image_path():
     response = client.get_scat_analysis_data(client.SAMPLE_UUID)
 
@@ -188,17 +344,172 @@ def test_get_scat_analysis_data_no_access_raises_error():
         client.get_scat_analysis_data(client.SAMPLE_UUID)
 
 
+def test_concurrent_requests_share_one_fetch_after_checking_each_user():
+    release = threading.Event()
+    get_artifact = client._backend.get_artifact
+
+    def slow_get_artifact(*args):
+        release.wait(timeout=5)
+        return get_artifact(*args)
+
+    def allowed_on_fetch_threads(*_):
+        return threading.current_thread() is not threading.main_thread()
+
+    with (
+        mock.patch.object(
+            client._backend, "get_artifact", side_effect=slow_get_artifact
+        ) as fetch,
+        mock.patch(
+            "genetic_forensic_portal.app.client.keycloak_client.check_download_access",
+            side_effect=allowed_on_fetch_threads,
+        ) as check_access,
+    ):
+        results = [
+            client._submit_fetch(client.get_scat_analysis_data, client.SAMPLE_UUID)
+            for _ in range(4)
+        ]
+        while check_access.call_count < len(results):
+            time.sleep(0.01)
+        time.sleep(0.1)
+
+        # a user without access is turned away without waiting for the shared fetch
+        with pytest.raises(FileNotFoundError):
+            client.get_scat_analysis_data(client.SAMPLE_UUID)
+        release.set()
+
+        assert [result.result() for result in results] == [
+            client.SCAT_SAMPLE_DATA_PATH
+        ] * len(results)
+    fetch.assert_called_once()
+    assert check_access.call_count == len(results) + 1
+
+
 def test_get_scat_analysis_data_raises_error_for_none():
     with pytest.raises(ValueError, match=client.MISSING_UUID_ERROR):
         client.get_scat_analysis_data(None)  # type: ignore[arg-type]
 
 
+def test_get_scat_analysis_data_download_fetches_only_when_read():
+    with mock.patch.object(
+        client._backend, "iter_artifact", wraps=client._backend.iter_artifact
+    ) as iter_artifact:
+        download = client.get_scat_analysis_data_download(client.SAMPLE_UUID)
+
+        assert download.file_name == Path(client.SCAT_SAMPLE_DATA_PATH).name
+        iter_artifact.assert_not_called()
+        assert download.read() == Path(client.SCAT_SAMPLE_DATA_PATH).read_bytes()
+
+
+def test_get_voronoi_analysis_data_download_no_access_raises_error():
+    with (
+        pytest.raises(FileNotFoundError),
+        mock.patch(
+            "genetic_forensic_portal.app.client.keycloak_client.check_download_access",
+            return_value=False,
+        ),
+    ):
+        client.get_voronoi_analysis_data_download(client.SAMPLE_UUID)
+
+
+def test_get_voronoi_analysis_data_download_missing_artifact_raises_error():
+    with (
+        pytest.raises(FileNotFoundError),
+        mock.patch(
+            "genetic_forensic_portal.app.client.keycloak_client.check_download_access",
+            return_value=True,
+        ),
+    ):
+        client.get_voronoi_analysis_data_download(client.FAMILIAL_FILE_PARSE_ERROR_UUID)
+
+
 def test_list_all_analyses_returns_list():
     response = client.list_all_analyses()
 
     assert response == UUIDS_WITH_ACCESS
 
 
+def test_iter_analyses_yields_every_page_in_order():
+    assert list(client.iter_analyses()) == UUIDS_WITH_ACCESS
+
+
+def test_iter_analyses_starts_at_next_token():
+    first_page = client.list_analyses()
+
+    assert (
+        list(client.iter_analyses(first_page.next_token))
+        == UUIDS_WITH_ACCESS[len(first_page.analyses) :]
+    )
+
+
+def test_iter_analyses_prefetches_next_page():
+    second_page_requested = threading.Event()
+    list_page = client._backend.list_analyses
+
+    def record_request(next_token, page_size, analysis_filter=None):
+        if next_token > 0:
+            second_page_requested.set()
+        return list_page(next_token, page_size, analysis_filter)
+
+    with mock.patch.object(
+        client._backend, "list_analyses", side_effect=record_request
+    ):
+        analyses = client.iter_analyses()
+        next(analyses)
+
+        # the first page is not used up yet, but the second is on its way
+        assert second_page_requested.wait(timeout=5)
+        analyses.close()
+
+
+def test_iter_analyses_overlaps_page_fetches():
+    list_page = client._backend.list_analyses
+
+    def slow_page(next_token, page_size, analysis_filter=None):
+        time.sleep(0.2)
+        return list_page(next_token, page_size, analysis_filter)
+
+    with mock.patch.object(client._backend, "list_analyses", side_effect=slow_page):
+        start = time.perf_counter()
+        for _analysis in client.iter_analyses():
+            time.sleep(0.1)
+        overlapped = time.perf_counter() - start
+
+    # three pages of 0.2s and five analyses of 0.1s would take 1.1s one after another
+    assert overlapped < 1.0
+
+
+def test_list_all_analyses_is_cached_between_calls():
+    with mock.patch.object(
+        client._backend, "list_analyses", wraps=client._backend.list_analyses
+    ) as mock_list:
+        first = client.list_all_analyses()
+        pages_read = mock_list.call_count
+        first.append("changed by caller")
+
+        assert client.list_all_analyses() == UUIDS_WITH_ACCESS
+        assert mock_list.call_count == pages_read
+
+
+def test_list_all_analyses_is_cached_per_user(monkeypatch):
+    client.list_all_analyses()
+    monkeypatch.setattr(
+        client.st, "session_state", {USERNAME: "noaccess", ROLES: ["admin"]}
+    )
+
+    assert client.list_all_analyses() == []
+
+
+def test_upload_invalidates_list_all_analyses_cache():
+    client.list_all_analyses()
+
+    with mock.patch(
+        "genetic_forensic_portal.app.utils.validate_input_file.check_input_stream"
+    ):
+        client.upload_sample_analysis(io.BytesIO(LEGAL_FILE_DATA), TEST_METADATA)
+
+    assert len(client._analysis_list_cache) == 0
+
+
 def test_list_analyses_returns_response_object():
     response = client.list_analyses()
 
@@ -245,6 +556,50 @@ def test_list_analyses_with_out_of_bounds_start_returns_empty_list():
     assert response.next_token is None
 
 
+def test_list_analyses_with_page_size_returns_larger_page():
+    response = client.list_analyses(page_size=10)
+
+    assert response.analyses == UUIDS_WITH_ACCESS
+    assert response.next_token is None
+
+
+@pytest.mark.parametrize(
+    ("filters", "expected"),
+    [
+        (
+            {"status": AnalysisStatus.ANALYSIS_SUCCEEDED},
+            [SAMPLE_UUID, NO_METADATA_UUID],
+        ),
+        (
+            {"owner": "test-center"},
+            [SAMPLE_UUID, IN_PROGRESS_UUID],
+        ),
+        (
+            {"submitted_after": datetime(2024, 8, 1, tzinfo=UTC)},
+            [IN_PROGRESS_UUID, ANALYSIS_FAILED_UUID, FAMILIAL_FILE_PARSE_ERROR_UUID],
+        ),
+        (
+            {"status": AnalysisStatus.ANALYSIS_FAILED, "owner": "test1"},
+            [ANALYSIS_FAILED_UUID],
+        ),
+    ],
+)
+def test_list_analyses_filters_are_applied_by_backend(filters, expected):
+    with mock.patch(
+        "genetic_forensic_portal.app.client.keycloak_client.check_view_access",
+        side_effect=AssertionError,
+    ):
+        response = client.list_analyses(page_size=10, **filters)
+
+    assert response.analyses == expected
+
+
+def test_iter_analyses_passes_filters_to_every_page():
+    assert list(
+        client.iter_analyses(page_size=1, status=AnalysisStatus.ANALYSIS_SUCCEEDED)
+    ) == [SAMPLE_UUID, NO_METADATA_UUID]
+
+
 # Voronoi Analysis
 
 
@@ -372,6 +727,53 @@ def test_get_analysis_status_no_uuid_provided():
         client.get_analysis_status(None)  # type: ignore[arg-type]
 
 
+def test_get_analysis_statuses_maps_each_id():
+    statuses = client.get_analysis_statuses(
+        [
+            client.SAMPLE_UUID,
+            client.IN_PROGRESS_UUID,
+            client.ANALYSIS_FAILED_UUID,
+            client.NOT_AUTHORIZED_UUID,
+            "unknown-uuid",
+        ]
+    )
+
+    assert statuses == {
+        client.SAMPLE_UUID: AnalysisStatus.ANALYSIS_SUCCEEDED,
+        client.IN_PROGRESS_UUID: AnalysisStatus.ANALYSIS_IN_PROGRESS,
+        client.ANALYSIS_FAILED_UUID: AnalysisStatus.ANALYSIS_FAILED,
+        client.NOT_AUTHORIZED_UUID: AnalysisStatus.ANALYSIS_NOT_FOUND,
+        "unknown-uuid": AnalysisStatus.ANALYSIS_NOT_FOUND,
+    }
+
+
+def test_get_analysis_statuses_fetches_in_batches():
+    with (
+        mock.patch.object(client, "STATUS_BATCH_SIZE", 2),
+        mock.patch(
+            "genetic_forensic_portal.app.client.keycloak_client.check_view_access",
+            side_effect=AssertionError,
+        ),
+        mock.patch.object(
+            client._backend,
+            "get_analysis_statuses",
+            return_value={},
+        ) as mock_statuses,
+    ):
+        client.get_analysis_statuses(UUIDS_WITH_ACCESS)
+
+    assert mock_statuses.call_count == 3
+
+
+def test_get_analysis_statuses_marks_failed_batch_as_error():
+    with mock.patch.object(
+        client._backend, "get_analysis_statuses", side_effect=ConnectionError
+    ):
+        statuses = client.get_analysis_statuses([client.SAMPLE_UUID])
+
+    assert statuses == {client.SAMPLE_UUID: AnalysisStatus.ANALYSIS_ERROR}
+
+
 # Familial Analysis
 
 
@@ -379,7 +781,13 @@ def test_get_familial_analysis_returns_image_path():
     response = client.get_familial_analysis(client.SAMPLE_UUID)
 
     pd.testing.assert_frame_equal(
-        response, pd.read_csv(client.FAMILIAL_SAMPLE_DATA, sep="\t", skiprows=1)
+        response,
+        pd.read_csv(
+            client.FAMILIAL_SAMPLE_DATA,
+            sep="\t",
+            skiprows=1,
+            dtype=fam_utils.FAMILIAL_DTYPES,
+        ),
     )
 
 
@@ -387,10 +795,92 @@ def test_get_familial_analysis_no_metadata_returns_different_image_path():
     response = client.get_familial_analysis(client.NO_METADATA_UUID)
 
     pd.testing.assert_frame_equal(
-        response, pd.read_csv(client.FAMILIAL_SAMPLE_DATA_2, sep="\t", skiprows=1)
+        response,
+        pd.read_csv(
+            client.FAMILIAL_SAMPLE_DATA_2,
+            sep="\t",
+            skiprows=1,
+            dtype=fam_utils.FAMILIAL_DTYPES,
+        ),
     )
 
 
+def test_get_familial_analysis_parses_each_file_once():
+    with mock.patch(
+        "genetic_forensic_portal.app.utils.familial_analysis_utils.read_familial_results",
+        wraps=fam_utils.read_familial_results,
+    ) as read:
+        first = client.get_familial_analysis(client.SAMPLE_UUID)
+        second = client.get_familial_analysis(client.SAMPLE_UUID)
+        client.get_familial_analysis(client.NO_METADATA_UUID)
+
+    assert second is first
+    assert read.call_count == 2
+
+
+def test_get_familial_analysis_parses_again_when_file_changes(tmp_path):
+    changed = tmp_path / "familial.tsv"
+    changed.write_text(
+        "Familial Matching Report\n\nSeizure\tWeighted Match Score\tIncludes exact match(es)\nA\t1.0\tY\n"
+    )
+    with mock.patch.object(client._backend, "get_artifact", return_value=str(changed)):
+        first = client.get_familial_analysis(client.SAMPLE_UUID)
+        changed.write_text(changed.read_text() + "B\t2.0\tN\n")
+        second = client.get_familial_analysis(client.SAMPLE_UUID)
+
+    assert len(first) == 1
+    assert len(second) == 2
+
+
+def test_get_familial_matches_page_of_tsv_report():
+    page = client.get_familial_matches_page(client.SAMPLE_UUID, start=1, page_size=5)
+
+    assert page.start == 1
+    assert page.total == 2
+    pd.testing.assert_frame_equal(
+        page.matches, client.get_familial_analysis(client.SAMPLE_UUID).iloc[1:]
+    )
+
+
+def test_get_familial_matches_page_reads_only_page_of_arrow_results(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    matches = pd.DataFrame(
+        {
+            fam_utils.SEIZURE_COLUMN: [f"SEIZURE_{row}" for row in range(1000)],
+            fam_utils.MATCH_SCORE_COLUMN: [float(row) for row in range(1000)],
+            fam_utils.EXACT_MATCH_COLUMN: ["N"] * 1000,
+        }
+    ).astype(fam_utils.FAMILIAL_DTYPES)
+    path = tmp_path / "familial.arrow"
+    table = pa.Table.from_pandas(matches, preserve_index=False)
+    with pa.ipc.new_file(path, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=100):
+            writer.write_batch(batch)
+
+    with mock.patch.object(client._backend, "get_artifact", return_value=str(path)):
+        page = client.get_familial_matches_page(
+            client.SAMPLE_UUID, start=200, page_size=50
+        )
+
+        with mock.patch.object(
+            fam_utils, "read_familial_results", side_effect=AssertionError
+        ):
+            cached_page = client.get_familial_matches_page(
+                client.SAMPLE_UUID, start=200, page_size=50
+            )
+
+    assert page.total == 1000
+    pd.testing.assert_frame_equal(page.matches, matches.iloc[200:250])
+    # only the page is kept, not the whole table
+    assert len(client._familial_cache) == 1
+    assert cached_page.matches is page.matches
+
+
+def test_get_familial_matches_page_with_erroring_file_raises():
+    with pytest.raises(RuntimeError, match=client.FAMILIAL_TSV_ERROR):
+        client.get_familial_matches_page(client.FAMILIAL_FILE_PARSE_ERROR_UUID)
+
+
 def test_get_familial_analysis_raises_error():
     with (
         pytest.raises(FileNotFoundError),
@@ -433,7 +923,7 @@ mock_familial_data = pd.DataFrame(
 )
 
 
-@pytest.fixture()
+@pytest.fixture
 def mock_functions(mocker):
     def _mock_functions(mock_scat=None, mock_voronoi=None, mock_familial=None):
         mocker.patch(
@@ -540,19 +1030,303 @@ def test_get_all_analyses(
     )
     results = client.get_all_analyses(uuid)
 
-    assert (
-        results.scat == expected_results.scat
-    ), f"SCAT analysis mismatch for UUID: {uuid}"
-    assert (
-        results.voronoi == expected_results.voronoi
-    ), f"Voronoi analysis mismatch for UUID: {uuid}"
+    assert results.scat == expected_results.scat, (
+        f"SCAT analysis mismatch for UUID: {uuid}"
+    )
+    assert results.voronoi == expected_results.voronoi, (
+        f"Voronoi analysis mismatch for UUID: {uuid}"
+    )
     if isinstance(results.familial, pd.DataFrame) and isinstance(
         expected_results.familial, pd.DataFrame
     ):
-        assert results.familial.equals(
-            expected_results.familial
-        ), f"Familial analysis mismatch for UUID: {uuid}"
+        assert results.familial.equals(expected_results.familial), (
+            f"Familial analysis mismatch for UUID: {uuid}"
+        )
     else:
-        assert (
-            results.familial == expected_results.familial
-        ), f"Familial analysis mismatch for UUID: {uuid}"
+        assert results.familial == expected_results.familial, (
+            f"Familial analysis mismatch for UUID: {uuid}"
+        )
+
+
+def slow(result, seconds):
+    def _slow(_sample_id):
+        time.sleep(seconds)
+        return result
+
+    return _slow
+
+
+def test_get_all_analyses_fetches_concurrently(mock_functions):
+    mock_functions(
+        mock_scat=slow(mock_scat_image, 0.3),
+        mock_voronoi=slow(mock_voronoi_image, 0.3),
+        mock_familial=slow(mock_familial_data, 0.3),
+    )
+
+    start = time.perf_counter()
+    results = client.get_all_analyses(client.SAMPLE_UUID)
+
+    assert time.perf_counter() - start < 0.6
+    assert results.scat == mock_scat_image
+    assert results.voronoi == mock_voronoi_image
+    assert results.familial is mock_familial_data
+
+
+def test_get_all_analyses_returns_what_arrived_before_timeout(mock_functions, caplog):
+    mock_functions(
+        mock_scat=slow(mock_scat_image, 1.0),
+        mock_voronoi=mock_voronoi,
+        mock_familial=mock_familial,
+    )
+
+    results = client.get_all_analyses(client.SAMPLE_UUID, timeout=0.1)
+
+    assert results.scat is None
+    assert results.voronoi == mock_voronoi_image
+    assert results.familial is mock_familial_data
+    assert "SCAT analysis timed out" in caplog.text
+
+
+def test_get_all_analyses_does_not_queue_behind_shared_fetches(mock_functions):
+    mock_functions(
+        mock_scat=mock_scat, mock_voronoi=mock_voronoi, mock_familial=mock_familial
+    )
+    release = threading.Event()
+    busy = [client._submit_fetch(release.wait, 5) for _ in range(client.FETCH_WORKERS)]
+
+    try:
+        results = client.get_all_analyses(client.SAMPLE_UUID, timeout=1.0)
+    finally:
+        release.set()
+
+    assert results.scat == mock_scat_image
+    assert results.voronoi == mock_voronoi_image
+    assert results.familial is mock_familial_data
+    assert all(fetch.result() for fetch in busy)
+
+
+def test_fetch_threads_do_not_keep_an_earlier_script_run_context():
+    ctx = object()
+    script_thread = threading.current_thread()
+    with (
+        mock.patch.object(client, "_fetch_executor", ThreadPoolExecutor(1)),
+        mock.patch.object(
+            client,
+            "add_script_run_ctx",
+            side_effect=lambda thread, ctx: setattr(
+                thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, ctx
+            ),
+        ),
+    ):
+        setattr(script_thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, ctx)
+        try:
+            in_script_run = client._submit_fetch(client.get_script_run_ctx, True)
+        finally:
+            delattr(script_thread, SCRIPT_RUN_CONTEXT_ATTR_NAME)
+        assert in_script_run.result() is ctx
+
+        outside_script_run = client._submit_fetch(client.get_script_run_ctx, True)
+        assert outside_script_run.result() is None
+
+
+def test_get_all_analyses_raises_permission_error(mock_functions):
+    def denied(_sample_id):
+        raise PermissionError
+
+    mock_functions(
+        mock_scat=denied, mock_voronoi=mock_voronoi, mock_familial=mock_familial
+    )
+
+    with pytest.raises(PermissionError):
+        client.get_all_analyses(client.SAMPLE_UUID)
+
+
+def test_large_upload_is_sent_in_parts_and_resumed(monkeypatch):
+    monkeypatch.setattr(client, "CHUNKED_UPLOAD_THRESHOLD", 1)
+    monkeypatch.setattr(client, "UPLOAD_PART_SIZE", 16)
+    monkeypatch.setattr(client, "_pending_uploads", {})
+    send_part = client._backend.upload_part
+    sent_parts = []
+
+    def drop_part_two(upload_id, part_number, data, part_hash):
+        sent_parts.append(part_number)
+        # part 2 is dropped on the first try and every resumption of the first upload
+        if part_number == 2 and sent_parts.count(2) <= 4:
+            raise ConnectionError
+        send_part(upload_id, part_number, data, part_hash)
+
+    with (
+        mock.patch(
+            "genetic_forensic_portal.app.utils.validate_input_file.check_input_stream"
+        ),
+        mock.patch.object(client._backend, "upload_part", side_effect=drop_part_two),
+    ):
+        with pytest.raises(ConnectionError):
+            client.upload_sample_analysis(io.BytesIO(LEGAL_FILE_DATA), TEST_METADATA)
+        assert len(client._pending_uploads) == 1
+
+        response = client.upload_sample_analysis(
+            io.BytesIO(LEGAL_FILE_DATA), TEST_METADATA
+        )
+
+    assert response == client.SAMPLE_UUID
+    assert client._pending_uploads == {}
+    # the second submission only sent the part the API was missing
+    assert sent_parts.count(0) == 1
+    assert sent_parts.count(2) == 5
+
+
+def test_concurrent_uploads_of_same_file_use_separate_uploads(monkeypatch):
+    monkeypatch.setattr(client, "CHUNKED_UPLOAD_THRESHOLD", 1)
+    monkeypatch.setattr(client, "UPLOAD_PART_SIZE", 16)
+    monkeypatch.setattr(client, "_pending_uploads", {"stale": "upload"})
+    release = threading.Event()
+    send_part = client._backend.upload_part
+    upload_ids = []
+
+    def slow_send_part(upload_id, part_number, data, part_hash):
+        upload_ids.append(upload_id)
+        release.wait(timeout=5)
+        send_part(upload_id, part_number, data, part_hash)
+
+    with (
+        mock.patch(
+            "genetic_forensic_portal.app.utils.validate_input_file.check_input_stream"
+        ),
+        mock.patch.object(client._backend, "upload_part", side_effect=slow_send_part),
+    ):
+        uploads = [
+            client._submit_fetch(
+                client.upload_sample_analysis,
+                io.BytesIO(LEGAL_FILE_DATA),
+                TEST_METADATA,
+            )
+            for _ in range(2)
+        ]
+        deadline = time.monotonic() + 2
+        while len(set(upload_ids)) < len(uploads) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        assert len(set(upload_ids)) == len(uploads)
+
+        assert [upload.result() for upload in uploads] == [client.SAMPLE_UUID] * 2
+    assert client._pending_uploads == {"stale": "upload"}
+
+
+# Batch upload
+
+
+def test_upload_sample_analyses_returns_result_per_file():
+    valid_file = io.BytesIO(LEGAL_FILE_DATA)
+    valid_file.name = "valid.tsv"
+    invalid_file = io.BytesIO(b"this is a file")
+    invalid_file.name = "invalid.tsv"
+
+    responses = client.upload_sample_analyses(
+        [valid_file, invalid_file], TEST_METADATA, max_workers=2
+    )
+
+    assert [response.file_name for response in responses] == [
+        "valid.tsv",
+        "invalid.tsv",
+    ]
+    assert responses[0].succeeded
+    assert responses[0].uuid == client.SAMPLE_UUID
+    assert not responses[1].succeeded
+    assert isinstance(responses[1].error, InvalidInputFileError)
+    assert responses[1].error.report.errors[0][2] == HEADER_MUST_START_WITH_MATCHID
+
+
+@pytest.mark.parametrize(
+    ("error", "captured"),
+    [
+        (ConnectionError("API unavailable"), True),
+        (requests.ConnectionError("API unavailable"), True),
+        (TypeError("bug"), False),
+    ],
+)
+def test_upload_sample_analyses_captures_only_upload_errors(error, captured):
+    valid_file = io.BytesIO(LEGAL_FILE_DATA)
+
+    with mock.patch.object(client, "_send_sample", side_effect=error):
+        if captured:
+            responses = client.upload_sample_analyses([valid_file], max_workers=1)
+            assert responses[0].error is error
+        else:
+            with pytest.raises(TypeError):
+                client.upload_sample_analyses([valid_file], max_workers=1)
+
+
+def test_iter_upload_sample_analyses_yields_every_file():
+    files = [io.BytesIO(LEGAL_FILE_DATA) for _ in range(3)]
+
+    responses = list(client.iter_upload_sample_analyses(files, max_workers=2))
+
+    assert len(responses) == 3
+    assert all(response.uuid == client.NO_METADATA_UUID for response in responses)
+
+
+def test_upload_sample_analyses_nothing_returns_error():
+    with pytest.raises(ValueError, match=client.MISSING_DATA_ERROR):
+        client.upload_sample_analyses([])
+
+
+def test_upload_sample_analyses_no_access_returns_error():
+    with (
+        pytest.raises(PermissionError, match=client.UPLOAD_DENIED_ERROR),
+        mock.patch(
+            "genetic_forensic_portal.app.client.keycloak_client.check_create_access",
+            return_value=False,
+        ),
+    ):
+        client.upload_sample_analyses([io.BytesIO(LEGAL_FILE_DATA)])
+
+
+def test_upload_sample_analyses_reuses_cached_results():
+    client.upload_sample_analysis(io.BytesIO(LEGAL_FILE_DATA), TEST_METADATA)
+
+    with (
+        mock.patch.object(client._validation_pool, "submit") as mock_submit,
+        mock.patch.object(client, "_check_sample") as mock_check,
+    ):
+        responses = client.upload_sample_analyses(
+            [io.BytesIO(LEGAL_FILE_DATA)], TEST_METADATA
+        )
+
+    mock_submit.assert_not_called()
+    mock_check.assert_not_called()
+    assert responses[0].uuid == client.SAMPLE_UUID
+
+
+def test_upload_sample_analyses_validates_single_file_on_this_thread():
+    invalid_file = io.BytesIO(b"this is a single file")
+
+    with mock.patch.object(client._validation_pool, "submit") as mock_submit:
+        responses = client.upload_sample_analyses([invalid_file], max_workers=4)
+
+    mock_submit.assert_not_called()
+    assert isinstance(responses[0].error, InvalidInputFileError)
+
+
+def test_upload_sample_analyses_validates_batch_from_temporary_files(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setattr(client.tempfile, "tempdir", str(tmp_path))
+    files = [io.BytesIO(LEGAL_FILE_DATA) for _ in range(3)]
+    submit = client._validation_pool.submit
+    in_flight = []
+
+    def submit_and_count(function, path, *args):
+        in_flight.append(len(list(tmp_path.glob("gf-validate-*"))))
+        assert Path(path).read_bytes() == LEGAL_FILE_DATA
+        return submit(function, path, *args)
+
+    with mock.patch.object(
+        client._validation_pool, "submit", side_effect=submit_and_count
+    ):
+        responses = client.upload_sample_analyses(files, max_workers=2)
+
+    assert all(response.succeeded for response in responses)
+    assert len(in_flight) == 3
+    assert max(in_flight) <= 2
+    assert list(tmp_path.glob("gf-validate-*")) == []
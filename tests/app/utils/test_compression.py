@@ -0,0 +1,68 @@
+import gzip
+import io
+import zipfile
+
+import pytest
+
+from genetic_forensic_portal.app.utils import compression
+from genetic_forensic_portal.app.utils.compression import ContentEncoding
+
+FILE_DATA = b"MatchID\tFH67\nsample1\t1\n" * 10_000
+
+
+def _zip(members):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as zipped:
+        for name, data in members.items():
+            zipped.writestr(name, data)
+    return archive.getvalue()
+
+
+def _zstd(data):
+    zstandard = pytest.importorskip("zstandard")
+    return zstandard.ZstdCompressor().compress(data)
+
+
+@pytest.mark.parametrize(
+    ("compress", "encoding"),
+    [
+        (gzip.compress, ContentEncoding.GZIP),
+        (lambda data: _zip({"sample.tsv": data}), ContentEncoding.ZIP),
+        (_zstd, ContentEncoding.ZSTD),
+    ],
+)
+def test_decompressed_streams_and_rewinds(compress, encoding):
+    stream = io.BytesIO(compress(FILE_DATA))
+
+    assert compression.detect_encoding(stream) == encoding
+    assert stream.tell() == 0
+
+    decompressed = compression.decompressed(stream, encoding)
+    assert decompressed.read(10) == FILE_DATA[:10]
+    assert decompressed.read() == FILE_DATA[10:]
+
+    decompressed.seek(0)
+    assert decompressed.read() == FILE_DATA
+
+
+def test_uncompressed_stream_is_returned_as_is():
+    stream = io.BytesIO(FILE_DATA)
+
+    assert compression.detect_encoding(stream) is None
+    assert compression.decompressed(stream, None) is stream
+
+
+def test_zip_with_several_files_raises_error():
+    stream = io.BytesIO(_zip({"a.tsv": FILE_DATA, "b.tsv": FILE_DATA}))
+
+    with pytest.raises(
+        ValueError, match=compression.ZIP_MUST_HOLD_ONE_FILE.format(count=2)
+    ):
+        compression.decompressed(stream, ContentEncoding.ZIP)
+
+
+def test_truncated_gzip_raises_error():
+    stream = io.BytesIO(gzip.compress(FILE_DATA)[:-100])
+
+    with pytest.raises(ValueError, match="Could not decompress gzip file"):
+        compression.decompressed(stream, ContentEncoding.GZIP).read()
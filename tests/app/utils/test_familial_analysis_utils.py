@@ -1,6 +1,48 @@
 from __future__ import annotations
 
+from unittest import mock
+
+import pandas as pd
+import pytest
+
 import genetic_forensic_portal.app.utils.familial_analysis_utils as fam_utils
+from genetic_forensic_portal.app.client.backends.canned_backend import (
+    FAMILIAL_SAMPLE_DATA,
+    FAMILIAL_SAMPLE_DATA_ERRORS,
+)
+
+PYARROW_ENGINE = pytest.param(
+    "pyarrow",
+    marks=pytest.mark.skipif(fam_utils.pa is None, reason="pyarrow is not installed"),
+)
+
+MATCHES = pd.DataFrame(
+    {
+        fam_utils.SEIZURE_COLUMN: [f"SEIZURE_{row:02d}" for row in range(25)],
+        fam_utils.MATCH_SCORE_COLUMN: [row / 4 for row in range(25)],
+        fam_utils.EXACT_MATCH_COLUMN: [
+            "Y" if row % 3 == 0 else "N" for row in range(25)
+        ],
+    }
+).astype(fam_utils.FAMILIAL_DTYPES)
+
+
+@pytest.fixture(
+    params=[fam_utils.FamilialFormat.ARROW, fam_utils.FamilialFormat.PARQUET]
+)
+def columnar_results(request, tmp_path):
+    """Write MATCHES in several record batches or row groups of 10 rows."""
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    table = pa.Table.from_pandas(MATCHES, preserve_index=False)
+    path = tmp_path / f"matches.{request.param}"
+    if request.param == fam_utils.FamilialFormat.ARROW:
+        with pa.ipc.new_file(path, table.schema) as writer:
+            for batch in table.to_batches(max_chunksize=10):
+                writer.write_batch(batch)
+    else:
+        pq.write_table(table, path, row_group_size=10)
+    return path
 
 
 def test_highlight_exact_matches_match_returns_green():
@@ -13,3 +55,99 @@ def test_highlight_exact_matches_no_match_returns_none():
 
 def test_highlight_exact_matches_numeric_values_no_error():
     assert fam_utils.highlight_exact_matches(12) is None
+
+
+def test_read_familial_results_uses_declared_types():
+    results = fam_utils.read_familial_results(FAMILIAL_SAMPLE_DATA)
+
+    assert list(results.columns) == list(fam_utils.FAMILIAL_DTYPES)
+    assert results[fam_utils.EXACT_MATCH_COLUMN].dtype == "category"
+    assert results[fam_utils.MATCH_SCORE_COLUMN].dtype == "float64"
+    assert results[fam_utils.SEIZURE_COLUMN].dtype == "string"
+
+
+@pytest.mark.parametrize("engine", ["c", PYARROW_ENGINE])
+def test_read_familial_results_engines_agree(engine):
+    with mock.patch.object(fam_utils, "FAMILIAL_PARSER_ENGINE", engine):
+        results = fam_utils.read_familial_results(FAMILIAL_SAMPLE_DATA)
+
+    pd.testing.assert_frame_equal(
+        results,
+        pd.read_csv(
+            FAMILIAL_SAMPLE_DATA,
+            sep="\t",
+            skiprows=1,
+            dtype=fam_utils.FAMILIAL_DTYPES,
+        ),
+    )
+
+
+@pytest.mark.parametrize("engine", ["c", PYARROW_ENGINE])
+def test_read_familial_results_malformed_raises(engine):
+    with (
+        mock.patch.object(fam_utils, "FAMILIAL_PARSER_ENGINE", engine),
+        pytest.raises(ValueError, match="Expected 3"),
+    ):
+        fam_utils.read_familial_results(FAMILIAL_SAMPLE_DATA_ERRORS)
+
+
+def test_detect_familial_format(columnar_results):
+    assert (
+        fam_utils.detect_familial_format(FAMILIAL_SAMPLE_DATA)
+        == fam_utils.FamilialFormat.TSV
+    )
+    assert (
+        fam_utils.detect_familial_format(columnar_results)
+        == columnar_results.suffix[1:]
+    )
+
+
+def test_read_columnar_results_matches_tsv(columnar_results):
+    results = fam_utils.read_familial_results(columnar_results)
+
+    pd.testing.assert_frame_equal(results, MATCHES)
+    assert fam_utils.count_familial_results(columnar_results) == len(MATCHES)
+
+
+@pytest.mark.parametrize(
+    ("start", "stop"), [(0, 10), (5, 15), (8, 22), (20, None), (24, 100)]
+)
+def test_read_columnar_results_row_range(columnar_results, start, stop):
+    results = fam_utils.read_familial_results(columnar_results, start=start, stop=stop)
+
+    pd.testing.assert_frame_equal(results, MATCHES.iloc[start:stop])
+
+
+def test_read_columnar_results_past_end_is_empty(columnar_results):
+    results = fam_utils.read_familial_results(columnar_results, start=30, stop=40)
+
+    assert results.empty
+    assert list(results.columns) == list(MATCHES.columns)
+
+
+def test_read_columnar_results_projects_columns(columnar_results):
+    columns = [fam_utils.EXACT_MATCH_COLUMN, fam_utils.SEIZURE_COLUMN]
+
+    results = fam_utils.read_familial_results(
+        columnar_results, columns=columns, start=5, stop=15
+    )
+
+    pd.testing.assert_frame_equal(results, MATCHES.iloc[5:15][columns])
+
+
+def test_read_tsv_results_row_range_and_columns():
+    results = fam_utils.read_familial_results(
+        FAMILIAL_SAMPLE_DATA, columns=[fam_utils.SEIZURE_COLUMN], start=1, stop=2
+    )
+
+    assert list(results.columns) == [fam_utils.SEIZURE_COLUMN]
+    assert list(results.index) == [1]
+    assert fam_utils.count_familial_results(FAMILIAL_SAMPLE_DATA) == 2
+
+
+def test_read_columnar_results_without_pyarrow_raises(columnar_results):
+    with (
+        mock.patch.object(fam_utils, "pa", None),
+        pytest.raises(ValueError, match="needs the pyarrow package"),
+    ):
+        fam_utils.read_familial_results(columnar_results)
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import pandas as pd
+
+from genetic_forensic_portal.app.utils import frame_cache
+
+
+def frame(rows):
+    return pd.DataFrame({"score": [float(row) for row in range(rows)]})
+
+
+def test_get_returns_put_frame():
+    cache = frame_cache.FrameCache()
+    cached = frame(3)
+
+    cache.put("key", cached)
+
+    assert cache.get("key") is cached
+    assert cache.get("other key") is None
+    assert cache.size == frame_cache.frame_size(cached)
+
+
+def test_evicts_least_recently_used_frames_to_fit():
+    size = frame_cache.frame_size(frame(100))
+    cache = frame_cache.FrameCache(max_bytes=2 * size)
+    cache.put("a", frame(100))
+    cache.put("b", frame(100))
+    cache.get("a")
+
+    cache.put("c", frame(100))
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+    assert cache.size == 2 * size
+
+
+def test_frame_bigger_than_cache_is_not_kept():
+    cache = frame_cache.FrameCache(max_bytes=frame_cache.frame_size(frame(10)))
+    cache.put("small", frame(10))
+
+    cache.put("big", frame(1000))
+
+    assert cache.get("big") is None
+    assert cache.get("small") is not None
+
+
+def test_replacing_and_discarding_keep_size():
+    cache = frame_cache.FrameCache()
+    cache.put("key", frame(1000))
+    cache.put("key", frame(10))
+
+    assert cache.size == frame_cache.frame_size(frame(10))
+
+    cache.discard("key")
+    cache.discard("missing")
+
+    assert len(cache) == 0
+    assert cache.size == 0
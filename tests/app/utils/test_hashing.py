@@ -0,0 +1,10 @@
+import hashlib
+import io
+
+from genetic_forensic_portal.app.utils import hashing
+
+
+def test_hash_stream_returns_sha256():
+    data = b"MatchID\tFH67\n" * 10_000
+
+    assert hashing.hash_stream(io.BytesIO(data)) == hashlib.sha256(data).hexdigest()
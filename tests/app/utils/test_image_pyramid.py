@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import os
+import shutil
+from pathlib import Path
+from unittest import mock
+
+from PIL import Image
+
+from genetic_forensic_portal.app.client.backends.canned_backend import (
+    SCAT_SAMPLE_IMAGE,
+    SCAT_SAMPLE_IMAGE_2,
+    VORONOI_SAMPLE_IMAGE,
+)
+from genetic_forensic_portal.app.utils import image_pyramid
+from genetic_forensic_portal.app.utils.image_pyramid import ImagePyramid, ImageSize
+
+
+def test_full_size_is_the_image_itself(tmp_path):
+    pyramid = ImagePyramid(tmp_path)
+
+    assert pyramid.get(SCAT_SAMPLE_IMAGE, ImageSize.FULL) == SCAT_SAMPLE_IMAGE
+    assert pyramid.size() == 0
+
+
+def test_downscaled_sizes_fit_their_dimensions(tmp_path):
+    pyramid = ImagePyramid(tmp_path)
+
+    for size in (ImageSize.THUMBNAIL, ImageSize.PREVIEW):
+        with Image.open(pyramid.get(SCAT_SAMPLE_IMAGE, size)) as image:
+            assert max(image.size) == image_pyramid.MAX_DIMENSIONS[size]
+
+
+def test_copies_are_made_once_and_shared_by_content(tmp_path):
+    pyramid = ImagePyramid(tmp_path / "cache")
+    same_image = tmp_path / "same.png"
+    shutil.copy(SCAT_SAMPLE_IMAGE, same_image)
+
+    with mock.patch.object(Image, "open", wraps=Image.open) as image_open:
+        first = pyramid.get(SCAT_SAMPLE_IMAGE, ImageSize.THUMBNAIL)
+        assert pyramid.get(SCAT_SAMPLE_IMAGE, ImageSize.THUMBNAIL) == first
+        assert pyramid.get(same_image, ImageSize.THUMBNAIL) == first
+
+    assert image_open.call_count == 1
+
+
+def test_changed_image_gets_new_copy(tmp_path):
+    pyramid = ImagePyramid(tmp_path / "cache")
+    image = tmp_path / "map.png"
+    shutil.copy(SCAT_SAMPLE_IMAGE, image)
+    first = pyramid.get(image, ImageSize.THUMBNAIL)
+
+    shutil.copy(VORONOI_SAMPLE_IMAGE, image)
+
+    assert pyramid.get(image, ImageSize.THUMBNAIL) != first
+
+
+def test_least_recently_used_copies_are_evicted(tmp_path):
+    probe = ImagePyramid(tmp_path / "probe")
+    third_size = (
+        Path(probe.get(SCAT_SAMPLE_IMAGE_2, ImageSize.THUMBNAIL)).stat().st_size
+    )
+    pyramid = ImagePyramid(tmp_path / "cache")
+    scat = Path(pyramid.get(SCAT_SAMPLE_IMAGE, ImageSize.THUMBNAIL))
+    voronoi = Path(pyramid.get(VORONOI_SAMPLE_IMAGE, ImageSize.THUMBNAIL))
+    # make the SCAT thumbnail the most recently used
+    os.utime(voronoi, (0, 0))
+    pyramid.get(SCAT_SAMPLE_IMAGE, ImageSize.THUMBNAIL)
+
+    pyramid.max_bytes = scat.stat().st_size + third_size
+    third = Path(pyramid.get(SCAT_SAMPLE_IMAGE_2, ImageSize.THUMBNAIL))
+
+    assert third.exists()
+    assert scat.exists()
+    assert not voronoi.exists()
+
+
+def test_copy_bigger_than_cache_is_still_returned(tmp_path):
+    pyramid = ImagePyramid(tmp_path, max_bytes=1)
+
+    assert Path(pyramid.get(SCAT_SAMPLE_IMAGE, ImageSize.PREVIEW)).exists()
+
+    pyramid.clear()
+    assert pyramid.size() == 0
+
+
+def test_temporary_directory_is_created_on_first_use_and_removed(tmp_path):
+    with mock.patch("tempfile.tempdir", str(tmp_path)):
+        pyramid = ImagePyramid()
+        assert pyramid.size() == 0
+        assert list(tmp_path.iterdir()) == []
+
+        thumbnail = Path(pyramid.get(SCAT_SAMPLE_IMAGE, ImageSize.THUMBNAIL))
+        assert thumbnail.parent.parent == tmp_path
+
+        del pyramid
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from genetic_forensic_portal.app.utils import prefetch_scheduler
+
+
+@pytest.fixture
+def executor():
+    executor = ThreadPoolExecutor(max_workers=1)
+    yield executor
+    executor.shutdown(wait=True, cancel_futures=True)
+
+
+def blocking(release: threading.Event, started: threading.Event):
+    def prefetch():
+        started.set()
+        release.wait(timeout=5)
+
+    return prefetch
+
+
+def test_prefetches_run_in_order(executor):
+    scheduler = prefetch_scheduler.PrefetchScheduler(executor)
+    fetched = []
+
+    scheduler.schedule({key: lambda key=key: fetched.append(key) for key in "abc"})
+    executor.shutdown(wait=True)
+
+    assert fetched == ["a", "b", "c"]
+    assert scheduler.pending() == 0
+
+
+def test_unwanted_prefetches_are_cancelled(executor):
+    scheduler = prefetch_scheduler.PrefetchScheduler(executor)
+    release, started = threading.Event(), threading.Event()
+    fetched = []
+
+    scheduler.schedule(
+        {
+            "running": blocking(release, started),
+            "dropped": lambda: fetched.append("dropped"),
+            "kept": lambda: fetched.append("kept"),
+        }
+    )
+    started.wait(timeout=5)
+    scheduler.schedule({"kept": lambda: fetched.append("kept again")})
+    release.set()
+    executor.shutdown(wait=True)
+
+    assert fetched == ["kept"]
+
+
+def test_pending_keys_are_not_prefetched_again(executor):
+    scheduler = prefetch_scheduler.PrefetchScheduler(executor)
+    release, started = threading.Event(), threading.Event()
+    fetched = []
+
+    scheduler.schedule({"running": blocking(release, started)})
+    started.wait(timeout=5)
+    for _ in range(3):
+        scheduler.schedule(
+            {
+                "running": lambda: fetched.append("running"),
+                "queued": lambda: fetched.append("queued"),
+            }
+        )
+    release.set()
+    executor.shutdown(wait=True)
+
+    assert fetched == ["queued"]
+
+
+def test_finished_keys_are_prefetched_again(executor):
+    scheduler = prefetch_scheduler.PrefetchScheduler(executor)
+    fetched = []
+
+    for _ in range(2):
+        scheduler.schedule({"key": lambda: fetched.append("key")})
+        while scheduler.pending():
+            time.sleep(0.01)
+
+    assert fetched == ["key", "key"]
+
+
+def test_cancel_leaves_started_prefetch_running(executor):
+    scheduler = prefetch_scheduler.PrefetchScheduler(executor)
+    release, started = threading.Event(), threading.Event()
+    fetched = []
+
+    scheduler.schedule(
+        {
+            "running": blocking(release, started),
+            "queued": lambda: fetched.append("queued"),
+        }
+    )
+    started.wait(timeout=5)
+    scheduler.cancel()
+
+    assert scheduler.pending() == 0
+    release.set()
+    executor.shutdown(wait=True)
+    assert fetched == []
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from genetic_forensic_portal.app.utils import process_pool
+
+
+@pytest.fixture
+def pool():
+    pool = process_pool.ProcessPool(max_workers=1)
+    yield pool
+    pool.shutdown()
+
+
+def test_submit_runs_in_a_worker_process(pool):
+    assert pool.submit(os.getpid).result() != os.getpid()
+
+
+def test_workers_are_kept_between_calls(pool):
+    assert pool.submit(os.getpid).result() == pool.submit(os.getpid).result()
+
+
+def test_pool_is_replaced_after_a_worker_dies(pool):
+    with pytest.raises(BrokenProcessPool):
+        pool.submit(os._exit, 1).result()
+
+    assert pool.submit(abs, -1).result() == 1
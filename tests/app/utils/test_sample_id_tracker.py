@@ -0,0 +1,32 @@
+import pytest
+
+from genetic_forensic_portal.app.utils.sample_id_tracker import SampleIdTracker
+
+SIDS = ["s1", "s2", "s3", "s1", "s2", "s1", "s4", "s5", "s5"]
+EXPECTED_UNPAIRED = [("s1", 3, 1), ("s3", 1, 3), ("s4", 1, 7)]
+
+
+@pytest.mark.parametrize("spill_threshold", [100, 2, 0])
+def test_iter_unpaired_yields_sids_not_found_twice_in_order(spill_threshold):
+    with SampleIdTracker(spill_threshold) as tracker:
+        for lineno, sid in enumerate(SIDS, start=1):
+            tracker.add(sid, lineno)
+
+        assert list(tracker.iter_unpaired()) == EXPECTED_UNPAIRED
+
+
+def test_tracker_spills_past_threshold():
+    with SampleIdTracker(spill_threshold=2) as tracker:
+        tracker.add("s1", 1)
+        tracker.add("s2", 2)
+        assert not tracker.spilled
+
+        tracker.add("s3", 3)
+        assert tracker.spilled
+
+    assert not tracker.spilled
+
+
+def test_empty_tracker_yields_nothing():
+    with SampleIdTracker() as tracker:
+        assert list(tracker.iter_unpaired()) == []
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import threading
+import time
+import typing
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+from genetic_forensic_portal.app.utils import single_flight
+
+CALLERS = 8
+MISSING = "missing"
+
+
+def blocked_call(release: threading.Event, calls: list[str], result: str):
+    def call():
+        calls.append(result)
+        release.wait(timeout=5)
+        return result
+
+    return call
+
+
+def wait_until_running(results: list[Future[typing.Any]]) -> None:
+    while not all(result.running() for result in results):
+        time.sleep(0.01)
+    # give the callers time to get from starting to waiting on the shared call
+    time.sleep(0.1)
+
+
+def test_concurrent_calls_share_one_run():
+    flight: single_flight.SingleFlight[str, list[int]] = single_flight.SingleFlight()
+    release = threading.Event()
+    calls: list[str] = []
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as executor:
+        results = [
+            executor.submit(flight.do, "key", blocked_call(release, calls, ["result"]))
+            for _ in range(CALLERS)
+        ]
+        wait_until_running(results)
+        release.set()
+
+    assert len(calls) == 1
+    shared = results[0].result()
+    assert all(result.result() is shared for result in results)
+    assert len(flight) == 0
+
+
+def test_different_keys_run_separately():
+    flight: single_flight.SingleFlight[str, str] = single_flight.SingleFlight()
+
+    assert flight.do("a", lambda: "first") == "first"
+    assert flight.do("b", lambda: "second") == "second"
+
+
+def test_call_after_finish_runs_again():
+    flight: single_flight.SingleFlight[str, int] = single_flight.SingleFlight()
+    calls = []
+
+    for _ in range(2):
+        flight.do("key", lambda: calls.append(1) or len(calls))
+
+    assert len(calls) == 2
+
+
+def test_exception_is_raised_to_every_waiter():
+    flight: single_flight.SingleFlight[str, str] = single_flight.SingleFlight()
+    release = threading.Event()
+    started = threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(timeout=5)
+        raise FileNotFoundError(MISSING)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.do, "key", fail)
+        started.wait(timeout=5)
+        waiter = executor.submit(flight.do, "key", lambda: "not called")
+        wait_until_running([waiter])
+        release.set()
+
+    for result in (leader, waiter):
+        with pytest.raises(FileNotFoundError):
+            result.result()
+    assert len(flight) == 0
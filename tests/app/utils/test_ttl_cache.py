@@ -0,0 +1,54 @@
+from genetic_forensic_portal.app.utils import ttl_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_returns_put_value():
+    cache = ttl_cache.TtlCache()
+
+    cache.put("key", [1, 2, 3])
+
+    assert cache.get("key") == [1, 2, 3]
+    assert cache.get("other key") is None
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = ttl_cache.TtlCache(ttl=10.0, clock=clock)
+    cache.put("key", "value")
+
+    clock.now = 9.9
+    assert cache.get("key") == "value"
+
+    clock.now = 10.0
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ttl_cache.TtlCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+
+    cache.put("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_clear_removes_everything():
+    cache = ttl_cache.TtlCache()
+    cache.put("a", 1)
+
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.get("a") is None
@@ -1,5 +1,8 @@
+import gzip
 import io
+import re
 
+import numpy as np
 import pytest
 
 from genetic_forensic_portal.app.utils import validate_input_file
@@ -132,3 +135,340 @@ def test_more_than_2_haplotypes_for_sid_throws():
 
     with pytest.raises(ValueError, match=expected_error):
         validate_input_file.validate_input_file(testfile)
+
+
+def test_vectorized_legal_file_throw_no_errors():
+    file_data = LEGAL_HEADER + "\n" + LEGAL_LINE + "\n" + LEGAL_LINE + "\n"
+    testfile = io.StringIO(file_data)
+
+    validate_input_file.validate_input_file_vectorized(testfile)
+
+
+def test_vectorized_header_only_file_throw_no_errors():
+    testfile = io.StringIO(LEGAL_HEADER + "\n")
+
+    validate_input_file.validate_input_file_vectorized(testfile)
+
+
+def _line(sid, values):
+    return sid + "\t" + "\t".join(values)
+
+
+LEGAL_VALUES = ["1"] * (len(validate_input_file.MSAT_NAMES) - 1) + ["-999"]
+
+
+ILLEGAL_DATALINES = [
+    ["notMatchId"],
+    [_line("sample1", LEGAL_VALUES[:-1])],
+    [_line("sample1", LEGAL_VALUES), ""],
+    [_line("sample1", ["-100"] * len(LEGAL_VALUES))],
+    [_line("sample1", ["A"] * len(LEGAL_VALUES))],
+    [_line("sample1", LEGAL_VALUES), _line("sample1", [*LEGAL_VALUES[:-1], "301"])],
+    [_line("sample1", [*LEGAL_VALUES[:-1], "1.0"]), _line("sample1", ["1"])],
+    [_line("sample1", ["1"]), _line("sample1", [*LEGAL_VALUES[:-1], "0"])],
+    [_line("sample1", [*LEGAL_VALUES[:-1], "", "\t"])],
+    [_line("sample1", [*LEGAL_VALUES[:-1], '"1"'])],
+    [_line("sample1", LEGAL_VALUES)],
+    [_line(sid, LEGAL_VALUES) for sid in ["s1", "s2", "s1", "s2", "s2"]],
+    [_line(sid, LEGAL_VALUES) for sid in ["s1", "s2", "s1", "s3", "s2"]],
+]
+
+
+@pytest.mark.parametrize("datalines", ILLEGAL_DATALINES)
+def test_vectorized_engine_throws_same_error(datalines):
+    file_data = "\n".join([LEGAL_HEADER, *datalines])
+
+    with pytest.raises(ValueError, match="Error in uploaded file") as expected:
+        validate_input_file.validate_input_file(io.StringIO(file_data))
+
+    with pytest.raises(ValueError, match=re.escape(str(expected.value))):
+        validate_input_file.validate_input_file_vectorized(io.StringIO(file_data))
+
+
+def test_vectorized_engine_accepts_same_integer_spellings():
+    spellings = ["+1", "007", " 12", "1_0", "-0999", "300"]
+    values = spellings + LEGAL_VALUES[len(spellings) :]
+    file_data = "\n".join(
+        [LEGAL_HEADER, _line("sample1", values), _line("sample1", values)]
+    )
+
+    validate_input_file.validate_input_file(io.StringIO(file_data))
+    validate_input_file.validate_input_file_vectorized(io.StringIO(file_data))
+
+
+def test_iter_lines_reassembles_lines_across_chunks():
+    file_data = "MatchID\tFH67\nsämple1\t1\r\n\nlast line"
+    stream = io.BytesIO(file_data.encode("utf-8"))
+
+    lines = list(validate_input_file.iter_lines(stream, chunk_size=3))
+
+    assert lines == ["MatchID\tFH67\n", "sämple1\t1\r\n", "\n", "last line"]
+
+
+def test_stream_legal_file_throw_no_errors():
+    file_data = LEGAL_HEADER + "\n" + LEGAL_LINE + "\n" + LEGAL_LINE + "\n"
+    stream = io.BytesIO(file_data.encode("utf-8"))
+
+    validate_input_file.validate_input_stream(stream, chunk_size=16)
+
+
+def test_stream_empty_file_throws():
+    expected_error = validate_input_file.ERROR_TEMPLATE.format(
+        lineno=1, error=validate_input_file.HEADER_MUST_START_WITH_MATCHID
+    )
+
+    with pytest.raises(ValueError, match=expected_error):
+        validate_input_file.validate_input_stream(io.BytesIO(b""))
+
+
+def test_stream_more_than_2_haplotypes_for_sid_throws():
+    file_data = LEGAL_HEADER + "\n" + LEGAL_LINE + "\n" + LEGAL_LINE + "\n" + LEGAL_LINE
+    stream = io.BytesIO(file_data.encode("utf-8"))
+    expected_error = validate_input_file.ERROR_TEMPLATE.format(
+        lineno="2,3,4",
+        error=validate_input_file.TOO_MANY_HAPLOTYPES_FOR_SID.format(
+            sid="sample1", count=3
+        ),
+    )
+
+    with pytest.raises(ValueError, match=expected_error):
+        validate_input_file.validate_input_stream(stream, chunk_size=5)
+
+
+def test_check_input_file_reports_every_error():
+    file_data = "\n".join(
+        [
+            "notMatchId\t" + "\t".join(validate_input_file.MSAT_NAMES),
+            _line("sample1", LEGAL_VALUES[:-1]),
+            _line("sample2", ["A", "-100", *LEGAL_VALUES[2:]]),
+            LEGAL_LINE,
+        ]
+    )
+
+    report = validate_input_file.check_input_file(io.StringIO(file_data))
+
+    assert not report.is_valid
+    assert not report.truncated
+    assert report.errors == [
+        (
+            validate_input_file.ErrorType.HEADER,
+            "1",
+            validate_input_file.HEADER_MUST_START_WITH_MATCHID,
+        ),
+        (
+            validate_input_file.ErrorType.MSAT_COUNT,
+            "2",
+            validate_input_file.INCORRECT_NUM_MSATS.format(
+                num_msats_found=len(LEGAL_VALUES) - 1
+            ),
+        ),
+        (
+            validate_input_file.ErrorType.MSAT_VALUE,
+            "3",
+            validate_input_file.ILLEGAL_MSAT_VALUE.format(msat_value="A"),
+        ),
+        (
+            validate_input_file.ErrorType.MSAT_VALUE,
+            "3",
+            validate_input_file.ILLEGAL_MSAT_VALUE.format(msat_value="-100"),
+        ),
+        (
+            validate_input_file.ErrorType.HAPLOTYPE_COUNT,
+            "3",
+            validate_input_file.ONLY_ONE_HAPLOTYPE_FOR_SID.format(
+                sid="sample2", count=1
+            ),
+        ),
+    ]
+
+
+def test_check_input_file_stops_at_max_errors():
+    illegal_line = _line("sample1", ["A"] * len(LEGAL_VALUES))
+    file_data = LEGAL_HEADER + "\n" + illegal_line + "\n" + illegal_line
+
+    report = validate_input_file.check_input_file(io.StringIO(file_data), max_errors=5)
+
+    assert len(report.errors) == 5
+    assert report.truncated
+
+
+def test_check_input_file_legal_file_is_valid():
+    file_data = LEGAL_HEADER + "\n" + LEGAL_LINE + "\n" + LEGAL_LINE + "\n"
+
+    report = validate_input_file.check_input_file(io.StringIO(file_data))
+
+    assert report.is_valid
+    assert report.to_dataframe().empty
+
+
+def test_check_input_stream_reports_errors_as_table():
+    file_data = LEGAL_HEADER + "\n" + LEGAL_LINE
+    stream = io.BytesIO(file_data.encode("utf-8"))
+
+    report = validate_input_file.check_input_stream(stream)
+    table = report.to_dataframe()
+
+    assert list(table.columns) == [
+        validate_input_file.LINE_COLUMN,
+        validate_input_file.ERROR_TYPE_COLUMN,
+        validate_input_file.ERROR_COLUMN,
+    ]
+    assert table.to_numpy().tolist() == [
+        [
+            "2",
+            validate_input_file.ErrorType.HAPLOTYPE_COUNT.value,
+            validate_input_file.ONLY_ONE_HAPLOTYPE_FOR_SID.format(
+                sid="sample1", count=1
+            ),
+        ]
+    ]
+
+
+@pytest.mark.parametrize("datalines", ILLEGAL_DATALINES)
+def test_spilled_sid_tracking_reports_same_errors(datalines):
+    file_data = "\n".join([LEGAL_HEADER, *datalines])
+
+    expected = validate_input_file.check_input_file(io.StringIO(file_data))
+    report = validate_input_file.check_input_stream(
+        io.BytesIO(file_data.encode("utf-8")), chunk_size=7, sid_spill_threshold=1
+    )
+
+    assert report.errors == expected.errors
+
+
+def test_spilled_sid_tracking_rescans_lines_of_repeated_sids():
+    sids = ["s1", "s2", "s3", "s1", "s2", "s1", "s4", "s1"]
+    file_data = "\n".join([LEGAL_HEADER, *(_line(sid, LEGAL_VALUES) for sid in sids)])
+
+    report = validate_input_file.check_input_file(
+        io.StringIO(file_data), sid_spill_threshold=2
+    )
+
+    assert report.errors == [
+        (
+            validate_input_file.ErrorType.HAPLOTYPE_COUNT,
+            "2,5,7,9",
+            validate_input_file.TOO_MANY_HAPLOTYPES_FOR_SID.format(sid="s1", count=4),
+        ),
+        (
+            validate_input_file.ErrorType.HAPLOTYPE_COUNT,
+            "4",
+            validate_input_file.ONLY_ONE_HAPLOTYPE_FOR_SID.format(sid="s3", count=1),
+        ),
+        (
+            validate_input_file.ErrorType.HAPLOTYPE_COUNT,
+            "8",
+            validate_input_file.ONLY_ONE_HAPLOTYPE_FOR_SID.format(sid="s4", count=1),
+        ),
+    ]
+
+
+def test_check_input_path_reads_compressed_file_from_disk(tmp_path):
+    file_data = "\n".join(
+        [LEGAL_HEADER, *(_line("s1", LEGAL_VALUES) for _ in range(2))]
+    )
+    path = tmp_path / "sample.tsv.gz"
+    path.write_bytes(gzip.compress(file_data.encode("utf-8")))
+
+    assert validate_input_file.check_input_path(str(path)).is_valid
+
+
+def test_check_input_bytes_decompresses_and_rescans_compressed_file():
+    sids = ["s1", "s2", "s1", "s1", "s2"]
+    file_data = "\n".join([LEGAL_HEADER, *(_line(sid, LEGAL_VALUES) for sid in sids)])
+
+    report = validate_input_file.check_input_bytes(
+        gzip.compress(file_data.encode("utf-8")), sid_spill_threshold=1
+    )
+
+    assert report.messages() == [
+        validate_input_file.ERROR_TEMPLATE.format(
+            lineno="2,4,5",
+            error=validate_input_file.TOO_MANY_HAPLOTYPES_FOR_SID.format(
+                sid="s1", count=3
+            ),
+        )
+    ]
+
+
+def test_spilled_sid_tracking_stops_at_max_errors():
+    file_data = "\n".join(
+        [LEGAL_HEADER, *(_line(f"s{i}", LEGAL_VALUES) for i in range(10))]
+    )
+
+    report = validate_input_file.check_input_file(
+        io.StringIO(file_data), max_errors=3, sid_spill_threshold=2
+    )
+
+    assert len(report.errors) == 3
+    assert report.truncated
+
+
+def test_validate_input_file_error_carries_report():
+    file_data = "notMatchId\t" + "\t".join(validate_input_file.MSAT_NAMES)
+
+    with pytest.raises(validate_input_file.InvalidInputFileError) as error:
+        validate_input_file.validate_input_file(io.StringIO(file_data), max_errors=None)
+
+    assert str(error.value) == validate_input_file.ERROR_TEMPLATE.format(
+        lineno=1, error=validate_input_file.HEADER_MUST_START_WITH_MATCHID
+    )
+    assert len(error.value.report.errors) == 1
+
+
+@pytest.mark.parametrize(
+    ("msat", "expected"),
+    [("1", 1), ("300", 300), ("-999", -999), ("+12", 12), ("0299", 299)],
+)
+def test_parse_msat_value_returns_shared_value(msat, expected):
+    value = validate_input_file.parse_msat_value(msat)
+
+    assert value == expected
+    assert value is validate_input_file.LEGAL_MSAT_TOKENS[str(expected)]
+
+
+@pytest.mark.parametrize("msat", ["0", "301", "-100", "A", "", "1.0"])
+def test_parse_msat_value_illegal_returns_none(msat):
+    assert validate_input_file.parse_msat_value(msat) is None
+    assert not validate_input_file.legal_msat_value(msat)
+
+
+def test_read_genotypes_returns_matrix_of_diploid_samples():
+    other_values = [str(value) for value in range(1, len(LEGAL_VALUES) + 1)]
+    file_data = "\n".join(
+        [
+            LEGAL_HEADER,
+            _line("sample1", LEGAL_VALUES),
+            _line("sample2", other_values),
+            _line("sample1", other_values),
+            _line("sample2", LEGAL_VALUES),
+        ]
+    )
+
+    genotypes = validate_input_file.read_genotypes(io.StringIO(file_data))
+
+    assert genotypes.sample_ids == ["sample1", "sample2"]
+    assert len(genotypes) == 2
+    assert genotypes.alleles.dtype == np.int16
+    assert genotypes.alleles.shape == (2, 2, len(validate_input_file.MSAT_NAMES))
+    assert genotypes.alleles[0, 1].tolist() == list(range(1, len(LEGAL_VALUES) + 1))
+    assert genotypes.alleles[1, 0].tolist() == genotypes.alleles[0, 1].tolist()
+    # the last value of LEGAL_VALUES is missing
+    assert genotypes.alleles.mask[0, 0].tolist() == [False] * 15 + [True]
+    assert genotypes.alleles.count() == 4 * len(LEGAL_VALUES) - 2
+
+
+def test_read_genotype_stream_empty_body_returns_empty_matrix():
+    stream = io.BytesIO((LEGAL_HEADER + "\n").encode("utf-8"))
+
+    genotypes = validate_input_file.read_genotype_stream(stream)
+
+    assert genotypes.sample_ids == []
+    assert genotypes.alleles.shape == (0, 2, len(validate_input_file.MSAT_NAMES))
+
+
+def test_read_genotypes_illegal_file_throws():
+    file_data = LEGAL_HEADER + "\n" + LEGAL_LINE
+
+    with pytest.raises(validate_input_file.InvalidInputFileError):
+        validate_input_file.read_genotypes(io.StringIO(file_data))
@@ -0,0 +1,71 @@
+from genetic_forensic_portal.app.utils import validation_cache
+from genetic_forensic_portal.app.utils.validate_input_file import (
+    ErrorType,
+    ValidationReport,
+)
+
+
+def _invalid_report():
+    report = ValidationReport(max_errors=5)
+    report.errors.append(
+        (ErrorType.HEADER, "1", "First entry in header must be MatchID")
+    )
+    return report
+
+
+def test_get_returns_put_report():
+    cache = validation_cache.ValidationCache()
+    report = _invalid_report()
+
+    cache.put("hash", report)
+
+    assert cache.get("hash") is report
+    assert cache.get("other hash") is None
+
+
+def test_get_misses_other_panel_version():
+    cache = validation_cache.ValidationCache()
+
+    cache.put("hash", ValidationReport(), panel_version="1")
+
+    assert cache.get("hash", panel_version="2") is None
+
+
+def test_least_recently_used_report_is_evicted():
+    cache = validation_cache.ValidationCache(max_entries=2)
+    cache.put("a", ValidationReport())
+    cache.put("b", ValidationReport())
+    cache.get("a")
+
+    cache.put("c", ValidationReport())
+
+    assert len(cache) == 2
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+
+
+def test_disk_backed_cache_outlives_instance(tmp_path):
+    validation_cache.ValidationCache(directory=tmp_path).put("hash", _invalid_report())
+
+    report = validation_cache.ValidationCache(directory=tmp_path).get("hash")
+
+    assert report is not None
+    assert report.errors == _invalid_report().errors
+    assert report.max_errors == 5
+    assert not report.truncated
+
+
+def test_disk_backed_cache_is_bounded(tmp_path):
+    cache = validation_cache.ValidationCache(max_entries=2, directory=tmp_path)
+
+    for content_hash in ["a", "b", "c"]:
+        cache.put(content_hash, ValidationReport())
+
+    assert len(list(tmp_path.glob("*.json"))) == 2
+
+
+def test_unreadable_disk_entry_is_a_miss(tmp_path):
+    cache = validation_cache.ValidationCache(directory=tmp_path)
+    (tmp_path / f"{validation_cache.PANEL_VERSION}-hash.json").write_text("not json")
+
+    assert cache.get("hash") is None